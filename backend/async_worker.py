@@ -0,0 +1,171 @@
+"""
+Asyncio-native worker: consumes the same `run_osint_scan` messages as the Celery
+worker but runs many scans concurrently on one event loop, since a scan is almost
+entirely I/O wait.
+
+    python -m backend.async_worker --concurrency 32 --queues scans.async
+
+It consumes only its own queue (SCAN_QUEUE_ASYNC, filled when ASYNC_WORKER_ENABLED is set),
+never the Celery pools' queues, and runs every module inline regardless of SCAN_FANOUT.
+
+Semantics match the Celery task, which is declared with acks_late and
+reject_on_worker_lost:
+- a message is acked only after its scan has been written (completed or failed),
+- failures are retried by re-publishing the message with `retries + 1` after 30s,
+- messages left unacked by a crashed process are redelivered by the broker.
+"""
+import argparse
+import asyncio
+import logging
+import queue
+import signal
+import socket
+import time
+from datetime import datetime, timezone
+
+from kombu import Consumer, Queue
+
+from backend.config import ASYNC_WORKER_CONCURRENCY, ASYNC_WORKER_QUEUES, SCAN_RETRY_COUNTDOWN
+from backend.celery_worker import celery_app, run_osint_scan, execute_scan, complete_scan, fail_scan, record_scan_start
+from backend.rescan import load_prior_scan
+from backend.singleflight import flight_key, join_flight
+from backend.worker_runtime import start_runtime, stop_runtime
+from backend.write_behind import close_write_behind
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("celery_worker")
+
+
+class AsyncScanWorker:
+    def __init__(self, concurrency: int, queues: list):
+        self.concurrency = max(1, concurrency)
+        self.queues = [Queue(name) for name in queues]
+        self.loop = None
+        self.slots = None
+        self.in_flight = 0
+        # Broker channels are not thread-safe: scans finish on the loop thread, and
+        # their ack/retry decisions are applied here on the consuming thread.
+        self.outcomes: "queue.Queue" = queue.Queue()
+        self.stopping = False
+
+    # ---- runs on the event loop thread ----
+
+    async def _run_scan(self, headers: dict, args: list, kwargs: dict):
+        scan_id, email, username, domain = (list(args) + [None] * 4)[:4]
+        force_refresh = kwargs.get("force_refresh", args[4] if len(args) > 4 else False)
+        base_scan_id = kwargs.get("base_scan_id", args[5] if len(args) > 5 else None)
+        retries = int(headers.get("retries") or 0)
+
+        eta = headers.get("eta")
+        if eta:
+            eta_at = datetime.fromisoformat(eta)
+            if eta_at.tzinfo is None:
+                eta_at = eta_at.replace(tzinfo=timezone.utc)
+            delay = (eta_at - datetime.now(timezone.utc)).total_seconds()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+        async with self.slots:
+            logger.info(f"Async worker STARTING scan: {scan_id} for {email or username or domain}")
+            await asyncio.to_thread(record_scan_start, scan_id)
+            flight = flight_key(email, username, domain, force_refresh, base_scan_id)
+            if not await asyncio.to_thread(join_flight, flight, scan_id):
+                logger.info(f"Scan {scan_id} attached to an in-flight scan of the same target.")
+                return "ack", None
+            try:
+                prior = await asyncio.to_thread(load_prior_scan, base_scan_id)
+                findings, coverage = await execute_scan(scan_id, email, username, domain, force_refresh, prior)
+                await asyncio.to_thread(complete_scan, scan_id, flight, findings, coverage, prior)
+                return "ack", None
+            except Exception as exc:
+                logger.error(f"Scan {scan_id} failed: {exc}")
+                if retries < run_osint_scan.max_retries:
+                    return "retry", retries + 1
+                await asyncio.to_thread(fail_scan, scan_id, flight, exc)
+                return "ack", None
+
+    # ---- runs on the consuming thread ----
+
+    def _on_message(self, body, message):
+        headers = message.headers or {}
+        if headers.get("task") != run_osint_scan.name:
+            logger.error(f"Async worker only runs {run_osint_scan.name}, requeueing {headers.get('task')}")
+            message.requeue()
+            return
+
+        args, kwargs = body[0], body[1]
+        self.in_flight += 1
+        future = asyncio.run_coroutine_threadsafe(self._run_scan(headers, args, kwargs), self.loop)
+        future.add_done_callback(lambda f: self.outcomes.put((message, headers, args, kwargs, f)))
+
+    def _apply_outcomes(self):
+        while True:
+            try:
+                message, headers, args, kwargs, future = self.outcomes.get_nowait()
+            except queue.Empty:
+                return
+            self.in_flight -= 1
+            try:
+                action, retries = future.result()
+            except Exception as e:
+                # Unexpected crash in the wrapper itself: let the broker redeliver it
+                logger.error(f"Async worker error for task {headers.get('id')}: {e}")
+                message.requeue()
+                continue
+
+            if action == "retry":
+                # Same task id and arguments on the same queue, one more retry,
+                # delayed like self.retry(countdown=SCAN_RETRY_COUNTDOWN)
+                run_osint_scan.apply_async(
+                    args=args, kwargs=kwargs, task_id=headers.get("id"),
+                    queue=message.delivery_info.get("routing_key"),
+                    countdown=SCAN_RETRY_COUNTDOWN, retries=retries,
+                )
+            message.ack()
+
+    def _request_stop(self, *_):
+        logger.info("Async worker stopping: no new messages, draining in-flight scans...")
+        self.stopping = True
+
+    def run(self):
+        self.loop = start_runtime()
+        self.slots = asyncio.run_coroutine_threadsafe(self._make_slots(), self.loop).result()
+        signal.signal(signal.SIGTERM, self._request_stop)
+        signal.signal(signal.SIGINT, self._request_stop)
+
+        with celery_app.connection_for_read() as conn:
+            # Prefetch covers the running scans plus a few waiting on a retry countdown
+            consumer = Consumer(conn, queues=self.queues, callbacks=[self._on_message], accept=["json"])
+            consumer.qos(prefetch_count=self.concurrency * 2)
+            with consumer:
+                logger.info(f"Async worker consuming {[q.name for q in self.queues]} with concurrency {self.concurrency}")
+                while not self.stopping:
+                    try:
+                        conn.drain_events(timeout=1)
+                    except socket.timeout:
+                        pass
+                    self._apply_outcomes()
+
+                consumer.cancel()
+                while self.in_flight:
+                    self._apply_outcomes()
+                    time.sleep(0.2)
+            self._apply_outcomes()
+
+        stop_runtime()
+        close_write_behind()
+
+    async def _make_slots(self):
+        return asyncio.Semaphore(self.concurrency)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Asyncio-native OSINT scan worker")
+    parser.add_argument("--concurrency", type=int, default=ASYNC_WORKER_CONCURRENCY, help="Scans run concurrently per process")
+    parser.add_argument("--queues", default=",".join(ASYNC_WORKER_QUEUES), help="Comma-separated queues to consume")
+    opts = parser.parse_args()
+    AsyncScanWorker(opts.concurrency, [q for q in opts.queues.split(",") if q]).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,27 @@
+import asyncio
+
+import redis
 from fastapi import Request, HTTPException, status
 from jose import jwt, JWTError
 
 from backend.config import SECRET_KEY, ALGORITHM
 # Import the Redis client to check for blacklisted tokens
 from backend.auth.routes import redis_client
+from backend.redis_client import get_async_redis
+
+
+async def _is_revoked(token: str) -> bool:
+    client = get_async_redis()
+    if client is not None:
+        try:
+            return bool(await client.get(f"blacklist:{token}"))
+        except redis.RedisError:
+            pass
+    # Same check on the blocking client (which raises if Redis is really down)
+    return bool(await asyncio.to_thread(redis_client.get, f"blacklist:{token}"))
 
 
-def get_current_user(request: Request) -> str:
+async def get_current_user(request: Request) -> str:
     """
     Extracts and validates JWT from Authorization header.
     Expects: Authorization: Bearer <token>
@@ -26,7 +41,7 @@ def get_current_user(request: Request) -> str:
     token = auth_header.split(" ")[1]
 
     # Check if token is in the logout blacklist
-    if redis_client.get(f"blacklist:{token}"):
+    if await _is_revoked(token):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Token has been revoked",
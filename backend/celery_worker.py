@@ -1,15 +1,29 @@
 import asyncio
-import socket
 import sys
+import time
 import logging
-from celery import Celery
-from backend.config import REDIS_URL
-from backend.database import update_scan_result
+from typing import Awaitable, Callable
+from celery import Celery, chord
+from celery.signals import worker_process_init, worker_process_shutdown
+from backend.config import REDIS_URL, FINDINGS_FLUSH_BATCH, FINDINGS_FLUSH_INTERVAL, SCAN_FANOUT, SCAN_MODULE_QUEUE_FAST, SCAN_MODULE_QUEUE_SLOW
+from backend.config import SCAN_RETRY_COUNTDOWN, SCAN_VISIBILITY_TIMEOUT, WRITE_BEHIND_ENABLED
+from backend.database import mark_scan_started
 from backend.osint.breach_osint import check_data_breaches
-from backend.osint.username_osint import check_username_with_sherlock
+from backend.osint.username_osint import iter_username_findings
+from backend.osint.dns_osint import check_domain_records
+from backend.osint.probe_checkpoint import clear_checkpoint
+from backend.rescan import PriorScan, load_prior_scan
+from backend.scan_budget import scan_deadline, time_left, module_coverage, scan_coverage, scan_status
+from backend.scan_stream import publish_findings, publish_status
+from backend.singleflight import flight_key, join_flight, finish_flight
+from backend.write_behind import update_scan_result, close_write_behind
+from backend.worker_runtime import start_runtime, stop_runtime, run_in_worker_loop
 
 logger = logging.getLogger("celery_worker")
 
+# Modules hand each batch of new findings to an `emit` callback as they go
+Emit = Callable[[list], Awaitable[None]]
+
 celery_app = Celery("osint_worker", broker=REDIS_URL, backend=REDIS_URL)
 
 celery_app.conf.update(
@@ -18,105 +32,356 @@ celery_app.conf.update(
     accept_content=["json"],
     task_track_started=True,
     worker_prefetch_multiplier=1,
+    # Redis redelivers unacked (acks_late) scans after this; its default of an hour would
+    # bring a crashed scan back long after the stale sweep failed it (see config)
+    broker_transport_options={"visibility_timeout": SCAN_VISIBILITY_TIMEOUT},
+    # Per-module subtasks get their own queues so the asyncio worker, which only
+    # runs whole scans, never receives them. Quick modules never queue behind Sherlock.
+    # run_osint_scan itself is routed per call by start_scan (see scan_routing).
+    task_routes={
+        "scan_breach_module": {"queue": SCAN_MODULE_QUEUE_FAST},
+        "scan_username_module": {"queue": SCAN_MODULE_QUEUE_SLOW},
+        "scan_domain_module": {"queue": SCAN_MODULE_QUEUE_FAST},
+        "aggregate_scan": {"queue": SCAN_MODULE_QUEUE_FAST},
+        "scan_chord_failed": {"queue": SCAN_MODULE_QUEUE_FAST},
+    },
 )
 
 # FIXED: Changed from Selector to Proactor to prevent httpx from dropping SSL connections on Windows
 if sys.platform == "win32":
     asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
 
+@worker_process_init.connect
+def _start_worker_runtime(**kwargs):
+    # Runs in each forked child: one event loop, HTTP pool and async Redis client per process
+    start_runtime()
+
+@worker_process_shutdown.connect
+def _stop_worker_runtime(**kwargs):
+    stop_runtime()
+    # Pending result writes are flushed before the process exits
+    close_write_behind()
+
 def calculate_risk(findings: list) -> int:
     """Calculates a dynamic risk score 0-100 based on findings."""
     if not findings:
         return 0
     score = 0
+    domain_scored = False
     for f in findings:
         if f.get("type") == "breach":
             score += 25 if f.get("severity") == "CRITICAL" else 15
         elif f.get("type") == "username":
             score += 5
-        # Add a small base score for domain info
-        elif f.get("type") == "domain":
+        # Add a small base score for domain info (once - a domain yields one finding per DNS record)
+        elif f.get("type") == "domain" and not domain_scored:
             score += 10
+            domain_scored = True
     return min(score, 100)
 
-@celery_app.task(name="run_osint_scan", bind=True, max_retries=2)
-def run_osint_scan(self, scan_id: str, email: str, username: str, domain: str):
+async def _flush_partial(scan_id: str, findings: list, new_findings: list) -> None:
+    """Writes the findings gathered so far (status stays Running) and streams the new batch."""
+    try:
+        if WRITE_BEHIND_ENABLED:
+            # Partial writes go to the write-behind buffer and never wait for MySQL
+            update_scan_result(scan_id, findings, calculate_risk(findings), "Running")
+        else:
+            # A direct pymysql write would stall every scan sharing this loop
+            await asyncio.to_thread(update_scan_result, scan_id, findings, calculate_risk(findings), "Running")
+    except Exception as e:
+        # A missed partial write is not fatal - the final write carries everything
+        logger.warning(f"Partial flush failed for scan {scan_id}: {e}")
+    await publish_findings(scan_id, new_findings)
+
+def record_scan_start(scan_id: str) -> None:
+    """Starts the stale-scan clock (see database.mark_stale_scans_failed); not fatal if it fails."""
+    try:
+        mark_scan_started(scan_id)
+    except Exception as e:
+        logger.warning(f"Could not mark scan {scan_id} as started: {e}")
+
+def _share_with_followers(key: str, scan_id: str, findings: list, risk_score: int, status: str, coverage: dict | None = None) -> None:
+    """Releases the single-flight and copies the leader's outcome to every attached scan."""
+    for follower_id in finish_flight(key, scan_id):
+        try:
+            update_scan_result(follower_id, findings, risk_score, status=status, coverage=coverage)
+            publish_status(follower_id, status)
+        except Exception as e:
+            logger.error(f"Could not share results of scan {scan_id} with {follower_id}: {e}")
+
+async def breach_module(scan_id: str, email: str, emit: Emit, prior: PriorScan | None = None, coverage: dict | None = None) -> list:
+    """1. Check Email Breaches (a rescan reuses a recent base scan's answer)"""
+    reused = prior.reusable_breaches() if prior else None
+    if reused is not None:
+        logger.info(f"Scan {scan_id}: reusing breach results of base scan {prior.scan_id}.")
+        if coverage is not None:
+            # Still as old as when the base looked it up
+            coverage["observed_at"] = prior.breaches_observed_at()
+        if reused:
+            await emit(reused)
+        return reused
+
+    found = []
+    if coverage is not None:
+        coverage["observed_at"] = time.time()
+    breaches = await check_data_breaches(email)
+    for b in breaches:
+        found.append({
+            "type": "breach", 
+            "source": "XposedOrNot",
+            "value": b.get("name"), 
+            "severity": b.get("severity"),
+        })
+    if found:
+        await emit(found)
+    return found
+
+async def username_module(
+    scan_id: str, username: str, force_refresh: bool, emit: Emit,
+    deadline: float | None = None, coverage: dict | None = None, prior: PriorScan | None = None,
+) -> list:
+    """2. Check Usernames (Sherlock) - hits are emitted in small batches as they arrive"""
+    found = []
+    pending = []
+    started = time.time()
+    last_flush = time.monotonic()
+    misses_observed_at = prior.misses_observed_at() if prior else None
+    # Sherlock enforces the deadline itself so the hits found before it are kept
+    hits = iter_username_findings(
+        username, scan_id=scan_id, force_refresh=force_refresh, deadline=deadline, coverage=coverage,
+        prior_hits=prior.site_hits() if prior else None,
+        reuse_prior_misses=misses_observed_at is not None,
+    )
+    async for s in hits:
+        finding = {
+            "type": "username", 
+            "source": "Sherlock",
+            "value": s.get("site"), 
+            "url": s.get("url"),
+            "severity": "INFO"  # FIXED: Added severity so the UI doesn't crash!
+        }
+        found.append(finding)
+        pending.append(finding)
+        if len(pending) >= FINDINGS_FLUSH_BATCH or time.monotonic() - last_flush >= FINDINGS_FLUSH_INTERVAL:
+            await emit(pending)
+            pending = []
+            last_flush = time.monotonic()
+    if pending:
+        await emit(pending)
+    if coverage is not None and coverage.get("status") == "complete":
+        # Misses taken over from the base are as old as the base's sweep
+        coverage["observed_at"] = misses_observed_at if misses_observed_at is not None else started
+    return found
+
+async def domain_module(scan_id: str, domain: str, emit: Emit) -> list:
+    """3. Check Domains (async DNS: A/AAAA/MX/NS/TXT/CNAME, TTL-cached)"""
+    found = await check_domain_records(domain)
+    await emit(found)
+    return found
+
+async def _within_budget(module: str, coro: Awaitable[list], deadline: float | None, modules: dict) -> list:
+    """Runs a single-shot module under the scan deadline; if it runs out, the module contributes nothing."""
+    try:
+        async with asyncio.timeout(time_left(deadline)):
+            found = await coro
+    except TimeoutError:
+        logger.warning(f"{module} module ran out of scan budget.")
+        modules[module] = module_coverage("timed_out")
+        return []
+    # Keeps what the module itself recorded (e.g. observed_at)
+    modules.setdefault(module, {}).update(module_coverage("complete"))
+    return found
+
+async def execute_scan(
+    scan_id: str, email: str, username: str, domain: str, force_refresh: bool = False, prior: PriorScan | None = None,
+) -> tuple:
+    """
+    Runs the OSINT modules for one target in sequence under the scan's time budget.
+    `prior` is the base scan of a rescan. Returns (findings, coverage).
+    """
+    findings = []
+    modules = {}
+    deadline = await asyncio.to_thread(scan_deadline, scan_id)
+
+    async def emit(batch: list) -> None:
+        findings.extend(batch)
+        await _flush_partial(scan_id, findings, batch)
+
+    if email:
+        modules["XposedOrNot"] = {}
+        await _within_budget("XposedOrNot", breach_module(scan_id, email, emit, prior, modules["XposedOrNot"]), deadline, modules)
+    if username:
+        modules["Sherlock"] = {}
+        await username_module(scan_id, username, force_refresh, emit, deadline, modules["Sherlock"], prior)
+    if domain:
+        await _within_budget("DNS", domain_module(scan_id, domain, emit), deadline, modules)
+
+    return findings, scan_coverage(deadline, modules)
+
+def complete_scan(scan_id: str, flight: str, findings: list, coverage: dict | None = None, prior: PriorScan | None = None) -> None:
+    """
+    Writes the final result and hands it to any scans attached to the same flight.
+    A scan whose time budget ran out before every module finished is stored as "Partial".
+    A rescan stores only its changes against the base scan.
+    """
+    status = scan_status(coverage) if coverage else "Completed"
+    logger.info(f"Scan {scan_id} finished ({status}). Findings: {len(findings)}")
+    risk_score = calculate_risk(findings)
+    delta = prior.delta_for(findings) if prior else None
+    if delta is not None:
+        logger.info(f"Scan {scan_id}: {len(delta['added'])} added, {len(delta['removed'])} removed since {prior.scan_id}.")
+    update_scan_result(scan_id, findings, risk_score, status=status, coverage=coverage, delta=delta)
+    publish_status(scan_id, status)
+    clear_checkpoint(scan_id)
+    _share_with_followers(flight, scan_id, findings, risk_score, status, coverage)
+
+def fail_scan(scan_id: str, flight: str, exc: Exception) -> None:
+    """Retries exhausted: update DB so frontend doesn't hang."""
+    error_finding = [{
+        "type": "error",
+        "source": "System",
+        "value": f"Scan failed due to internal error: {str(exc)}",
+        "severity": "HIGH"
+    }]
+    try:
+        update_scan_result(scan_id, error_finding, 0, status="Failed")
+        publish_status(scan_id, "Failed")
+        clear_checkpoint(scan_id)
+    except Exception as db_error:
+        logger.critical(f"CRITICAL: Could not update DB for failed scan {scan_id}: {db_error}")
+    # Followers are released even if this scan's own row could not be written
+    _share_with_followers(flight, scan_id, error_finding, 0, "Failed")
+
+# acks_late + reject_on_worker_lost: a scan whose worker dies mid-run is redelivered (after
+# the broker's visibility timeout) instead of lost, and resumes from its Sherlock checkpoint
+@celery_app.task(name="run_osint_scan", bind=True, max_retries=2, acks_late=True, reject_on_worker_lost=True)
+def run_osint_scan(self, scan_id: str, email: str, username: str, domain: str, force_refresh: bool = False, base_scan_id: str | None = None):
     """
-    The main worker task. It uses asyncio.run to execute the 
-    asynchronous OSINT modules.
+    The main worker task. It submits the asynchronous OSINT modules to the
+    process-wide event loop (see worker_runtime) so pooled connections survive between tasks.
+    The asyncio-native worker (backend.async_worker) consumes the same messages.
+    `base_scan_id` makes this an incremental rescan of that earlier scan.
     """
     logger.info(f"Worker STARTING scan: {scan_id} for {email or username or domain}")
+    record_scan_start(scan_id)
+
+    # Identical targets already in flight: attach to that execution instead of repeating it
+    flight = flight_key(email, username, domain, force_refresh, base_scan_id)
+    if not join_flight(flight, scan_id):
+        logger.info(f"Scan {scan_id} attached to an in-flight scan of the same target.")
+        return
     
     try:
-        # Define an internal async function to run the tools
-        async def execute_scans():
-            findings = []
-            
-            # 1. Check Email Breaches
-            if email:
-                breaches = await check_data_breaches(email)
-                for b in breaches:
-                    findings.append({
-                        "type": "breach", 
-                        "source": "XposedOrNot",
-                        "value": b.get("name"), 
-                        "severity": b.get("severity"),
-                    })
-            
-            # 2. Check Usernames (Sherlock)
-            if username:
-                sites = await check_username_with_sherlock(username)
-                for s in sites:
-                    findings.append({
-                        "type": "username", 
-                        "source": "Sherlock",
-                        "value": s.get("site"), 
-                        "url": s.get("url"),
-                        "severity": "INFO"  # FIXED: Added severity so the UI doesn't crash!
-                    })
-
-            # 3. Check Domains (DNS Lookup)
-            if domain:
-                try:
-                    ip_address = socket.gethostbyname(domain)
-                    findings.append({
-                        "type": "domain",
-                        "source": "DNS",
-                        "value": f"Resolved IP: {ip_address}",
-                        "severity": "INFO"
-                    })
-                except socket.gaierror:
-                    findings.append({
-                        "type": "domain",
-                        "source": "DNS",
-                        "value": f"Domain could not be resolved.",
-                        "severity": "LOW"
-                    })
-
-            
-            return findings
-
-        # Run the async loop and get results
-        findings = asyncio.run(execute_scans())
-        logger.info(f"Scan {scan_id} finished. Findings: {len(findings)}")
-        
-        # 3. Update the Database with findings and risk score
-        update_scan_result(scan_id, findings, calculate_risk(findings))
+        if SCAN_FANOUT:
+            # Each module runs (and retries) as its own task; aggregate_scan writes the row once
+            _dispatch_modules(scan_id, flight, email, username, domain, force_refresh, base_scan_id)
+            return
+
+        prior = load_prior_scan(base_scan_id)
+        findings, coverage = run_in_worker_loop(execute_scan(scan_id, email, username, domain, force_refresh, prior))
+        complete_scan(scan_id, flight, findings, coverage, prior)
         
     except Exception as exc:
         logger.error(f"Scan {scan_id} failed: {exc}")
         if self.request.retries < self.max_retries:
             # If API or network fails, retry after 30 seconds
-            self.retry(exc=exc, countdown=30)
+            self.retry(exc=exc, countdown=SCAN_RETRY_COUNTDOWN)
         else:
-            # If retries exhausted, update DB so frontend doesn't hang
-            error_finding = [{
-                "type": "error",
-                "source": "System",
-                "value": f"Scan failed due to internal error: {str(exc)}",
-                "severity": "HIGH"
-            }]
-            try:
-                update_scan_result(scan_id, error_finding, 0, status="Failed")
-            except Exception as db_error:
-                logger.critical(f"CRITICAL: Could not update DB for failed scan {scan_id}: {db_error}")
\ No newline at end of file
+            fail_scan(scan_id, flight, exc)
+
+# -------- Fan-out mode: one Celery task per module, merged by a chord --------
+
+def _module_error(module: str, exc: Exception) -> list:
+    return [{
+        "type": "error",
+        "source": module,
+        "value": f"{module} module failed: {str(exc)}",
+        "severity": "HIGH"
+    }]
+
+def _stream_only(scan_id: str) -> Emit:
+    # Modules of one scan run on different workers, so partial batches go to the
+    # scan stream only (GET /scans/{scan_id} reads them from there while Running);
+    # the row itself is written once by aggregate_scan.
+    async def emit(batch: list) -> None:
+        await publish_findings(scan_id, batch)
+    return emit
+
+def _run_module(task, scan_id: str, module: str, make_coro, base_scan_id: str | None = None) -> dict:
+    """
+    Runs one module under the scan's shared deadline; retries only this module, and
+    turns exhausted retries into an error finding. Returns {"findings", "coverage"}.
+    """
+    deadline = scan_deadline(scan_id)
+    prior = load_prior_scan(base_scan_id)
+    modules = {}
+    async def run():
+        return await make_coro(_stream_only(scan_id), deadline, modules, prior)
+    try:
+        findings = run_in_worker_loop(run())
+    except Exception as exc:
+        logger.error(f"Scan {scan_id} {module} module failed: {exc}")
+        if task.request.retries < task.max_retries:
+            raise task.retry(exc=exc, countdown=SCAN_RETRY_COUNTDOWN)
+        return {"findings": _module_error(module, exc), "coverage": {module: module_coverage("failed")}}
+    return {"findings": findings, "coverage": modules}
+
+@celery_app.task(name="scan_breach_module", bind=True, max_retries=2)
+def scan_breach_module(self, scan_id: str, email: str, base_scan_id: str | None = None) -> dict:
+    def make_coro(emit, deadline, modules, prior):
+        modules["XposedOrNot"] = {}
+        return _within_budget("XposedOrNot", breach_module(scan_id, email, emit, prior, modules["XposedOrNot"]), deadline, modules)
+    return _run_module(self, scan_id, "XposedOrNot", make_coro, base_scan_id)
+
+@celery_app.task(name="scan_username_module", bind=True, max_retries=2, acks_late=True, reject_on_worker_lost=True)
+def scan_username_module(self, scan_id: str, username: str, force_refresh: bool = False, base_scan_id: str | None = None) -> dict:
+    def make_coro(emit, deadline, modules, prior):
+        modules["Sherlock"] = {}
+        return username_module(scan_id, username, force_refresh, emit, deadline, modules["Sherlock"], prior)
+    return _run_module(self, scan_id, "Sherlock", make_coro, base_scan_id)
+
+@celery_app.task(name="scan_domain_module", bind=True, max_retries=2)
+def scan_domain_module(self, scan_id: str, domain: str) -> dict:
+    return _run_module(self, scan_id, "DNS", lambda emit, deadline, modules, prior: _within_budget(
+        "DNS", domain_module(scan_id, domain, emit), deadline, modules))
+
+@celery_app.task(name="aggregate_scan", bind=True, max_retries=2)
+def aggregate_scan(self, module_results: list, scan_id: str, flight: str, base_scan_id: str | None = None) -> None:
+    """Chord callback: merges module findings and coverage, scores them and writes the row once."""
+    findings, modules = [], {}
+    for result in module_results:
+        findings.extend(result.get("findings") or [])
+        modules.update(result.get("coverage") or {})
+    try:
+        if findings and all(f.get("type") == "error" for f in findings):
+            fail_scan(scan_id, flight, Exception("; ".join(f["value"] for f in findings)))
+            return
+        complete_scan(scan_id, flight, findings, scan_coverage(scan_deadline(scan_id), modules), load_prior_scan(base_scan_id))
+    except Exception as exc:
+        # Without this the scan would sit in Running (and its followers wait) until the stale sweep
+        logger.error(f"Scan {scan_id} aggregation failed: {exc}")
+        if self.request.retries < self.max_retries:
+            raise self.retry(exc=exc, countdown=SCAN_RETRY_COUNTDOWN)
+        fail_scan(scan_id, flight, exc)
+
+@celery_app.task(name="scan_chord_failed")
+def scan_chord_failed(request, exc, traceback, scan_id: str, flight: str) -> None:
+    """
+    Error callback of the chord body: a module task died outside _run_module's handler
+    (worker lost, serialization error, retries exhausted), so aggregate_scan never runs.
+    """
+    logger.error(f"Scan {scan_id} module chord failed: {exc}")
+    fail_scan(scan_id, flight, exc if isinstance(exc, Exception) else Exception(str(exc)))
+
+def _dispatch_modules(scan_id: str, flight: str, email: str, username: str, domain: str, force_refresh: bool, base_scan_id: str | None = None) -> None:
+    # Start the budget clock now, not when the first module gets a worker
+    scan_deadline(scan_id)
+    header = []
+    if email:
+        header.append(scan_breach_module.s(scan_id, email, base_scan_id))
+    if username:
+        header.append(scan_username_module.s(scan_id, username, force_refresh, base_scan_id))
+    if domain:
+        header.append(scan_domain_module.s(scan_id, domain))
+    body = aggregate_scan.s(scan_id, flight, base_scan_id).on_error(scan_chord_failed.s(scan_id, flight))
+    chord(header)(body)
@@ -15,6 +15,13 @@ DB_PORT: int = int(os.getenv("DB_PORT", "3306"))
 DB_USER: str = os.getenv("DB_USER", "")
 DB_PASSWORD: str = os.getenv("DB_PASSWORD", "")
 DB_NAME: str = os.getenv("DB_NAME", "osint_db")
+# Per-process connection pool behind get_db_cursor
+DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+DB_POOL_MAX_LIFETIME: float = float(os.getenv("DB_POOL_MAX_LIFETIME", "1800"))
+DB_POOL_PING_INTERVAL: float = float(os.getenv("DB_POOL_PING_INTERVAL", "30"))
+# aiomysql pool used by the API routes (one per uvicorn worker)
+DB_ASYNC_POOL_SIZE: int = int(os.getenv("DB_ASYNC_POOL_SIZE", "20"))
 
 # Redis / Celery
 REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
@@ -23,6 +30,136 @@ REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 XON_API_KEY: str = os.getenv("XON_API_KEY", "")
 SHERLOCK_URL: str = os.getenv("SHERLOCK_DATA_URL", "https://raw.githubusercontent.com/sherlock-project/sherlock/master/sherlock_project/resources/data.json")
 SHERLOCK_SITE_LIMIT: int = int(os.getenv("SHERLOCK_SITE_LIMIT", "500"))
+# How long a compiled site catalog is trusted before it is revalidated (ETag / If-Modified-Since)
+SHERLOCK_REVALIDATE_SECONDS: int = int(os.getenv("SHERLOCK_REVALIDATE_SECONDS", "86400"))
+
+# Cluster-wide XON pacing (token bucket in Redis shared by all workers)
+XON_RATE_PER_SECOND: float = float(os.getenv("XON_RATE_PER_SECOND", "1.0"))
+XON_BUCKET_CAPACITY: int = int(os.getenv("XON_BUCKET_CAPACITY", "2"))
+XON_MAX_WAIT_SECONDS: float = float(os.getenv("XON_MAX_WAIT_SECONDS", "120"))
+XON_MAX_ATTEMPTS: int = int(os.getenv("XON_MAX_ATTEMPTS", "4"))
+XON_RETRY_AFTER_DEFAULT: float = float(os.getenv("XON_RETRY_AFTER_DEFAULT", "5"))
+
+# Breach lookup cache. Keys are HMAC-SHA256(salt, normalized email); clean answers are cached too.
+# The salt is its own secret (not SECRET_KEY, so rotating the JWT key leaves the cache alone);
+# with no salt the cache is disabled rather than keyed by a bare hash.
+BREACH_CACHE_SALT: str = os.getenv("BREACH_CACHE_SALT", "")
+BREACH_CACHE_HIT_TTL: int = int(os.getenv("BREACH_CACHE_HIT_TTL", "86400"))
+BREACH_CACHE_CLEAN_TTL: int = int(os.getenv("BREACH_CACHE_CLEAN_TTL", "21600"))
+BREACH_CACHE_LOCAL_SIZE: int = int(os.getenv("BREACH_CACHE_LOCAL_SIZE", "4096"))
+
+# Async DNS module. DNS_NAMESERVERS overrides the system resolver (e.g. a local stub server).
+DNS_NAMESERVERS: list[str] = [ns for ns in os.getenv("DNS_NAMESERVERS", "").split(",") if ns]
+DNS_PORT: int = int(os.getenv("DNS_PORT", "53"))
+DNS_TIMEOUT: float = float(os.getenv("DNS_TIMEOUT", "5.0"))
+DNS_CACHE_MAX_TTL: int = int(os.getenv("DNS_CACHE_MAX_TTL", "3600"))
+DNS_NEGATIVE_TTL: int = int(os.getenv("DNS_NEGATIVE_TTL", "300"))
+
+# Shared HTTP connection pool (one per worker process)
+HTTP_POOL_MAX_CONNECTIONS: int = int(os.getenv("HTTP_POOL_MAX_CONNECTIONS", "200"))
+HTTP_POOL_MAX_KEEPALIVE: int = int(os.getenv("HTTP_POOL_MAX_KEEPALIVE", "100"))
+HTTP_POOL_KEEPALIVE_EXPIRY: float = float(os.getenv("HTTP_POOL_KEEPALIVE_EXPIRY", "120"))
+HTTP_PER_HOST_CONNECTIONS: int = int(os.getenv("HTTP_PER_HOST_CONNECTIONS", "6"))
+HTTP2_ENABLED: bool = os.getenv("HTTP2_ENABLED", "true").strip().lower() in ("1", "true", "yes")
+
+# Probe scheduler (per worker process, shared fairly by all running scans).
+# The per-host cap is HTTP_PER_HOST_CONNECTIONS above.
+PROBE_GLOBAL_LIMIT: int = int(os.getenv("PROBE_GLOBAL_LIMIT", "64"))
+
+# Probe mode: "cheap" uses HEAD / early-terminating streamed reads, "full" buffers every page
+PROBE_MODE: str = os.getenv("PROBE_MODE", "cheap").strip().lower()
+PROBE_MAX_BODY_BYTES: int = int(os.getenv("PROBE_MAX_BODY_BYTES", "262144"))
+
+# Adaptive per-site timeouts (multiple of recorded p95 latency) and circuit breakers
+PROBE_TIMEOUT_MIN: float = float(os.getenv("PROBE_TIMEOUT_MIN", "3.0"))
+PROBE_TIMEOUT_MAX: float = float(os.getenv("PROBE_TIMEOUT_MAX", "15.0"))
+PROBE_TIMEOUT_MULTIPLIER: float = float(os.getenv("PROBE_TIMEOUT_MULTIPLIER", "2.0"))
+SITE_HEALTH_ALPHA: float = float(os.getenv("SITE_HEALTH_ALPHA", "0.2"))
+CIRCUIT_FAILURE_THRESHOLD: int = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "3"))
+CIRCUIT_COOLDOWN_SECONDS: int = int(os.getenv("CIRCUIT_COOLDOWN_SECONDS", "1800"))
+
+# Per-(username, site) probe result cache. Hits and misses expire independently.
+PROBE_CACHE_HIT_TTL: int = int(os.getenv("PROBE_CACHE_HIT_TTL", "86400"))
+PROBE_CACHE_MISS_TTL: int = int(os.getenv("PROBE_CACHE_MISS_TTL", "21600"))
+
+# Fan-out mode: each OSINT module runs as its own Celery task, merged by a chord.
+SCAN_FANOUT: bool = os.getenv("SCAN_FANOUT", "true").strip().lower() in ("1", "true", "yes")
+
+# Queue routing by estimated scan cost, so quick scans never wait behind Sherlock sweeps.
+# Whole scans go to SCAN_QUEUE_FAST / SCAN_QUEUE_SLOW; fan-out module tasks to the
+# matching SCAN_MODULE_QUEUE_* (kept apart because the asyncio worker only runs whole scans).
+SCAN_QUEUE_FAST: str = os.getenv("SCAN_QUEUE_FAST", "scans.fast")
+SCAN_QUEUE_SLOW: str = os.getenv("SCAN_QUEUE_SLOW", "scans.slow")
+SCAN_MODULE_QUEUE_FAST: str = os.getenv("SCAN_MODULE_QUEUE_FAST", "scan_modules.fast")
+SCAN_MODULE_QUEUE_SLOW: str = os.getenv("SCAN_MODULE_QUEUE_SLOW", "scan_modules.slow")
+# Estimated cost in "probe units": one breach lookup or one DNS sweep is ~1, one Sherlock site SCAN_COST_PER_PROBE
+SCAN_COST_EMAIL: float = float(os.getenv("SCAN_COST_EMAIL", "1"))
+SCAN_COST_DOMAIN: float = float(os.getenv("SCAN_COST_DOMAIN", "1"))
+SCAN_COST_PER_PROBE: float = float(os.getenv("SCAN_COST_PER_PROBE", "0.1"))
+SCAN_SLOW_COST_THRESHOLD: float = float(os.getenv("SCAN_SLOW_COST_THRESHOLD", "5"))
+
+# Asyncio-native worker (python -m backend.async_worker): scans run concurrently per process,
+# each inline on the worker's loop (never fanned out). It has its own queue so the Celery pools
+# never share messages with it; ASYNC_WORKER_ENABLED routes expensive scans there instead of
+# SCAN_QUEUE_SLOW.
+SCAN_QUEUE_ASYNC: str = os.getenv("SCAN_QUEUE_ASYNC", "scans.async")
+ASYNC_WORKER_ENABLED: bool = os.getenv("ASYNC_WORKER_ENABLED", "false").strip().lower() in ("1", "true", "yes")
+ASYNC_WORKER_CONCURRENCY: int = int(os.getenv("ASYNC_WORKER_CONCURRENCY", "32"))
+ASYNC_WORKER_QUEUES: list[str] = os.getenv("ASYNC_WORKER_QUEUES", SCAN_QUEUE_ASYNC).split(",")
+
+# Incremental findings: partial results are flushed every N hits or T seconds
+FINDINGS_FLUSH_BATCH: int = int(os.getenv("FINDINGS_FLUSH_BATCH", "10"))
+FINDINGS_FLUSH_INTERVAL: float = float(os.getenv("FINDINGS_FLUSH_INTERVAL", "2.0"))
+SCAN_STREAM_MAXLEN: int = int(os.getenv("SCAN_STREAM_MAXLEN", "1000"))
+SCAN_STREAM_TTL: int = int(os.getenv("SCAN_STREAM_TTL", "3600"))
+
+# Wall-clock budget per scan, shared by all its modules (0 disables). When it runs out,
+# unfinished work is cancelled and the scan completes as "Partial" with coverage stats.
+SCAN_TIME_BUDGET_SECONDS: int = int(os.getenv("SCAN_TIME_BUDGET_SECONDS", "300"))
+# Delay before a failed scan or module task is retried
+SCAN_RETRY_COUNTDOWN: int = int(os.getenv("SCAN_RETRY_COUNTDOWN", "30"))
+# Scan tasks are acked late, so a scan whose worker died is redelivered by the broker once
+# this many seconds pass without an ack. It must exceed a full scan plus a retry countdown
+# (or running scans get delivered twice) and stay below the stale sweep and the TTLs below.
+SCAN_VISIBILITY_TIMEOUT: int = int(os.getenv("SCAN_VISIBILITY_TIMEOUT", str(SCAN_TIME_BUDGET_SECONDS + SCAN_RETRY_COUNTDOWN + 120)))
+# Stale sweep: a started scan still Running after SCAN_STALE_MINUTES is failed. Scans still
+# waiting in the queue (large batches drain slowly) only after SCAN_QUEUED_MAX_HOURS.
+SCAN_STALE_MINUTES: int = int(os.getenv("SCAN_STALE_MINUTES", str(max(15, SCAN_VISIBILITY_TIMEOUT // 60 + 5))))
+SCAN_QUEUED_MAX_HOURS: int = int(os.getenv("SCAN_QUEUED_MAX_HOURS", "24"))
+
+# Single-flight: identical in-flight scans share one execution. The lock outlives a
+# redelivery (SCAN_VISIBILITY_TIMEOUT) plus the redelivered run, so followers stay attached.
+SINGLEFLIGHT_TTL: int = int(os.getenv("SINGLEFLIGHT_TTL", str(2 * SCAN_VISIBILITY_TIMEOUT)))
+
+# Bulk submission (POST /scans/batch)
+BATCH_MAX_TARGETS: int = int(os.getenv("BATCH_MAX_TARGETS", "10000"))
+BATCH_ENQUEUE_CHUNK: int = int(os.getenv("BATCH_ENQUEUE_CHUNK", "500"))
+
+# Incremental rescans (POST /scans with "rescan": true). Results of a recent base scan are
+# reused instead of looked up again (the age counts from when the data was actually observed,
+# not from the base scan's creation); only changes against the base are stored.
+RESCAN_BREACH_REUSE_SECONDS: int = int(os.getenv("RESCAN_BREACH_REUSE_SECONDS", "86400"))
+RESCAN_MISS_REUSE_SECONDS: int = int(os.getenv("RESCAN_MISS_REUSE_SECONDS", "21600"))
+# Longest chain of deltas before a rescan is stored in full again
+RESCAN_MAX_CHAIN: int = int(os.getenv("RESCAN_MAX_CHAIN", "10"))
+
+# Worker-side write-behind for scan results: partial writes coalesce and are flushed
+# in batched transactions; final writes wait for their batch to commit.
+WRITE_BEHIND_ENABLED: bool = os.getenv("WRITE_BEHIND_ENABLED", "true").strip().lower() in ("1", "true", "yes")
+WRITE_BEHIND_BATCH: int = int(os.getenv("WRITE_BEHIND_BATCH", "50"))
+WRITE_BEHIND_INTERVAL: float = float(os.getenv("WRITE_BEHIND_INTERVAL", "1.0"))
+WRITE_BEHIND_LINGER: float = float(os.getenv("WRITE_BEHIND_LINGER", "0.02"))
+WRITE_BEHIND_WAIT_TIMEOUT: float = float(os.getenv("WRITE_BEHIND_WAIT_TIMEOUT", "30"))
+
+# Sherlock checkpoints: finished probes of a scan are recorded so a retry only probes the rest
+# (kept well past SCAN_VISIBILITY_TIMEOUT so a redelivered scan still finds its checkpoint)
+SCAN_CHECKPOINT_TTL: int = int(os.getenv("SCAN_CHECKPOINT_TTL", str(max(3600, 4 * SCAN_VISIBILITY_TIMEOUT))))
+CHECKPOINT_FLUSH_EVERY: int = int(os.getenv("CHECKPOINT_FLUSH_EVERY", "25"))
+CHECKPOINT_FLUSH_INTERVAL: float = float(os.getenv("CHECKPOINT_FLUSH_INTERVAL", "2.0"))
+
+# GET /scans/stats: aggregates are cached per owner and invalidated whenever the owner's
+# scans change; the TTL only bounds how long a missed invalidation can linger
+SCAN_STATS_TTL: int = int(os.getenv("SCAN_STATS_TTL", "300"))
 
 # App
 ENV: str = os.getenv("ENV", "development").strip().lower()
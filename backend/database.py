@@ -1,10 +1,16 @@
 import pymysql
+import base64
 import json
 import logging
 from contextlib import contextmanager
-from typing import Optional
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
 from passlib.context import CryptContext
-from backend.config import DB_HOST, DB_PORT, DB_USER, DB_PASSWORD, DB_NAME
+from backend.config import DB_HOST, DB_PORT, DB_USER, DB_PASSWORD, DB_NAME, DB_POOL_SIZE, DB_POOL_TIMEOUT, DB_POOL_MAX_LIFETIME, DB_POOL_PING_INTERVAL
+from backend.config import SCAN_STALE_MINUTES, SCAN_QUEUED_MAX_HOURS
+from backend.db_pool import get_pool
+from backend.findings_delta import apply_delta
+from backend.scan_stats import invalidate_scan_stats
 
 logger = logging.getLogger("osint_api")
 
@@ -27,19 +33,25 @@ def hash_password(plain: str) -> str:
 def verify_password(plain: str, hashed: str) -> bool:
     return _pwd_context.verify(plain, hashed)
 
+def _connect():
+    return pymysql.connect(**DB_CONFIG)
+
 @contextmanager
 def get_db_cursor():
-    conn = pymysql.connect(**DB_CONFIG)
-    try:
-        with conn.cursor() as cursor:
-            yield cursor
-        conn.commit()
-    except Exception as e:
-        conn.rollback()
-        logger.error(f"Database error: {e}")
-        raise e
-    finally:
-        conn.close()
+    # Connections come from a per-process pool instead of a fresh handshake per call
+    pool = get_pool(_connect, DB_POOL_SIZE, DB_POOL_TIMEOUT, DB_POOL_MAX_LIFETIME, DB_POOL_PING_INTERVAL)
+    with pool.connection() as conn:
+        try:
+            with conn.cursor() as cursor:
+                yield cursor
+            conn.commit()
+        except Exception as e:
+            try:
+                conn.rollback()
+            except pymysql.err.Error:
+                pass
+            logger.error(f"Database error: {e}")
+            raise e
 
 def init_db():
     with get_db_cursor() as c:
@@ -61,10 +73,83 @@ def init_db():
                 status VARCHAR(50),
                 findings JSON,
                 risk_score INTEGER,
+                coverage JSON NULL,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 FOREIGN KEY (owner) REFERENCES users(username) ON DELETE CASCADE
             )
         """)
+        # Columns added after the first release (CREATE TABLE IF NOT EXISTS skips existing tables)
+        _ensure_column(c, "scans", "coverage", "JSON NULL")
+        _ensure_column(c, "scans", "batch_id", "VARCHAR(64) NULL")
+        _ensure_index(c, "scans", "idx_scans_batch", "(batch_id)")
+        # Incremental rescans: findings stay empty and `delta` holds the changes against base_scan_id
+        _ensure_column(c, "scans", "base_scan_id", "VARCHAR(255) NULL")
+        _ensure_column(c, "scans", "delta", "JSON NULL")
+        _ensure_index(c, "scans", "idx_scans_base", "(base_scan_id)")
+        # Scan history pages walk this index newest-first (see list_scans_query)
+        _ensure_index(c, "scans", "idx_scans_owner_created", "(owner, created_at, scan_id)")
+        # Finished scans store their findings as rows (see STORED_FULL / STORED_DELTA)
+        _ensure_column(c, "scans", "stored_as", "VARCHAR(8) NULL")
+        # Set when a worker picks the scan up; Running rows without it are still queued
+        _ensure_column(c, "scans", "started_at", "TIMESTAMP NULL")
+        c.execute("""
+            CREATE TABLE IF NOT EXISTS scan_findings (
+                id BIGINT AUTO_INCREMENT PRIMARY KEY,
+                scan_id VARCHAR(255) NOT NULL,
+                position INT NOT NULL,
+                delta_op VARCHAR(8) NULL,
+                type VARCHAR(32) NOT NULL,
+                source VARCHAR(64) NULL,
+                value MEDIUMTEXT NULL,
+                severity VARCHAR(16) NULL,
+                url TEXT NULL,
+                INDEX idx_findings_scan (scan_id),
+                INDEX idx_findings_type_severity (type, severity),
+                INDEX idx_findings_value (value(255)),
+                FOREIGN KEY (scan_id) REFERENCES scans(scan_id) ON DELETE CASCADE
+            )
+        """)
+        # Covering indexes for the GET /scans/stats aggregates (see SCAN_STATS_*_SQL)
+        _ensure_index(c, "scans", "idx_scans_owner_status_risk", "(owner, status, risk_score)")
+        _ensure_index(c, "scan_findings", "idx_findings_scan_type", "(scan_id, delta_op, type)")
+        # Long values (e.g. TXT records) are stored whole; value was VARCHAR(1024) at first
+        _ensure_column_type(c, "scan_findings", "value", "mediumtext", "MEDIUMTEXT NULL")
+    # Scans finished before scan_findings existed still hold their findings as JSON
+    backfill_scan_findings()
+
+def _ensure_column(c, table: str, column: str, definition: str) -> None:
+    c.execute(
+        """
+        SELECT COUNT(*) AS n FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s
+        """,
+        (table, column),
+    )
+    if not c.fetchone()["n"]:
+        c.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+def _ensure_column_type(c, table: str, column: str, data_type: str, definition: str) -> None:
+    c.execute(
+        """
+        SELECT DATA_TYPE AS data_type FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s
+        """,
+        (table, column),
+    )
+    row = c.fetchone()
+    if row and row["data_type"].lower() != data_type:
+        c.execute(f"ALTER TABLE {table} MODIFY {column} {definition}")
+
+def _ensure_index(c, table: str, index: str, columns: str) -> None:
+    c.execute(
+        """
+        SELECT COUNT(*) AS n FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s
+        """,
+        (table, index),
+    )
+    if not c.fetchone()["n"]:
+        c.execute(f"CREATE INDEX {index} ON {table} {columns}")
 
 # --- Authentication Logic ---
 
@@ -82,58 +167,535 @@ def create_user(username: str, password: str) -> None:
         )
 
 # --- Scan Logic ---
+# SQL and row post-processing below are shared with the async layer (database_async.py)
+
+# How a scan's findings are stored (scans.stored_as):
+#   NULL    - in the scans.findings JSON column: running scans, and scans finished before
+#             scan_findings existed until backfill_scan_findings migrates them (their
+#             rescans keep the changes in scans.delta)
+#   'full'  - one scan_findings row per finding
+#   'delta' - a rescan: scan_findings rows marked delta_op 'added' / 'removed' against base_scan_id
+STORED_FULL = "full"
+STORED_DELTA = "delta"
+
+INSERT_SCAN_SQL = """
+    INSERT INTO scans
+        (scan_id, owner, email, username, domain, status, findings, risk_score, base_scan_id)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+LATEST_SCAN_FOR_TARGET_SQL = """
+    SELECT scan_id, status, created_at FROM scans
+    WHERE owner = %s AND email <=> %s AND username <=> %s AND domain <=> %s
+      AND status IN ('Completed', 'Partial')
+    ORDER BY created_at DESC
+    LIMIT 1
+"""
+
+SELECT_SCAN_SQL = "SELECT * FROM scans WHERE scan_id = %s"
+
+CHAIN_ROW_SQL = "SELECT scan_id, stored_as, findings, delta, base_scan_id FROM scans WHERE scan_id = %s"
+
+def encode_scan_cursor(row: dict) -> str:
+    """Opaque `after` cursor pointing just past `row` in an owner's scan history."""
+    key = f"{row['created_at'].isoformat()}|{row['scan_id']}"
+    return base64.urlsafe_b64encode(key.encode()).decode().rstrip("=")
+
+def decode_scan_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Raises ValueError for a cursor encode_scan_cursor did not produce."""
+    try:
+        key = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, scan_id = key.split("|", 1)
+        return datetime.fromisoformat(created_at), scan_id
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+def list_scans_query(owner: str, limit: int, after: Optional[str] = None) -> Tuple[str, tuple]:
+    """
+    Keyset page of an owner's scans, newest first. Seeks on idx_scans_owner_created
+    instead of skipping rows, so deep pages cost the same as the first one.
+    Fetches one extra row to tell whether there is a next page (see scan_page).
+    """
+    if after is None:
+        seek, params = "", (owner,)
+    else:
+        created_at, scan_id = decode_scan_cursor(after)
+        seek, params = "AND (created_at < %s OR (created_at = %s AND scan_id < %s))", (owner, created_at, created_at, scan_id)
+    sql = f"""
+        SELECT scan_id, email, username, domain, status, risk_score, created_at
+        FROM scans WHERE owner = %s {seek}
+        ORDER BY created_at DESC, scan_id DESC
+        LIMIT %s
+    """
+    return sql, params + (limit + 1,)
+
+def scan_page(rows: list, limit: int) -> Tuple[list, Optional[str]]:
+    """Trims the look-ahead row of list_scans_query. Returns (scans, next_cursor)."""
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+    return rows[:limit], encode_scan_cursor(rows[limit - 1])
+
+DELTA_DEPENDENTS_SQL = """
+    SELECT scan_id, stored_as, findings, delta, base_scan_id FROM scans
+    WHERE base_scan_id = %s AND owner = %s
+      AND (stored_as = 'delta' OR (stored_as IS NULL AND delta IS NOT NULL))
+"""
+
+MATERIALIZE_SQL = "UPDATE scans SET findings = NULL, delta = NULL, stored_as = 'full' WHERE scan_id = %s"
+
+DELETE_SCAN_SQL = "DELETE FROM scans WHERE scan_id = %s AND owner = %s"
+
+# A late partial write (buffered flush, retried module) must never reopen a finished scan
+UPDATE_RUNNING_SQL = "UPDATE scans SET status = %s, findings = %s, risk_score = %s WHERE scan_id = %s AND status = 'Running'"
+
+UPDATE_FINAL_SQL = """
+    UPDATE scans
+    SET status = %s, risk_score = %s, coverage = %s, findings = NULL, delta = NULL, stored_as = %s
+    WHERE scan_id = %s
+"""
+
+# pymysql rewrites executemany on this statement into multi-row INSERTs
+INSERT_FINDINGS_SQL = """
+    INSERT INTO scan_findings (scan_id, position, delta_op, type, source, value, severity, url)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+def _in_list(n: int) -> str:
+    return ", ".join(["%s"] * n)
+
+def delete_findings_sql(n: int) -> str:
+    return f"DELETE FROM scan_findings WHERE scan_id IN ({_in_list(n)})"
+
+def chain_findings_sql(n: int) -> str:
+    return f"""
+        SELECT scan_id, delta_op, type, source, value, severity, url FROM scan_findings
+        WHERE scan_id IN ({_in_list(n)})
+        ORDER BY scan_id, position
+    """
+
+def insert_scan_params(scan_id: str, owner: str, email: Optional[str], username: Optional[str], domain: Optional[str], base_scan_id: Optional[str]) -> tuple:
+    return (scan_id, owner, email, username, domain, "Running", json.dumps([]), 0, base_scan_id)
+
+def _clip(value, size: int, column: str) -> Optional[str]:
+    """Fits a short label column (type, source, severity); finding values are never cut."""
+    if value is None:
+        return None
+    value = str(value)
+    if len(value) > size:
+        logger.warning(f"Truncating finding {column} to {size} characters: {value[:40]}...")
+    return value[:size]
+
+def finding_rows(scan_id: str, findings: list, delta: Optional[dict] = None) -> List[tuple]:
+    """scan_findings rows for a finished scan: its findings, or for a rescan its delta."""
+    if delta is None:
+        tagged = [(None, f) for f in findings]
+    else:
+        tagged = [("added", f) for f in delta.get("added", [])] + [("removed", f) for f in delta.get("removed", [])]
+    return [
+        (scan_id, position, op, _clip(f.get("type"), 32, "type") or "", _clip(f.get("source"), 64, "source"),
+         None if f.get("value") is None else str(f["value"]), _clip(f.get("severity"), 16, "severity"), f.get("url"))
+        for position, (op, f) in enumerate(tagged)
+    ]
+
+def _finding(row: dict) -> dict:
+    finding = {"type": row["type"], "source": row["source"], "value": row["value"], "severity": row["severity"]}
+    if row.get("url") is not None:
+        finding["url"] = row["url"]
+    return finding
+
+def _json(value):
+    return json.loads(value) if isinstance(value, str) else value
+
+def _is_delta(row: dict) -> bool:
+    if row.get("stored_as") is None:
+        return _json(row.get("delta")) is not None
+    return row["stored_as"] == STORED_DELTA
+
+def next_base_id(row: Optional[dict], chain: list, seen: set) -> Optional[str]:
+    """
+    One step of walking a rescan's delta chain: records `row` and returns the base
+    scan to fetch next, or None once `row` holds full findings (or is missing).
+    """
+    if row is None or not _is_delta(row) or row["scan_id"] in seen:
+        return None
+    seen.add(row["scan_id"])
+    chain.append(row)
+    return row["base_scan_id"]
+
+def stored_scan_ids(chain: list, root: Optional[dict]) -> list:
+    """Scans of a chain whose findings live in scan_findings (fetched in one query)."""
+    rows = chain + ([root] if root is not None else [])
+    return [r["scan_id"] for r in rows if r.get("stored_as") is not None]
+
+def resolve_chain(chain: list, root: Optional[dict], rows: list) -> Tuple[list, list]:
+    """
+    Full findings of the scan at the head of `chain` (or of `root` itself if the chain
+    is empty), given the scan_findings rows of every scan involved.
+    Returns (findings, deltas) where deltas[0], if any, is the scan's own change set.
+    """
+    by_scan = {}
+    for r in rows:
+        by_scan.setdefault(r["scan_id"], []).append(r)
+
+    deltas = []
+    for row in chain:
+        if row.get("stored_as") is None:
+            deltas.append(_json(row["delta"]))
+        else:
+            own = by_scan.get(row["scan_id"], [])
+            deltas.append({
+                "added": [_finding(r) for r in own if r["delta_op"] == "added"],
+                "removed": [_finding(r) for r in own if r["delta_op"] == "removed"],
+            })
+
+    # A missing base (should not happen, see delete_scan) leaves just the recorded additions
+    if root is None:
+        findings = []
+    elif root.get("stored_as") is None:
+        findings = _json(root.get("findings")) or []
+    else:
+        findings = [_finding(r) for r in by_scan.get(root["scan_id"], [])]
+    for delta in reversed(deltas):
+        findings = apply_delta(findings, delta)
+    return findings, deltas
+
+def decode_scan_row(row: Optional[dict]) -> Optional[dict]:
+    if row:
+        row["coverage"] = _json(row.get("coverage"))
+        row["delta"] = _json(row.get("delta"))
+    return row
+
+def findings_query(owner: str, type: Optional[str] = None, severity: Optional[str] = None, value: Optional[str] = None, source: Optional[str] = None, limit: int = 100) -> Tuple[str, tuple]:
+    """
+    Server-side filter over stored findings of `owner`'s scans, newest scan first.
+    Rescans contribute the findings they added (unchanged ones belong to their base).
+    """
+    clauses, params = ["s.owner = %s", "(f.delta_op IS NULL OR f.delta_op = 'added')"], [owner]
+    for column, wanted in (("type", type), ("severity", severity), ("value", value), ("source", source)):
+        if wanted is not None:
+            clauses.append(f"f.{column} = %s")
+            params.append(wanted)
+    sql = f"""
+        SELECT f.scan_id, f.type, f.source, f.value, f.severity, f.url, s.created_at
+        FROM scan_findings f JOIN scans s ON s.scan_id = f.scan_id
+        WHERE {" AND ".join(clauses)}
+        ORDER BY s.created_at DESC, f.scan_id, f.position
+        LIMIT %s
+    """
+    return sql, tuple(params) + (limit,)
+
+FINDINGS_SUMMARY_SQL = """
+    SELECT f.type, f.severity, COUNT(*) AS findings, COUNT(DISTINCT f.scan_id) AS scans
+    FROM scan_findings f JOIN scans s ON s.scan_id = f.scan_id
+    WHERE s.owner = %s AND (f.delta_op IS NULL OR f.delta_op = 'added')
+    GROUP BY f.type, f.severity
+"""
+
+# GET /scans/stats. Risk is aggregated over finished scans only (Running ones sit at their
+# partial score). Scores are 0-100, so the histogram has at most 101 rows and percentiles
+# are read off it rather than sorting every scan.
+SCAN_STATS_STATUS_SQL = "SELECT status, COUNT(*) AS n FROM scans WHERE owner = %s GROUP BY status"
+
+SCAN_STATS_RISK_SQL = """
+    SELECT risk_score, COUNT(*) AS n FROM scans
+    WHERE owner = %s AND status IN ('Completed', 'Partial')
+    GROUP BY risk_score
+    ORDER BY risk_score
+"""
+
+# Counts every scan's resolved findings, as resolve_chain would: each scan is walked
+# back through its delta chain to the full scan it starts from, whose rows count +1,
+# 'added' rows +1 and 'removed' rows -1. The depth guard only stops a corrupt cycle.
+SCAN_STATS_TYPES_SQL = """
+    WITH RECURSIVE chain (scan_id, stored_as, base_scan_id, depth) AS (
+        SELECT scan_id, stored_as, base_scan_id, 0 FROM scans WHERE owner = %s
+        UNION ALL
+        SELECT b.scan_id, b.stored_as, b.base_scan_id, chain.depth + 1
+        FROM chain JOIN scans b ON b.scan_id = chain.base_scan_id
+        WHERE chain.stored_as = 'delta' AND chain.depth < 100
+    )
+    SELECT f.type, SUM(CASE f.delta_op WHEN 'removed' THEN -1 ELSE 1 END) AS n
+    FROM chain JOIN scan_findings f ON f.scan_id = chain.scan_id
+    GROUP BY f.type
+    HAVING n > 0
+"""
+
+STATS_PERCENTILES = (50, 90, 99)
 
-def create_scan_entry(scan_id: str, owner: str, email: Optional[str] = None, username: Optional[str] = None, domain: Optional[str] = None) -> None:
+def scan_stats_from_rows(status_rows: list, risk_rows: list, type_rows: list) -> dict:
+    by_status = {row["status"]: int(row["n"]) for row in status_rows}
+    scored = sum(int(row["n"]) for row in risk_rows)
+
+    percentiles, seen = {}, 0
+    pending = list(STATS_PERCENTILES)
+    for row in risk_rows:
+        seen += int(row["n"])
+        # Nearest-rank percentile: the first score covering p% of finished scans
+        while pending and seen * 100 >= pending[0] * scored:
+            percentiles[f"p{pending.pop(0)}"] = row["risk_score"]
+
+    return {
+        "total": sum(by_status.values()),
+        "by_status": by_status,
+        "risk": {
+            "scans": scored,
+            "average": round(sum(row["risk_score"] * int(row["n"]) for row in risk_rows) / scored, 1) if scored else None,
+            **{f"p{p}": percentiles.get(f"p{p}") for p in STATS_PERCENTILES},
+        },
+        "findings_by_type": {row["type"]: int(row["n"]) for row in type_rows},
+    }
+
+def create_scan_entry(scan_id: str, owner: str, email: Optional[str] = None, username: Optional[str] = None, domain: Optional[str] = None, base_scan_id: Optional[str] = None) -> None:
+    with get_db_cursor() as c:
+        c.execute(INSERT_SCAN_SQL, insert_scan_params(scan_id, owner, email, username, domain, base_scan_id))
+    invalidate_scan_stats(owner)
+
+def get_latest_scan_for_target(owner: str, email: Optional[str], username: Optional[str], domain: Optional[str]) -> Optional[dict]:
+    """Most recent finished scan of the same target by the same owner (the base for a rescan)."""
+    with get_db_cursor() as c:
+        c.execute(LATEST_SCAN_FOR_TARGET_SQL, (owner, email, username, domain))
+        return c.fetchone()
+
+def create_scan_entries(owner: str, batch_id: str, targets: list, chunk_size: int = 1000) -> None:
+    """
+    Inserts many scans in one transaction. `targets` holds dicts with scan_id, email,
+    username and domain. pymysql turns executemany on an INSERT ... VALUES into
+    multi-row INSERTs, so each chunk is a single statement.
+    """
+    empty = json.dumps([])
+    rows = [
+        (t["scan_id"], owner, t.get("email"), t.get("username"), t.get("domain"), "Running", empty, 0, batch_id)
+        for t in targets
+    ]
+    with get_db_cursor() as c:
+        for start in range(0, len(rows), chunk_size):
+            c.executemany(
+                """
+                INSERT INTO scans
+                    (scan_id, owner, email, username, domain, status, findings, risk_score, batch_id)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+                """,
+                rows[start:start + chunk_size],
+            )
+    invalidate_scan_stats(owner)
+
+def get_batch_progress(batch_id: str, owner: str) -> dict:
+    """Per-status counts for a batch, or an empty dict if the batch does not belong to `owner`."""
     with get_db_cursor() as c:
         c.execute(
             """
-            INSERT INTO scans 
-                (scan_id, owner, email, username, domain, status, findings, risk_score)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+            SELECT CASE WHEN status = 'Running' AND started_at IS NULL THEN 'Queued' ELSE status END AS status,
+                   COUNT(*) AS n, AVG(risk_score) AS avg_risk
+            FROM scans WHERE batch_id = %s AND owner = %s
+            GROUP BY 1
             """,
-            (scan_id, owner, email, username, domain, "Running", json.dumps([]), 0),
+            (batch_id, owner),
+        )
+        return {row["status"]: {"count": row["n"], "avg_risk": float(row["avg_risk"] or 0)} for row in c.fetchall()}
+
+def _write_results(c, updates: list) -> List[str]:
+    """
+    Running scans keep their partial findings in the JSON column (cheap to overwrite);
+    finished scans get their findings, or rescan delta, as scan_findings rows.
+    Returns the owners of the finished scans, whose stats change with them.
+    """
+    running = [u for u in updates if u.get("status", "Completed") == "Running"]
+    final = [u for u in updates if u.get("status", "Completed") != "Running"]
+    if running:
+        c.executemany(UPDATE_RUNNING_SQL, [
+            ("Running", json.dumps(u["findings"]), u["risk_score"], u["scan_id"]) for u in running
+        ])
+    if not final:
+        return []
+    # Lock the finished scans' rows first. A scan deleted while it ran (DELETE /scans/{id},
+    # logout) has nowhere to store its results, and a delete racing this write waits for it.
+    scan_ids = [u["scan_id"] for u in final]
+    c.execute(f"SELECT scan_id, owner, base_scan_id FROM scans WHERE scan_id IN ({_in_list(len(scan_ids))}) FOR UPDATE", scan_ids)
+    locked = {row["scan_id"]: row for row in c.fetchall()}
+    owners = {scan_id: row["owner"] for scan_id, row in locked.items()}
+    gone = [scan_id for scan_id in scan_ids if scan_id not in owners]
+    if gone:
+        logger.info(f"Dropping results of {len(gone)} scans deleted while running: {', '.join(gone)}")
+        final = [u for u in final if u["scan_id"] in owners]
+        if not final:
+            return []
+    final = _without_orphaned_deltas(c, final, locked)
+    c.executemany(UPDATE_FINAL_SQL, [
+        (
+            u.get("status", "Completed"),
+            u["risk_score"],
+            json.dumps(u["coverage"]) if u.get("coverage") else None,
+            STORED_DELTA if u.get("delta") is not None else STORED_FULL,
+            u["scan_id"],
         )
+        for u in final
+    ])
+    scan_ids = [u["scan_id"] for u in final]
+    c.execute(delete_findings_sql(len(scan_ids)), scan_ids)
+    rows = [row for u in final for row in finding_rows(u["scan_id"], u["findings"], u.get("delta"))]
+    if rows:
+        c.executemany(INSERT_FINDINGS_SQL, rows)
+    return sorted(set(owners.values()))
+
+def _without_orphaned_deltas(c, final: list, locked: dict) -> list:
+    """
+    A running rescan is not materialized when its base is deleted (delete_scan only
+    rewrites finished dependents), so its delta would point at nothing. Such rescans
+    are stored in full instead; the bases that remain stay locked until commit.
+    """
+    bases = sorted({locked[u["scan_id"]]["base_scan_id"] for u in final
+                    if u.get("delta") is not None and locked[u["scan_id"]]["base_scan_id"]})
+    alive = set()
+    if bases:
+        c.execute(f"SELECT scan_id FROM scans WHERE scan_id IN ({_in_list(len(bases))}) FOR UPDATE", bases)
+        alive = {row["scan_id"] for row in c.fetchall()}
+    kept = []
+    for u in final:
+        if u.get("delta") is not None and locked[u["scan_id"]]["base_scan_id"] not in alive:
+            logger.info(f"Base of rescan {u['scan_id']} was deleted while it ran, storing it in full.")
+            u = {**u, "delta": None}
+        kept.append(u)
+    return kept
+
+def update_scan_result(scan_id: str, findings: list, risk_score: int, status: str = "Completed", coverage: Optional[dict] = None, delta: Optional[dict] = None) -> None:
+    """
+    With a `delta` (rescans), only the changes against the base scan are stored, unless
+    the base has been deleted meanwhile; `findings` must still be the full list.
+    """
+    with get_db_cursor() as c:
+        owners = _write_results(c, [{
+            "scan_id": scan_id, "findings": findings, "risk_score": risk_score,
+            "status": status, "coverage": coverage, "delta": delta,
+        }])
+    invalidate_scan_stats(*owners)
 
-def update_scan_result(scan_id: str, findings: list, risk_score: int, status: str = "Completed") -> None:
+def update_scan_results(updates: list) -> None:
+    """
+    Applies many update_scan_result calls in one transaction. Each update is a dict
+    of update_scan_result's keyword arguments.
+    """
+    if not updates:
+        return
+    with get_db_cursor() as c:
+        owners = _write_results(c, updates)
+    invalidate_scan_stats(*owners)
+
+def backfill_scan_findings(batch_size: int = 500) -> int:
+    """
+    Moves finished scans stored before scan_findings existed to rows: their JSON findings,
+    or for a rescan its JSON delta. Each batch is its own transaction and migrated scans
+    are not selected again, so this is safe to run on every startup. Returns the count.
+    """
+    migrated, owners = 0, set()
+    while True:
+        with get_db_cursor() as c:
+            c.execute(
+                """
+                SELECT scan_id, owner, findings, delta FROM scans
+                WHERE stored_as IS NULL AND status <> 'Running'
+                LIMIT %s
+                FOR UPDATE
+                """,
+                (batch_size,),
+            )
+            legacy = c.fetchall()
+            if not legacy:
+                break
+            scan_ids = [row["scan_id"] for row in legacy]
+            c.execute(delete_findings_sql(len(scan_ids)), scan_ids)
+            rows, stored_as = [], []
+            for row in legacy:
+                delta = _json(row["delta"])
+                rows.extend(finding_rows(row["scan_id"], _json(row["findings"]) or [], delta))
+                stored_as.append((STORED_DELTA if delta is not None else STORED_FULL, row["scan_id"]))
+            if rows:
+                c.executemany(INSERT_FINDINGS_SQL, rows)
+            c.executemany("UPDATE scans SET stored_as = %s, findings = NULL, delta = NULL WHERE scan_id = %s", stored_as)
+        migrated += len(legacy)
+        owners.update(row["owner"] for row in legacy)
+    if migrated:
+        logger.info(f"Backfilled scan_findings for {migrated} scans stored before it existed.")
+        invalidate_scan_stats(*owners)
+    return migrated
+
+def _resolve_findings(c, row: dict) -> Tuple[list, list]:
+    """Full findings of a scan row, replaying the deltas of its base chain. Returns (findings, deltas)."""
+    chain, seen = [], set()
+    while (base_id := next_base_id(row, chain, seen)) is not None:
+        c.execute(CHAIN_ROW_SQL, (base_id,))
+        row = c.fetchone()
+    scan_ids = stored_scan_ids(chain, row)
+    rows = []
+    if scan_ids:
+        c.execute(chain_findings_sql(len(scan_ids)), scan_ids)
+        rows = c.fetchall()
+    return resolve_chain(chain, row, rows)
+
+def materialize_statements(scan_id: str, findings: list) -> List[Tuple[str, Any, bool]]:
+    """
+    (sql, params, executemany) steps that rewrite a rescan with its full findings
+    (its base is about to go away). Shared by the sync and async delete paths.
+    """
+    steps = [(delete_findings_sql(1), (scan_id,), False)]
+    rows = finding_rows(scan_id, findings)
+    if rows:
+        steps.append((INSERT_FINDINGS_SQL, rows, True))
+    steps.append((MATERIALIZE_SQL, (scan_id,), False))
+    return steps
+
+def _materialize(c, scan_id: str, findings: list) -> None:
+    for sql, params, many in materialize_statements(scan_id, findings):
+        (c.executemany if many else c.execute)(sql, params)
+
+def get_base_scan(scan_id: str) -> Optional[dict]:
+    """Status, coverage and full findings of a rescan's base, plus its delta chain length."""
     with get_db_cursor() as c:
         c.execute(
-            """
-            UPDATE scans
-            SET status = %s, findings = %s, risk_score = %s
-            WHERE scan_id = %s
-            """,
-            (status, json.dumps(findings), risk_score, scan_id),
+            "SELECT scan_id, status, coverage, stored_as, findings, delta, base_scan_id FROM scans WHERE scan_id = %s",
+            (scan_id,),
         )
+        row = c.fetchone()
+        if not row:
+            return None
+        findings, deltas = _resolve_findings(c, row)
+        return {
+            "scan_id": scan_id, "status": row["status"], "coverage": _json(row["coverage"]) or {},
+            "findings": findings, "chain": len(deltas),
+        }
 
 def get_scan_result(scan_id: str) -> dict:
     with get_db_cursor() as c:
-        c.execute("SELECT * FROM scans WHERE scan_id = %s", (scan_id,))
-        row = c.fetchone()
-        if row and isinstance(row.get("findings"), str):
-            row["findings"] = json.loads(row["findings"])
+        c.execute(SELECT_SCAN_SQL, (scan_id,))
+        row = decode_scan_row(c.fetchone())
+        if row:
+            row["findings"], deltas = _resolve_findings(c, row)
+            row["delta"] = deltas[0] if deltas else None
         return row
 
-def get_scans_by_owner(owner: str, limit: int = 20, offset: int = 0) -> list:
+def get_scans_by_owner(owner: str, limit: int = 20, after: Optional[str] = None) -> Tuple[list, Optional[str]]:
+    """One page of an owner's scans and the cursor of the next page (None on the last)."""
+    sql, params = list_scans_query(owner, limit, after)
     with get_db_cursor() as c:
-        c.execute(
-            """
-            SELECT scan_id, email, username, domain, status, risk_score, created_at
-            FROM scans WHERE owner = %s
-            ORDER BY created_at DESC
-            LIMIT %s OFFSET %s
-            """,
-            (owner, limit, offset),
-        )
-        return c.fetchall()
+        c.execute(sql, params)
+        return scan_page(c.fetchall(), limit)
 
 def delete_scan(scan_id: str, owner: str) -> bool:
-    """Deletes a single scan if the requesting user is the owner."""
+    """
+    Deletes a single scan if the requesting user is the owner. Rescans stored as a
+    delta against it are first rewritten with their full findings.
+    """
     with get_db_cursor() as c:
-        c.execute(
-            "DELETE FROM scans WHERE scan_id = %s AND owner = %s",
-            (scan_id, owner),
-        )
-        return c.rowcount > 0
+        c.execute(DELTA_DEPENDENTS_SQL, (scan_id, owner))
+        for dependent in c.fetchall():
+            findings, _ = _resolve_findings(c, dependent)
+            _materialize(c, dependent["scan_id"], findings)
+        # scan_findings rows go with it (ON DELETE CASCADE)
+        c.execute(DELETE_SCAN_SQL, (scan_id, owner))
+        deleted = c.rowcount > 0
+    if deleted:
+        invalidate_scan_stats(owner)
+    return deleted
 
 def delete_all_scans_by_owner(owner: str) -> int:
     """
@@ -147,16 +709,40 @@ def delete_all_scans_by_owner(owner: str) -> int:
             "DELETE FROM scans WHERE owner = %s",
             (owner,),
         )
-        return c.rowcount
+        deleted = c.rowcount
+    invalidate_scan_stats(owner)
+    return deleted
+
+def mark_scan_started(scan_id: str) -> None:
+    """Records when a worker first picked the scan up; the stale sweep counts from there."""
+    with get_db_cursor() as c:
+        c.execute("UPDATE scans SET started_at = NOW() WHERE scan_id = %s AND started_at IS NULL", (scan_id,))
 
-def mark_stale_scans_failed(minutes: int = 15) -> int:
+def mark_stale_scans_failed(minutes: int = SCAN_STALE_MINUTES, queued_hours: int = SCAN_QUEUED_MAX_HOURS) -> int:
+    """
+    Fails scans whose worker has been at it for more than `minutes`. Scans no worker has
+    started yet are left alone (a big batch may queue for hours) unless their message has
+    been waiting longer than `queued_hours`, i.e. it was most likely lost.
+    """
+    error_finding = [{"type": "error", "source": "System", "value": "Scan timed out or worker crashed.", "severity": "HIGH"}]
     with get_db_cursor() as c:
         c.execute(
             """
-            UPDATE scans
-            SET status = 'Failed', findings = %s, risk_score = 0
-            WHERE status = 'Running' AND created_at < DATE_SUB(NOW(), INTERVAL %s MINUTE)
+            SELECT scan_id FROM scans
+            WHERE status = 'Running' AND (
+                started_at < DATE_SUB(NOW(), INTERVAL %s MINUTE)
+                OR (started_at IS NULL AND created_at < DATE_SUB(NOW(), INTERVAL %s HOUR))
+            )
+            FOR UPDATE
             """,
-            (json.dumps([{"type": "error", "source": "System", "value": "Scan timed out or worker crashed.", "severity": "HIGH"}]), minutes)
+            (minutes, queued_hours),
         )
-        return c.rowcount
\ No newline at end of file
+        stale = [row["scan_id"] for row in c.fetchall()]
+        owners = []
+        if stale:
+            owners = _write_results(c, [
+                {"scan_id": scan_id, "findings": error_finding, "risk_score": 0, "status": "Failed"}
+                for scan_id in stale
+            ])
+    invalidate_scan_stats(*owners)
+    return len(stale)
\ No newline at end of file
@@ -0,0 +1,175 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Optional, Tuple
+
+import aiomysql
+
+from backend.config import DB_HOST, DB_PORT, DB_USER, DB_PASSWORD, DB_NAME, DB_ASYNC_POOL_SIZE, DB_POOL_MAX_LIFETIME
+from backend.database import (
+    INSERT_SCAN_SQL,
+    LATEST_SCAN_FOR_TARGET_SQL,
+    SELECT_SCAN_SQL,
+    CHAIN_ROW_SQL,
+    DELTA_DEPENDENTS_SQL,
+    DELETE_SCAN_SQL,
+    FINDINGS_SUMMARY_SQL,
+    SCAN_STATS_STATUS_SQL,
+    SCAN_STATS_RISK_SQL,
+    SCAN_STATS_TYPES_SQL,
+    chain_findings_sql,
+    materialize_statements,
+    insert_scan_params,
+    findings_query,
+    list_scans_query,
+    scan_page,
+    scan_stats_from_rows,
+    next_base_id,
+    stored_scan_ids,
+    resolve_chain,
+    decode_scan_row,
+)
+from backend.scan_stats import invalidate_scan_stats_async
+
+logger = logging.getLogger("osint_api")
+
+# Async counterparts of the scan queries the API routes use, so a route never blocks
+# the event loop (or a threadpool thread) on MySQL. SQL and row handling come from
+# database.py; the pool is bound to the loop that created it.
+_pool: Optional[aiomysql.Pool] = None
+_pool_loop = None
+
+
+async def get_async_pool() -> aiomysql.Pool:
+    global _pool, _pool_loop
+    loop = asyncio.get_running_loop()
+    if _pool is None or _pool_loop is not loop:
+        _pool = await aiomysql.create_pool(
+            host=DB_HOST,
+            port=DB_PORT,
+            user=DB_USER,
+            password=DB_PASSWORD,
+            db=DB_NAME,
+            minsize=1,
+            maxsize=DB_ASYNC_POOL_SIZE,
+            pool_recycle=int(DB_POOL_MAX_LIFETIME),
+            cursorclass=aiomysql.DictCursor,
+            autocommit=False,
+        )
+        _pool_loop = loop
+    return _pool
+
+
+async def close_async_pool() -> None:
+    global _pool, _pool_loop
+    if _pool is not None:
+        _pool.close()
+        await _pool.wait_closed()
+    _pool = None
+    _pool_loop = None
+
+
+@asynccontextmanager
+async def get_async_db_cursor():
+    pool = await get_async_pool()
+    async with pool.acquire() as conn:
+        try:
+            async with conn.cursor() as cursor:
+                yield cursor
+            await conn.commit()
+        except Exception as e:
+            try:
+                await conn.rollback()
+            except Exception:
+                pass
+            logger.error(f"Database error: {e}")
+            raise e
+
+
+async def _resolve_findings(c, row: dict) -> Tuple[list, list]:
+    chain, seen = [], set()
+    while (base_id := next_base_id(row, chain, seen)) is not None:
+        await c.execute(CHAIN_ROW_SQL, (base_id,))
+        row = await c.fetchone()
+    scan_ids = stored_scan_ids(chain, row)
+    rows = []
+    if scan_ids:
+        await c.execute(chain_findings_sql(len(scan_ids)), scan_ids)
+        rows = await c.fetchall()
+    return resolve_chain(chain, row, rows)
+
+
+async def create_scan_entry(scan_id: str, owner: str, email: Optional[str] = None, username: Optional[str] = None, domain: Optional[str] = None, base_scan_id: Optional[str] = None) -> None:
+    async with get_async_db_cursor() as c:
+        await c.execute(INSERT_SCAN_SQL, insert_scan_params(scan_id, owner, email, username, domain, base_scan_id))
+    await invalidate_scan_stats_async(owner)
+
+
+async def get_latest_scan_for_target(owner: str, email: Optional[str], username: Optional[str], domain: Optional[str]) -> Optional[dict]:
+    async with get_async_db_cursor() as c:
+        await c.execute(LATEST_SCAN_FOR_TARGET_SQL, (owner, email, username, domain))
+        return await c.fetchone()
+
+
+async def get_scan_result(scan_id: str) -> dict:
+    async with get_async_db_cursor() as c:
+        await c.execute(SELECT_SCAN_SQL, (scan_id,))
+        row = decode_scan_row(await c.fetchone())
+        if row:
+            row["findings"], deltas = await _resolve_findings(c, row)
+            row["delta"] = deltas[0] if deltas else None
+        return row
+
+
+async def get_scans_by_owner(owner: str, limit: int = 20, after: Optional[str] = None) -> Tuple[list, Optional[str]]:
+    sql, params = list_scans_query(owner, limit, after)
+    async with get_async_db_cursor() as c:
+        await c.execute(sql, params)
+        return scan_page(await c.fetchall(), limit)
+
+
+async def delete_scan(scan_id: str, owner: str) -> bool:
+    """See database.delete_scan: delta dependents are rewritten in full first."""
+    async with get_async_db_cursor() as c:
+        await c.execute(DELTA_DEPENDENTS_SQL, (scan_id, owner))
+        for dependent in await c.fetchall():
+            findings, _ = await _resolve_findings(c, dependent)
+            for sql, params, many in materialize_statements(dependent["scan_id"], findings):
+                await (c.executemany if many else c.execute)(sql, params)
+        await c.execute(DELETE_SCAN_SQL, (scan_id, owner))
+        deleted = c.rowcount > 0
+    if deleted:
+        await invalidate_scan_stats_async(owner)
+    return deleted
+
+
+async def search_findings(owner: str, type: Optional[str] = None, severity: Optional[str] = None, value: Optional[str] = None, source: Optional[str] = None, limit: int = 100) -> list:
+    sql, params = findings_query(owner, type, severity, value, source, limit)
+    async with get_async_db_cursor() as c:
+        await c.execute(sql, params)
+        return list(await c.fetchall())
+
+
+async def get_findings_summary(owner: str) -> list:
+    """Finding counts per (type, severity) across the owner's scans."""
+    async with get_async_db_cursor() as c:
+        await c.execute(FINDINGS_SUMMARY_SQL, (owner,))
+        return list(await c.fetchall())
+
+
+async def get_scan_stats(owner: str) -> dict:
+    """Uncached dashboard aggregates; the route serves them through scan_stats.cached_scan_stats."""
+    async with get_async_db_cursor() as c:
+        await c.execute(SCAN_STATS_STATUS_SQL, (owner,))
+        status_rows = await c.fetchall()
+        await c.execute(SCAN_STATS_RISK_SQL, (owner,))
+        risk_rows = await c.fetchall()
+        await c.execute(SCAN_STATS_TYPES_SQL, (owner,))
+        type_rows = await c.fetchall()
+    return scan_stats_from_rows(status_rows, risk_rows, type_rows)
+
+
+def async_pool_stats() -> dict:
+    if _pool is None:
+        return {}
+    return {"max_size": _pool.maxsize, "open": _pool.size, "idle": _pool.freesize, "in_use": _pool.size - _pool.freesize}
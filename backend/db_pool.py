@@ -0,0 +1,166 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Deque, Dict, Iterator, Optional, Tuple
+
+import pymysql
+
+logger = logging.getLogger("osint_api")
+
+
+class PoolTimeout(Exception):
+    """No connection became free within the pool's wait time."""
+
+
+class ConnectionPool:
+    """
+    Thread-safe, bounded pool of pymysql connections.
+
+    - at most `max_size` connections are open; callers wait up to `timeout` for one,
+    - idle connections are pinged before reuse if unused for `ping_interval` seconds,
+    - connections older than `max_lifetime` are closed and replaced (recycling),
+    - a connection whose use raised a connection-level error is discarded.
+    """
+
+    def __init__(self, factory: Callable[[], pymysql.connections.Connection], max_size: int, timeout: float, max_lifetime: float, ping_interval: float):
+        self._factory = factory
+        self._max_size = max(1, max_size)
+        self._timeout = timeout
+        self._max_lifetime = max_lifetime
+        self._ping_interval = ping_interval
+        # Idle connections as (connection, created_at, last_used); LIFO keeps the warm ones busy
+        self._idle: Deque[Tuple[pymysql.connections.Connection, float, float]] = deque()
+        self._created: Dict[int, float] = {}
+        self._cond = threading.Condition()
+        self._open = 0
+        self._waiting = 0
+        self._checkouts = 0
+        self._timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _discard(self, conn) -> None:
+        self._created.pop(id(conn), None)
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def acquire(self) -> pymysql.connections.Connection:
+        started = time.monotonic()
+        with self._cond:
+            self._waiting += 1
+            try:
+                while not self._idle and self._open >= self._max_size:
+                    remaining = self._timeout - (time.monotonic() - started)
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeout(f"No database connection free after {self._timeout}s")
+                    self._cond.wait(remaining)
+                entry = self._idle.pop() if self._idle else None
+                if entry is None:
+                    # Reserve the slot now, connect outside the lock
+                    self._open += 1
+            finally:
+                self._waiting -= 1
+
+        conn = self._checkout(entry)
+        waited = time.monotonic() - started
+        with self._cond:
+            self._checkouts += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+        return conn
+
+    def _checkout(self, entry) -> pymysql.connections.Connection:
+        if entry is not None:
+            conn, created_at, last_used = entry
+            now = time.monotonic()
+            # One already closed while idle is replaced without trying to ping it
+            if now - created_at < self._max_lifetime and conn.open:
+                if now - last_used < self._ping_interval:
+                    return conn
+                try:
+                    conn.ping(reconnect=False)
+                    return conn
+                except Exception as e:
+                    logger.info(f"Dropping dead pooled database connection: {e}")
+            # Expired or dead: replace it, keeping its slot
+            self._discard(conn)
+        try:
+            conn = self._factory()
+        except Exception:
+            with self._cond:
+                self._open -= 1
+                self._cond.notify()
+            raise
+        self._created[id(conn)] = time.monotonic()
+        return conn
+
+    def release(self, conn: pymysql.connections.Connection, broken: bool = False) -> None:
+        with self._cond:
+            created_at = self._created.get(id(conn))
+            if broken or created_at is None or not conn.open:
+                self._discard(conn)
+                self._open -= 1
+            else:
+                self._idle.append((conn, created_at, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self) -> Iterator[pymysql.connections.Connection]:
+        conn = self.acquire()
+        broken = False
+        try:
+            yield conn
+        except (pymysql.err.OperationalError, pymysql.err.InterfaceError):
+            broken = True
+            raise
+        finally:
+            self.release(conn, broken)
+
+    def close(self) -> None:
+        with self._cond:
+            while self._idle:
+                conn, _, _ = self._idle.pop()
+                self._discard(conn)
+                self._open -= 1
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "max_size": self._max_size,
+                "open": self._open,
+                "idle": len(self._idle),
+                "in_use": self._open - len(self._idle),
+                "waiting": self._waiting,
+                "checkouts": self._checkouts,
+                "timeouts": self._timeouts,
+                "avg_checkout_ms": round(self._wait_total / self._checkouts * 1000, 2) if self._checkouts else 0.0,
+                "max_checkout_ms": round(self._wait_max * 1000, 2),
+            }
+
+
+# One pool per process: a forked worker must not share its parent's sockets
+_pool: Optional[ConnectionPool] = None
+_owner_pid: Optional[int] = None
+_lock = threading.Lock()
+
+
+def get_pool(factory: Callable[[], pymysql.connections.Connection], max_size: int, timeout: float, max_lifetime: float, ping_interval: float) -> ConnectionPool:
+    global _pool, _owner_pid
+    with _lock:
+        if _pool is None or _owner_pid != os.getpid():
+            _pool = ConnectionPool(factory, max_size, timeout, max_lifetime, ping_interval)
+            _owner_pid = os.getpid()
+        return _pool
+
+
+def pool_stats() -> dict:
+    """Metrics of this process's pool (empty before its first use)."""
+    if _pool is None or _owner_pid != os.getpid():
+        return {}
+    return _pool.stats()
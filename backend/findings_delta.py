@@ -0,0 +1,26 @@
+from typing import Dict, List
+
+# Rescans store only what changed against their base scan:
+#   {"added": [findings not in the base], "removed": [base findings no longer present]}
+# Two findings are the same if these fields match (severity may legitimately change,
+# in which case the finding shows up as removed + added).
+_IDENTITY = ("type", "source", "value", "url", "severity")
+
+
+def finding_key(finding: Dict) -> tuple:
+    return tuple(finding.get(field) for field in _IDENTITY)
+
+
+def compute_delta(base: List[Dict], current: List[Dict]) -> Dict[str, List[Dict]]:
+    base_keys = {finding_key(f) for f in base}
+    current_keys = {finding_key(f) for f in current}
+    return {
+        "added": [f for f in current if finding_key(f) not in base_keys],
+        "removed": [f for f in base if finding_key(f) not in current_keys],
+    }
+
+
+def apply_delta(base: List[Dict], delta: Dict[str, List[Dict]]) -> List[Dict]:
+    """Full findings of a rescan: the base minus removed findings, plus added ones."""
+    removed = {finding_key(f) for f in delta.get("removed", [])}
+    return [f for f in base if finding_key(f) not in removed] + list(delta.get("added", []))
@@ -1,14 +1,14 @@
 import uuid
 import logging
 from contextlib import asynccontextmanager
-from typing import Optional
+from typing import List, Optional
 import tempfile
 import os
 from pathlib import Path
 
 from fastapi import FastAPI, HTTPException, Depends, Request, UploadFile, File
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, model_validator
+from pydantic import BaseModel, Field, model_validator
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 
@@ -22,21 +22,39 @@ except ImportError:
     pass
 # ----------------------------------------
 
-from backend.config import ALLOWED_ORIGINS
+from backend.config import ALLOWED_ORIGINS, BATCH_MAX_TARGETS
 from backend.celery_worker import run_osint_scan
 from backend.database import (
+    create_scan_entries,
+    get_batch_progress,
+    init_db,
+    mark_stale_scans_failed,
+)
+# Routes on the hot path use the async layer so they never block the event loop
+from backend.database_async import (
     create_scan_entry,
+    get_latest_scan_for_target,
     get_scan_result,
     get_scans_by_owner,
     delete_scan,
-    init_db,
-    mark_stale_scans_failed,
+    search_findings,
+    get_findings_summary,
+    get_scan_stats,
+    get_async_pool,
+    close_async_pool,
+    async_pool_stats,
 )
 
 from backend.auth.routes import router as auth_router
 from backend.auth.dependencies import get_current_user
 from backend.limiter import limiter
 from backend.osint.image_metadata_osint import collect_image_metadata
+from backend.osint.rate_limit import xon_bucket_level
+from backend.db_pool import pool_stats
+from backend.scan_stream import read_findings_async
+from backend.scan_routing import queue_for_scan
+from backend.scan_batch import dedupe_targets, enqueue_batch
+from backend.scan_stats import cached_scan_stats
 
 
 logging.basicConfig(level=logging.INFO)
@@ -53,17 +71,22 @@ async def lifespan(app: FastAPI):
     cleaned = mark_stale_scans_failed()
     logger.info(f"OSINT System Initialized. Cleaned up {cleaned} stale scans.")
     
+    # Open the async MySQL pool up front
+    await get_async_pool()
+
     # Start a background loop to periodically clean up stale tasks
     task = asyncio.create_task(periodic_cleanup())
     
     yield
     task.cancel()
+    await close_async_pool()
 
 async def periodic_cleanup():
     while True:
         try:
             await asyncio.sleep(300) # Run every 5 minutes
-            mark_stale_scans_failed()
+            # Sync DB call: run it off the event loop so requests keep being served
+            await asyncio.to_thread(mark_stale_scans_failed)
         except asyncio.CancelledError:
             break
         except Exception as e:
@@ -95,6 +118,10 @@ class ScanRequest(BaseModel):
     email: Optional[str] = None
     username: Optional[str] = None
     domain: Optional[str] = None
+    # Bypass cached probe results and re-check every site
+    force_refresh: bool = False
+    # Incremental rescan of this target's previous scan: reuses recent results and stores only the changes
+    rescan: bool = False
 
     @model_validator(mode="after")
     def validate_single_option(self):
@@ -108,66 +135,164 @@ class ScanRequest(BaseModel):
         return self
 
 
+class BatchScanRequest(BaseModel):
+    # Each target follows the ScanRequest rules: exactly one of email, username or domain
+    targets: List[ScanRequest] = Field(..., min_length=1, max_length=BATCH_MAX_TARGETS)
+
+    @model_validator(mode="after")
+    def reject_rescans(self):
+        # Batches are always full scans; rescans go through POST /scans one target at a time
+        if any(t.rescan for t in self.targets):
+            raise ValueError("rescan is not supported for batch targets, use POST /scans")
+
+        return self
+
+
 # -------- Health --------
 @app.get("/health")
 def health():
     return {"status": "ok"}
 
 
+# -------- Metrics --------
+@app.get("/metrics")
+def metrics(user: str = Depends(get_current_user)):
+    # Pool sizes and bucket levels are operational details, so not public
+    return {
+        # Shared XON token bucket: bulk email campaigns can pace against `tokens`
+        "xon_rate_limit": xon_bucket_level(),
+        # This API process's MySQL pool: size, waiters and checkout latency
+        "db_pool": pool_stats(),
+        "db_async_pool": async_pool_stats(),
+    }
+
+
 # -------- Start Scan --------
+def _enqueue_scan(scan_id: str, body: ScanRequest, base_scan_id: Optional[str]) -> None:
+    # Quick scans and long Sherlock sweeps go to separately sized worker pools
+    run_osint_scan.apply_async(
+        args=[scan_id, body.email, body.username, body.domain, body.force_refresh],
+        kwargs={"base_scan_id": base_scan_id},
+        queue=queue_for_scan(body.email, body.username, body.domain, body.force_refresh),
+    )
+
+
 @app.post("/scans", status_code=202)
 async def start_scan(body: ScanRequest, user: str = Depends(get_current_user)):
 
     scan_id = str(uuid.uuid4())
 
-    create_scan_entry(
+    base_scan_id = None
+    if body.rescan:
+        base = await get_latest_scan_for_target(user, body.email, body.username, body.domain)
+        base_scan_id = base["scan_id"] if base else None
+
+    await create_scan_entry(
         scan_id,
         user,
         body.email,
         body.username,
         body.domain,
+        base_scan_id,
     )
 
-    run_osint_scan.delay(
-        scan_id,
-        body.email,
-        body.username,
-        body.domain,
-    )
+    # Routing reads the probe cache and publishing talks to the broker, both blocking clients
+    await asyncio.to_thread(_enqueue_scan, scan_id, body, base_scan_id)
+
+    return {"scan_id": scan_id, "status": "queued", "base_scan_id": base_scan_id}
+
 
-    return {"scan_id": scan_id, "status": "queued"}
+# -------- Batch Scans --------
+# Declared before /scans/{scan_id} so "batch" is never taken for a scan id
+@app.post("/scans/batch", status_code=202)
+def start_batch(body: BatchScanRequest, user: str = Depends(get_current_user)):
+
+    targets, duplicates = dedupe_targets([t.model_dump() for t in body.targets])
+    batch_id = str(uuid.uuid4())
+
+    # One transaction of multi-row INSERTs, then Celery groups in chunks
+    create_scan_entries(user, batch_id, targets)
+    enqueue_batch(targets)
+    logger.info(f"Batch {batch_id}: {len(targets)} scans queued, {duplicates} duplicates dropped.")
+
+    return {
+        "batch_id": batch_id,
+        "status": "queued",
+        "submitted": len(targets),
+        "duplicates": duplicates,
+        "scan_ids": [t["scan_id"] for t in targets],
+    }
+
+
+@app.get("/scans/batch/{batch_id}")
+def get_batch(batch_id: str, user: str = Depends(get_current_user)):
+
+    by_status = get_batch_progress(batch_id, user)
+
+    if not by_status:
+        raise HTTPException(status_code=404, detail="Batch not found")
+
+    total = sum(s["count"] for s in by_status.values())
+    # "Queued" scans are Running rows no worker has picked up yet (see get_batch_progress)
+    running = sum(by_status.get(s, {}).get("count", 0) for s in ("Running", "Queued"))
+
+    return {
+        "batch_id": batch_id,
+        "total": total,
+        "finished": total - running,
+        "progress": round((total - running) / total, 3),
+        "by_status": by_status,
+    }
+
+
+# -------- Scan Stats --------
+# Declared before /scans/{scan_id} so "stats" is never taken for a scan id
+@app.get("/scans/stats")
+async def scans_stats(user: str = Depends(get_current_user)):
+    # Aggregated in MySQL over all of the user's scans, cached until one of them changes
+
+    return await cached_scan_stats(user, get_scan_stats)
 
 
 # -------- Get Scan --------
 @app.get("/scans/{scan_id}")
-def get_scan(scan_id: str, user: str = Depends(get_current_user)):
+async def get_scan(scan_id: str, user: str = Depends(get_current_user)):
+    # While a scan is Running, `findings` holds the partial results flushed so far
 
-    result = get_scan_result(scan_id)
+    result = await get_scan_result(scan_id)
 
     if not result:
         raise HTTPException(status_code=404, detail="Scan not found")
 
+    # Fan-out scans only publish partial batches to the scan stream until the final write
+    if result.get("status") == "Running" and not result.get("findings"):
+        result["findings"] = await read_findings_async(scan_id)
+
     return result
 
 
 # -------- List Scans --------
 @app.get("/scans")
-def list_scans(
+async def list_scans(
     limit: int = 10,
-    offset: int = 0,
+    after: Optional[str] = None,
     user: str = Depends(get_current_user),
 ):
+    # Pass `next_cursor` back as `after` for the following page; it is null on the last one
 
-    scans = get_scans_by_owner(user, limit, offset)
+    try:
+        scans, next_cursor = await get_scans_by_owner(user, max(1, min(limit, 100)), after)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
-    return {"scans": scans}
+    return {"scans": scans, "next_cursor": next_cursor}
 
 
 # -------- Delete Scan --------
 @app.delete("/scans/{scan_id}", status_code=204)
-def remove_scan(scan_id: str, user: str = Depends(get_current_user)):
+async def remove_scan(scan_id: str, user: str = Depends(get_current_user)):
 
-    deleted = delete_scan(scan_id, user)
+    deleted = await delete_scan(scan_id, user)
 
     if not deleted:
         raise HTTPException(status_code=404)
@@ -175,6 +300,37 @@ def remove_scan(scan_id: str, user: str = Depends(get_current_user)):
     return
 
 
+# -------- Findings --------
+# Filtered and aggregated in MySQL over scan_findings, across all of the user's finished scans
+@app.get("/findings")
+async def list_findings(
+    type: Optional[str] = None,
+    severity: Optional[str] = None,
+    value: Optional[str] = None,
+    source: Optional[str] = None,
+    limit: int = 100,
+    user: str = Depends(get_current_user),
+):
+
+    findings = await search_findings(user, type, severity, value, source, max(1, min(limit, 500)))
+
+    return {"findings": findings}
+
+
+@app.get("/findings/summary")
+async def findings_summary(user: str = Depends(get_current_user)):
+
+    rows = await get_findings_summary(user)
+
+    by_type = {}
+    for row in rows:
+        entry = by_type.setdefault(row["type"], {"total": 0, "by_severity": {}})
+        entry["total"] += row["findings"]
+        entry["by_severity"][row["severity"] or "UNKNOWN"] = row["findings"]
+
+    return {"total": sum(e["total"] for e in by_type.values()), "by_type": by_type}
+
+
 # -------- Image Metadata --------
 @app.post("/osint/image-metadata")
 @limiter.limit("15/minute")
@@ -0,0 +1,115 @@
+import hashlib
+import hmac
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import redis
+
+from backend.config import (
+    BREACH_CACHE_SALT,
+    BREACH_CACHE_HIT_TTL,
+    BREACH_CACHE_CLEAN_TTL,
+    BREACH_CACHE_LOCAL_SIZE,
+)
+from backend.redis_client import get_async_redis
+
+logger = logging.getLogger("osint_api")
+
+BREACH_CACHE_PREFIX = "breach_cache:"
+
+# An empty key would make the digest a plain hash anyone can recompute from a guessed address
+CACHE_ENABLED = bool(BREACH_CACHE_SALT)
+if not CACHE_ENABLED:
+    logger.warning("BREACH_CACHE_SALT is not set; breach lookups will not be cached.")
+
+
+def _email_digest(email: str) -> str:
+    """Salted hash of the normalized email - plaintext addresses never reach Redis."""
+    normalized = email.strip().lower()
+    return hmac.new(BREACH_CACHE_SALT.encode("utf-8"), normalized.encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+class _LocalLRU:
+    """Small in-process tier in front of Redis. Entries keep their own expiry."""
+
+    def __init__(self, max_size: int):
+        self._max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[float, List[Dict]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[List[Dict]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, breaches = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return breaches
+
+    def set(self, key: str, breaches: List[Dict], ttl: int) -> None:
+        if self._max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, breaches)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+
+_local = _LocalLRU(BREACH_CACHE_LOCAL_SIZE)
+
+
+async def get_cached_breaches(email: str) -> Optional[List[Dict]]:
+    """
+    Returns the cached breach list for `email` ([] means a remembered clean result),
+    or None when the address has not been looked up recently.
+    """
+    if not CACHE_ENABLED:
+        return None
+    digest = _email_digest(email)
+    breaches = _local.get(digest)
+    if breaches is not None:
+        return list(breaches)
+
+    client = get_async_redis()
+    if client is None:
+        return None
+    try:
+        pipe = client.pipeline(transaction=False)
+        pipe.get(BREACH_CACHE_PREFIX + digest)
+        pipe.ttl(BREACH_CACHE_PREFIX + digest)
+        raw, ttl = await pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Could not read breach cache: {e}")
+        return None
+    if raw is None:
+        return None
+
+    breaches = json.loads(raw)
+    if ttl and ttl > 0:
+        # Promote to the local tier for the rest of the Redis entry's lifetime
+        _local.set(digest, breaches, ttl)
+    return list(breaches)
+
+
+async def cache_breaches(email: str, breaches: List[Dict]) -> None:
+    """Stores a definitive answer. Clean results get the (shorter) clean TTL."""
+    if not CACHE_ENABLED:
+        return
+    digest = _email_digest(email)
+    ttl = BREACH_CACHE_HIT_TTL if breaches else BREACH_CACHE_CLEAN_TTL
+    _local.set(digest, list(breaches), ttl)
+    client = get_async_redis()
+    if client is None:
+        return
+    try:
+        await client.setex(BREACH_CACHE_PREFIX + digest, ttl, json.dumps(breaches))
+    except redis.RedisError as e:
+        logger.warning(f"Could not write breach cache: {e}")
@@ -4,6 +4,11 @@ import urllib.parse
 import asyncio
 from typing import List, Dict
 
+from backend.osint.http_client import get_http_client
+from backend.config import XON_MAX_ATTEMPTS, XON_RETRY_AFTER_DEFAULT
+from backend.osint.breach_cache import get_cached_breaches, cache_breaches
+from backend.osint.rate_limit import RateLimitTimeout, acquire_xon_token, block_xon_for, parse_retry_after
+
 # Set up a basic logger for the OSINT API
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("osint_api")
@@ -14,64 +19,84 @@ XON_HEADERS = {
     "Accept": "application/json"
 }
 
+class BreachLookupError(Exception):
+    """XposedOrNot gave no usable answer (5xx or another unexpected status)."""
+
 async def check_data_breaches(email: str) -> List[Dict]:
     """
     Queries the XposedOrNot database to see if an email has been exposed in a data breach.
+    Definitive answers (breached or clean) are served from the breach cache when fresh.
+    Raises when XON gives no definitive answer, so an outage is never reported as clean.
     """
     if not email:
         return []
 
+    cached = await get_cached_breaches(email)
+    if cached is not None:
+        logger.info(f"Breach cache hit ({len(cached)} breaches).")
+        return cached
+
     # 1. URL-encode the email to safely handle '+' aliases and special characters
     safe_email = urllib.parse.quote(email)
     url = f"https://api.xposedornot.com/v1/check-email/{safe_email}"
 
     # 2. Shorten timeout to 15s. If the API takes longer, it's likely hanging.
-    async with httpx.AsyncClient(headers=XON_HEADERS, timeout=15.0) as client:
+    # The shared pooled client keeps the TLS session to XON warm between scans.
+    client = get_http_client()
+    for attempt in range(1, XON_MAX_ATTEMPTS + 1):
+        # Every worker paces itself through the same Redis token bucket
+        await acquire_xon_token()
         try:
-            resp = await client.get(url)
-
-            # 404 = Clean result (No breaches found)
-            if resp.status_code == 404:
-                logger.info(f"No breaches found for {email}.")
-                return []
-                
-            # 429 = Rate Limited
-            if resp.status_code == 429:
-                logger.warning(f"Rate limited by XON API for {email}. Consider adding a delay.")
-                return []
-
-            if resp.status_code == 200:
-                data = resp.json()
-                raw_breaches = data.get("breaches", [])
-
-                # 3. Safely flatten the array in case XON returns a nested list
-                flat_breaches = []
-                for item in raw_breaches:
-                    if isinstance(item, list):
-                        flat_breaches.extend(item)  # Add all items from the sub-list
-                    else:
-                        flat_breaches.append(item)
-
-                findings = []
-                for name in flat_breaches:
-                    findings.append({
-                        "name": str(name),
-                        "severity": "HIGH",
-                        "source": "XposedOrNot"
-                    })
-
-                logger.info(f"Found {len(findings)} breaches for {email}.")
-                return findings
-
-            # Catch anything else (500, 503, etc.)
-            logger.warning(f"Unexpected response {resp.status_code} from XON for {email}")
-
+            resp = await client.get(url, headers=XON_HEADERS, timeout=15.0)
         except httpx.TimeoutException:
+            # Raised, not reported as "no breaches": the scan retries or fails visibly
             logger.error(f"XposedOrNot API Timeout for {email}")
-        except Exception as e:
-            logger.error(f"XposedOrNot API Error: {e}")
+            raise
+
+        # 429 = Rate Limited: pause all workers for Retry-After, then try again
+        if resp.status_code == 429:
+            retry_after = parse_retry_after(resp.headers.get("Retry-After"), XON_RETRY_AFTER_DEFAULT * attempt)
+            logger.warning(f"Rate limited by XON API (attempt {attempt}/{XON_MAX_ATTEMPTS}), backing off {retry_after:.1f}s.")
+            await block_xon_for(retry_after)
+            continue
+
+        # 404 = Clean result (No breaches found)
+        if resp.status_code == 404:
+            logger.info(f"No breaches found for {email}.")
+            await cache_breaches(email, [])
+            return []
+
+        if resp.status_code == 200:
+            data = resp.json()
+            raw_breaches = data.get("breaches", [])
+
+            # 3. Safely flatten the array in case XON returns a nested list
+            flat_breaches = []
+            for item in raw_breaches:
+                if isinstance(item, list):
+                    flat_breaches.extend(item)  # Add all items from the sub-list
+                else:
+                    flat_breaches.append(item)
+
+            findings = []
+            for name in flat_breaches:
+                findings.append({
+                    "name": str(name),
+                    "severity": "HIGH",
+                    "source": "XposedOrNot"
+                })
+
+            logger.info(f"Found {len(findings)} breaches for {email}.")
+            await cache_breaches(email, findings)
+            return findings
+
+        # Anything else (500, 503, etc.) is an outage, not a clean result
+        logger.warning(f"Unexpected response {resp.status_code} from XON for {email}")
+        raise BreachLookupError(f"Unexpected response {resp.status_code} from XposedOrNot")
 
-    return []
+    # Still rate limited after every attempt. Never report that as "no breaches":
+    # raising lets the task retry later instead.
+    raise RateLimitTimeout(f"XON still rate limiting after {XON_MAX_ATTEMPTS} attempts")
 
 # --- Testing Block ---
 if __name__ == "__main__":
@@ -85,8 +110,7 @@ if __name__ == "__main__":
             for r in results:
                 print(f" - [BREACH] {r['name']}")
             
-            # Sleep slightly to respect the free API rate limits
-            await asyncio.sleep(1.5)
+            # Pacing is handled by the shared XON token bucket
 
     # Run the async loop
     asyncio.run(test_run())
\ No newline at end of file
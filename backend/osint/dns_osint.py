@@ -0,0 +1,198 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+import dns.asyncresolver
+import dns.exception
+import dns.resolver
+import redis
+
+from backend.config import DNS_NAMESERVERS, DNS_PORT, DNS_TIMEOUT, DNS_CACHE_MAX_TTL, DNS_NEGATIVE_TTL
+from backend.redis_client import get_async_redis
+
+logger = logging.getLogger("osint_api")
+
+RECORD_TYPES = ("A", "AAAA", "MX", "NS", "TXT", "CNAME")
+DNS_CACHE_PREFIX = "dns_cache:"
+LOCAL_CACHE_MAX_ENTRIES = 10000
+
+# In-process tier: (domain, rtype) -> (expires_at, values). Redis is the shared tier.
+_local_cache: Dict[Tuple[str, str], Tuple[float, List[str]]] = {}
+_resolver: Optional[dns.asyncresolver.Resolver] = None
+
+
+class DomainNotFound(Exception):
+    """NXDOMAIN: the domain does not exist at all."""
+
+
+class DomainLookupFailed(Exception):
+    """Timeout or SERVFAIL: says nothing about the domain, so the lookup should be retried."""
+
+
+def _get_resolver() -> dns.asyncresolver.Resolver:
+    """
+    Uses the system resolver unless DNS_NAMESERVERS is set, which also makes the
+    module easy to point at a local stub DNS server (DNS_NAMESERVERS=127.0.0.1 DNS_PORT=5353).
+    """
+    global _resolver
+    if _resolver is None:
+        if DNS_NAMESERVERS:
+            resolver = dns.asyncresolver.Resolver(configure=False)
+            resolver.nameservers = DNS_NAMESERVERS
+            resolver.port = DNS_PORT
+        else:
+            resolver = dns.asyncresolver.Resolver()
+        resolver.lifetime = DNS_TIMEOUT
+        _resolver = resolver
+    return _resolver
+
+
+def _format(rtype: str, rdata) -> str:
+    if rtype == "MX":
+        return f"{rdata.preference} {rdata.exchange.to_text(omit_final_dot=True)}"
+    if rtype in ("NS", "CNAME"):
+        return rdata.target.to_text(omit_final_dot=True)
+    if rtype == "TXT":
+        return b"".join(rdata.strings).decode("utf-8", errors="replace")
+    return rdata.to_text()
+
+
+async def _cache_get(domain: str, rtype: str) -> Optional[List[str]]:
+    entry = _local_cache.get((domain, rtype))
+    if entry and entry[0] > time.time():
+        return entry[1]
+
+    client = get_async_redis()
+    if client is None:
+        return None
+    try:
+        key = f"{DNS_CACHE_PREFIX}{rtype}:{domain}"
+        pipe = client.pipeline(transaction=False)
+        pipe.get(key)
+        pipe.ttl(key)
+        raw, ttl = await pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Could not read DNS cache: {e}")
+        return None
+    if raw is None:
+        return None
+    values = json.loads(raw)
+    if ttl and ttl > 0:
+        _local_cache[(domain, rtype)] = (time.time() + ttl, values)
+    return values
+
+
+async def _cache_set(domain: str, rtype: str, values: List[str], ttl: int) -> None:
+    if ttl <= 0:
+        return
+    now = time.time()
+    if len(_local_cache) >= LOCAL_CACHE_MAX_ENTRIES:
+        for key in [k for k, (expires_at, _) in _local_cache.items() if expires_at <= now]:
+            del _local_cache[key]
+        if len(_local_cache) >= LOCAL_CACHE_MAX_ENTRIES:
+            _local_cache.clear()
+    _local_cache[(domain, rtype)] = (now + ttl, values)
+    client = get_async_redis()
+    if client is None:
+        return
+    try:
+        await client.setex(f"{DNS_CACHE_PREFIX}{rtype}:{domain}", ttl, json.dumps(values))
+    except redis.RedisError as e:
+        logger.warning(f"Could not write DNS cache: {e}")
+
+
+async def _lookup(domain: str, rtype: str) -> List[str]:
+    """One record type, honoring the answer's TTL (capped at DNS_CACHE_MAX_TTL)."""
+    cached = await _cache_get(domain, rtype)
+    if cached is not None:
+        return cached
+
+    try:
+        answer = await _get_resolver().resolve(domain, rtype)
+    except dns.resolver.NXDOMAIN:
+        await _cache_set(domain, rtype, [], DNS_NEGATIVE_TTL)
+        raise DomainNotFound(domain)
+    except dns.resolver.NoAnswer:
+        await _cache_set(domain, rtype, [], DNS_NEGATIVE_TTL)
+        return []
+    except (dns.resolver.NoNameservers, dns.exception.Timeout) as e:
+        # Transient: not cached, and not mistaken for "no records"
+        raise DomainLookupFailed(f"DNS {rtype} lookup for {domain} failed: {e}") from e
+
+    values = [_format(rtype, rdata) for rdata in answer]
+    ttl = min(answer.rrset.ttl, DNS_CACHE_MAX_TTL) if answer.rrset is not None else DNS_NEGATIVE_TTL
+    await _cache_set(domain, rtype, values, ttl)
+    return values
+
+
+async def _lookup_dmarc(domain: str) -> List[str]:
+    """The domain's DMARC policy: TXT records starting "v=DMARC1" at _dmarc.<domain>."""
+    try:
+        values = await _lookup(f"_dmarc.{domain}", "TXT")
+    except DomainNotFound:
+        # Only the _dmarc name is missing, not the domain itself
+        return []
+    return [v for v in values if v.lower().startswith("v=dmarc1")]
+
+
+async def resolve_domain(domain: str) -> Dict[str, List[str]]:
+    """
+    Queries every record type, and the DMARC policy, concurrently. Returns
+    {rtype: [values]} ("DMARC" for the policy), empty if the domain does not exist.
+    Raises DomainLookupFailed when lookups failed and nothing resolved at all.
+    """
+    domain = domain.strip().lower().rstrip(".")
+    results = await asyncio.gather(
+        *(_lookup(domain, rtype) for rtype in RECORD_TYPES), _lookup_dmarc(domain), return_exceptions=True,
+    )
+
+    records = {}
+    failure = None
+    for rtype, result in zip(RECORD_TYPES + ("DMARC",), results):
+        if isinstance(result, DomainNotFound):
+            return {}
+        if isinstance(result, Exception):
+            logger.warning(f"DNS {rtype} lookup for {domain} failed: {result}")
+            failure = result
+            continue
+        if result:
+            records[rtype] = result
+    if failure is not None and not records:
+        # Every answer we got was empty or missing: too little to call the domain unresolvable
+        raise failure if isinstance(failure, DomainLookupFailed) else DomainLookupFailed(str(failure))
+    return records
+
+
+async def check_domain_records(domain: str) -> List[Dict]:
+    """DNS findings for a domain scan, one per record. Transient failures raise so the module retries."""
+    if not domain:
+        return []
+
+    records = await resolve_domain(domain)
+    if not records:
+        return [{
+            "type": "domain",
+            "source": "DNS",
+            "value": "Domain could not be resolved.",
+            "severity": "LOW"
+        }]
+
+    findings = []
+    for rtype in RECORD_TYPES + ("DMARC",):
+        for value in records.get(rtype, []):
+            if rtype == "A":
+                # Keep the original wording for A records
+                text = f"Resolved IP: {value}"
+            elif rtype == "TXT" and value.lower().startswith("v=spf1"):
+                text = f"SPF record: {value}"
+            else:
+                text = f"{rtype} record: {value}"
+            findings.append({
+                "type": "domain",
+                "source": "DNS",
+                "value": text,
+                "severity": "INFO"
+            })
+    return findings
@@ -0,0 +1,97 @@
+import asyncio
+import logging
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from backend.config import (
+    HTTP_POOL_MAX_CONNECTIONS,
+    HTTP_POOL_MAX_KEEPALIVE,
+    HTTP_POOL_KEEPALIVE_EXPIRY,
+    HTTP_PER_HOST_CONNECTIONS,
+    HTTP2_ENABLED,
+)
+
+logger = logging.getLogger("osint_api")
+
+# One pooled client per worker process. httpx clients are bound to the event loop
+# they were first used on, so we remember that loop and rebuild if it changes.
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+_host_slots: Dict[str, asyncio.Semaphore] = {}
+
+
+def _build_transport() -> httpx.AsyncHTTPTransport:
+    """
+    Builds the shared transport. httpx only exposes a global connection cap, so the
+    per-host limit is enforced separately through host_slot().
+    """
+    limits = httpx.Limits(
+        max_connections=HTTP_POOL_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_POOL_MAX_KEEPALIVE,
+        keepalive_expiry=HTTP_POOL_KEEPALIVE_EXPIRY,
+    )
+    http2 = HTTP2_ENABLED
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logger.warning("HTTP/2 requested but the 'h2' package is missing. Falling back to HTTP/1.1.")
+            http2 = False
+    return httpx.AsyncHTTPTransport(limits=limits, http2=http2, retries=0)
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Returns the process-wide pooled AsyncClient shared by every OSINT module.
+    Callers must NOT close it or use it as a context manager - pass per-request
+    headers and timeouts instead.
+    """
+    global _client, _client_loop
+
+    loop = asyncio.get_running_loop()
+    if _client is not None and not _client.is_closed and _client_loop is loop:
+        return _client
+
+    if _client is not None and _client_loop is not loop:
+        # The previous loop is gone (e.g. asyncio.run per task); its sockets cannot be reused.
+        logger.debug("Event loop changed, rebuilding shared HTTP client.")
+
+    _host_slots.clear()
+    _client = httpx.AsyncClient(
+        transport=_build_transport(),
+        timeout=httpx.Timeout(15.0, connect=10.0),
+    )
+    _client_loop = loop
+    logger.info(
+        f"Shared HTTP client created (max_connections={HTTP_POOL_MAX_CONNECTIONS}, "
+        f"per_host={HTTP_PER_HOST_CONNECTIONS}, http2={HTTP2_ENABLED})."
+    )
+    return _client
+
+
+def host_slot(url: str) -> asyncio.Semaphore:
+    """
+    Returns the semaphore guarding connections to the host of `url`.
+    Usage: `async with host_slot(url): await client.get(url)`
+    """
+    host = urlsplit(url).hostname or ""
+    slot = _host_slots.get(host)
+    if slot is None:
+        slot = asyncio.Semaphore(HTTP_PER_HOST_CONNECTIONS)
+        _host_slots[host] = slot
+    return slot
+
+
+async def close_http_client() -> None:
+    """Closes the shared client. Call before the owning event loop is discarded."""
+    global _client, _client_loop
+    if _client is not None and not _client.is_closed:
+        try:
+            await _client.aclose()
+        except Exception as e:
+            logger.warning(f"Error closing shared HTTP client: {e}")
+    _client = None
+    _client_loop = None
+    _host_slots.clear()
@@ -0,0 +1,103 @@
+import logging
+import time
+from typing import Dict, List
+
+import redis
+
+from backend.config import PROBE_CACHE_HIT_TTL, PROBE_CACHE_MISS_TTL
+from backend.redis_client import redis_client, get_async_redis
+
+logger = logging.getLogger("osint_api")
+
+# One hash per normalized username: field = site name, value = "<1|0><unix ts>".
+# A whole scan's cache state is therefore one HGETALL and one HSET.
+PROBE_CACHE_PREFIX = "probe_cache:"
+
+
+def normalize_username(username: str) -> str:
+    return username.strip().lower()
+
+
+def _cache_key(username: str) -> str:
+    return f"{PROBE_CACHE_PREFIX}{normalize_username(username)}"
+
+
+def _fresh(raw: Dict[str, str], now: float) -> Dict[str, bool]:
+    fresh = {}
+    for site, value in raw.items():
+        try:
+            found, checked_at = value[0] == "1", int(value[1:])
+        except (IndexError, ValueError):
+            continue
+        ttl = PROBE_CACHE_HIT_TTL if found else PROBE_CACHE_MISS_TTL
+        if now - checked_at < ttl:
+            fresh[site] = found
+    return fresh
+
+
+def load_fresh_results(username: str) -> Dict[str, bool]:
+    """
+    Returns {site: found} for every cached outcome still within its TTL.
+    Hits and misses age out independently (PROBE_CACHE_HIT_TTL / PROBE_CACHE_MISS_TTL).
+    """
+    if not redis_client:
+        return {}
+    try:
+        raw = redis_client.hgetall(_cache_key(username))
+    except redis.RedisError as e:
+        logger.warning(f"Could not read probe cache: {e}")
+        return {}
+    return _fresh(raw, time.time())
+
+
+async def load_fresh_results_async(username: str) -> Dict[str, bool]:
+    """load_fresh_results for code on the worker's event loop."""
+    client = get_async_redis()
+    if client is None:
+        return {}
+    try:
+        raw = await client.hgetall(_cache_key(username))
+    except redis.RedisError as e:
+        logger.warning(f"Could not read probe cache: {e}")
+        return {}
+    return _fresh(raw, time.time())
+
+
+def load_fresh_results_many(usernames: List[str]) -> List[Dict[str, bool]]:
+    """load_fresh_results for many usernames in one pipelined round trip."""
+    if not redis_client or not usernames:
+        return [{} for _ in usernames]
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        for username in usernames:
+            pipe.hgetall(_cache_key(username))
+        raws = pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Could not read probe cache: {e}")
+        return [{} for _ in usernames]
+    now = time.time()
+    return [_fresh(raw, now) for raw in raws]
+
+
+class ProbeCacheWriter:
+    """Collects definitive probe outcomes (found / not found) and stores them in one write."""
+
+    def __init__(self, username: str):
+        self._key = _cache_key(username)
+        self._outcomes: Dict[str, str] = {}
+
+    def record(self, site: str, found: bool) -> None:
+        self._outcomes[site] = f"{1 if found else 0}{int(time.time())}"
+
+    async def flush(self) -> None:
+        client = get_async_redis()
+        if not self._outcomes or client is None:
+            return
+        try:
+            pipe = client.pipeline(transaction=False)
+            pipe.hset(self._key, mapping=self._outcomes)
+            pipe.expire(self._key, max(PROBE_CACHE_HIT_TTL, PROBE_CACHE_MISS_TTL))
+            await pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Could not write probe cache: {e}")
+        self._outcomes = {}
@@ -0,0 +1,115 @@
+import logging
+import time
+from typing import Dict, Optional, Set, Tuple
+
+import redis
+
+from backend.config import CHECKPOINT_FLUSH_EVERY, CHECKPOINT_FLUSH_INTERVAL, SCAN_CHECKPOINT_TTL
+from backend.redis_client import redis_client, get_async_redis
+
+logger = logging.getLogger("osint_api")
+
+# Per-scan Sherlock progress, so a retried or redelivered task only probes the sites
+# that had not finished. Bit i of "<key>:done" is set once site i of the catalog
+# (by position, see iter_username_findings) has been probed; the hash keeps the
+# catalog version the positions refer to and the hits found so far ("hit:<site>" = url).
+CHECKPOINT_PREFIX = "scan_checkpoint:"
+
+# Returns the positions of every set bit (Redis bit order: most significant bit first)
+_SET_BITS_SCRIPT = """
+local bits = redis.call('GET', KEYS[1])
+if not bits then
+    return {}
+end
+local done = {}
+for i = 1, #bits do
+    local byte = string.byte(bits, i)
+    if byte ~= 0 then
+        for b = 0, 7 do
+            if bit.band(byte, bit.lshift(1, 7 - b)) ~= 0 then
+                table.insert(done, (i - 1) * 8 + b)
+            end
+        end
+    end
+end
+return done
+"""
+
+
+def _keys(scan_id: str) -> Tuple[str, str]:
+    return f"{CHECKPOINT_PREFIX}{scan_id}", f"{CHECKPOINT_PREFIX}{scan_id}:done"
+
+
+async def load_checkpoint(scan_id: str, catalog_version: str) -> Tuple[Set[int], Dict[str, str]]:
+    """
+    Returns (finished site positions, {site: url} hits) recorded by earlier attempts
+    of this scan. A checkpoint taken against another catalog version is discarded,
+    since its positions no longer point at the same sites.
+    """
+    client = get_async_redis()
+    if client is None:
+        return set(), {}
+    meta_key, done_key = _keys(scan_id)
+    try:
+        meta = await client.hgetall(meta_key)
+        if not meta:
+            return set(), {}
+        if meta.get("catalog") != catalog_version:
+            await client.delete(meta_key, done_key)
+            return set(), {}
+        positions = await client.register_script(_SET_BITS_SCRIPT)(keys=[done_key])
+    except redis.RedisError as e:
+        logger.warning(f"Could not read checkpoint for scan {scan_id}: {e}")
+        return set(), {}
+    hits = {field[4:]: url for field, url in meta.items() if field.startswith("hit:")}
+    return {int(p) for p in positions}, hits
+
+
+class ProbeCheckpoint:
+    """Buffers finished probes and writes them in batches (every N probes or T seconds)."""
+
+    def __init__(self, scan_id: str, catalog_version: str):
+        self._meta_key, self._done_key = _keys(scan_id)
+        self._catalog_version = catalog_version
+        self._done: list = []
+        self._hits: Dict[str, str] = {}
+        self._last_flush = time.monotonic()
+
+    def record(self, position: int, hit: Optional[dict]) -> None:
+        self._done.append(position)
+        if hit:
+            self._hits[f"hit:{hit['site']}"] = hit["url"]
+
+    async def maybe_flush(self) -> None:
+        if len(self._done) >= CHECKPOINT_FLUSH_EVERY or time.monotonic() - self._last_flush >= CHECKPOINT_FLUSH_INTERVAL:
+            await self.flush()
+
+    async def flush(self) -> None:
+        self._last_flush = time.monotonic()
+        if not self._done:
+            return
+        client = get_async_redis()
+        if client is None:
+            self._done, self._hits = [], {}
+            return
+        try:
+            pipe = client.pipeline(transaction=False)
+            pipe.hset(self._meta_key, mapping={"catalog": self._catalog_version, **self._hits})
+            for position in self._done:
+                pipe.setbit(self._done_key, position, 1)
+            pipe.expire(self._meta_key, SCAN_CHECKPOINT_TTL)
+            pipe.expire(self._done_key, SCAN_CHECKPOINT_TTL)
+            await pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Could not write probe checkpoint: {e}")
+        self._done, self._hits = [], {}
+
+
+def clear_checkpoint(scan_id: str) -> None:
+    """Drops a scan's checkpoint once its final result has been written."""
+    if not redis_client:
+        return
+    try:
+        redis_client.delete(*_keys(scan_id))
+    except redis.RedisError as e:
+        logger.warning(f"Could not clear checkpoint for scan {scan_id}: {e}")
@@ -0,0 +1,138 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+from backend.config import PROBE_GLOBAL_LIMIT
+from backend.osint.http_client import host_slot
+
+logger = logging.getLogger("osint_api")
+
+T = TypeVar("T")
+
+
+@dataclass
+class ProbeStats:
+    """Timing for one scan's probes. Queue wait and network time are kept apart."""
+    probes: int = 0
+    queue_wait_total: float = 0.0
+    queue_wait_max: float = 0.0
+    network_total: float = 0.0
+    network_max: float = 0.0
+
+    def record(self, queue_wait: float, network: float) -> None:
+        self.probes += 1
+        self.queue_wait_total += queue_wait
+        self.queue_wait_max = max(self.queue_wait_max, queue_wait)
+        self.network_total += network
+        self.network_max = max(self.network_max, network)
+
+    def summary(self) -> str:
+        if not self.probes:
+            return "probes=0"
+        return (
+            f"probes={self.probes} "
+            f"queue_wait avg={self.queue_wait_total / self.probes:.3f}s max={self.queue_wait_max:.3f}s "
+            f"network avg={self.network_total / self.probes:.3f}s max={self.network_max:.3f}s"
+        )
+
+
+class ProbeScheduler:
+    """
+    Bounds outbound probes for every scan running on one event loop.
+
+    - Per-host cap: a probe first takes its host's slot (see http_client.host_slot).
+    - Global cap: at most `global_limit` probes are on the network at once.
+    - Fairness: when global slots are scarce they are handed out round-robin across
+      scans, so one 500-site sweep cannot starve a scan that started later.
+    """
+
+    def __init__(self, global_limit: int):
+        self._limit = max(1, global_limit)
+        self._in_flight = 0
+        # scan_id -> FIFO of waiters. Ordered so we can rotate scans round-robin.
+        self._waiters: "OrderedDict[str, Deque[asyncio.Future]]" = OrderedDict()
+        self._stats: Dict[str, ProbeStats] = {}
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queued(self) -> int:
+        return sum(len(q) for q in self._waiters.values())
+
+    async def _acquire(self, scan_id: str) -> None:
+        if self._in_flight < self._limit and not self._waiters:
+            self._in_flight += 1
+            return
+
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(scan_id, deque()).append(fut)
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # The slot was handed to us just before cancellation - pass it on.
+                self._release()
+            else:
+                queue = self._waiters.get(scan_id)
+                if queue is not None:
+                    try:
+                        queue.remove(fut)
+                    except ValueError:
+                        pass
+                    if not queue:
+                        del self._waiters[scan_id]
+            raise
+
+    def _release(self) -> None:
+        # Hand the freed slot straight to the next scan in round-robin order.
+        while self._waiters:
+            scan_id, queue = next(iter(self._waiters.items()))
+            fut = queue.popleft()
+            if queue:
+                self._waiters.move_to_end(scan_id)
+            else:
+                del self._waiters[scan_id]
+            if not fut.done():
+                fut.set_result(None)
+                return
+        self._in_flight -= 1
+
+    async def run(self, scan_id: str, url: str, probe: Callable[[], Awaitable[T]]) -> T:
+        """Runs `probe()` once both the host slot and a fair global slot are held."""
+        queued_at = time.perf_counter()
+        async with host_slot(url):
+            await self._acquire(scan_id)
+            started_at = time.perf_counter()
+            try:
+                return await probe()
+            finally:
+                self._release()
+                finished_at = time.perf_counter()
+                stats = self._stats.get(scan_id)
+                if stats is not None:
+                    stats.record(started_at - queued_at, finished_at - started_at)
+
+    def begin_scan(self, scan_id: str) -> None:
+        self._stats[scan_id] = ProbeStats()
+
+    def end_scan(self, scan_id: str) -> ProbeStats:
+        return self._stats.pop(scan_id, None) or ProbeStats()
+
+
+_scheduler: Optional[ProbeScheduler] = None
+_scheduler_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_probe_scheduler() -> ProbeScheduler:
+    """Returns the scheduler shared by all scans on the running event loop."""
+    global _scheduler, _scheduler_loop
+    loop = asyncio.get_running_loop()
+    if _scheduler is None or _scheduler_loop is not loop:
+        _scheduler = ProbeScheduler(PROBE_GLOBAL_LIMIT)
+        _scheduler_loop = loop
+    return _scheduler
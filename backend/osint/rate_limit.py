@@ -0,0 +1,135 @@
+import asyncio
+import email.utils
+import logging
+import time
+from typing import Dict, Optional
+
+import redis
+
+from backend.config import XON_RATE_PER_SECOND, XON_BUCKET_CAPACITY, XON_MAX_WAIT_SECONDS
+from backend.redis_client import redis_client, get_async_redis
+
+logger = logging.getLogger("osint_api")
+
+XON_BUCKET_KEY = "rate_limit:xon"
+
+# Token bucket shared by every worker. Time comes from the Redis server (TIME), so
+# worker clock skew does not matter. Returns {granted, seconds_to_wait} as strings
+# because Redis truncates Lua numbers to integers.
+_ACQUIRE_SCRIPT = """
+local key = KEYS[1]
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', key, 'tokens', 'ts', 'blocked_until')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+local blocked_until = tonumber(state[3]) or 0
+if now < blocked_until then
+    return {'0', tostring(blocked_until - now)}
+end
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local granted = 0
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    granted = 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', key, 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', key, 3600)
+return {tostring(granted), tostring(wait)}
+"""
+
+# Pushes blocked_until forward (never backwards) and drains the bucket after a 429.
+_BLOCK_SCRIPT = """
+local key = KEYS[1]
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local until_ts = now + tonumber(ARGV[1])
+local current = tonumber(redis.call('HGET', key, 'blocked_until')) or 0
+if until_ts > current then
+    redis.call('HSET', key, 'blocked_until', tostring(until_ts), 'tokens', '0', 'ts', tostring(until_ts))
+end
+redis.call('EXPIRE', key, 3600)
+return tostring(math.max(until_ts, current) - now)
+"""
+
+class RateLimitTimeout(Exception):
+    """Raised when no token could be obtained within the allowed wait."""
+
+
+def parse_retry_after(value: Optional[str], default: float) -> float:
+    """Retry-After can be delta-seconds or an HTTP date."""
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return default
+
+
+async def acquire_xon_token(max_wait: float = XON_MAX_WAIT_SECONDS) -> None:
+    """
+    Waits until the cluster-wide XON bucket grants a token. Lookups are delayed,
+    never dropped; RateLimitTimeout is raised only after `max_wait` seconds.
+    """
+    client = get_async_redis()
+    if client is None:
+        return
+
+    acquire = client.register_script(_ACQUIRE_SCRIPT)
+    deadline = time.monotonic() + max_wait
+    while True:
+        try:
+            granted, wait = await acquire(keys=[XON_BUCKET_KEY], args=[XON_RATE_PER_SECOND, XON_BUCKET_CAPACITY])
+        except redis.RedisError as e:
+            # Fail open: pacing is an optimisation, the lookup itself still matters
+            logger.warning(f"XON rate limiter unavailable, proceeding unpaced: {e}")
+            return
+        if granted == "1":
+            return
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise RateLimitTimeout(f"No XON rate-limit token within {max_wait:.0f}s")
+        await asyncio.sleep(min(float(wait), remaining))
+
+
+async def block_xon_for(seconds: float) -> None:
+    """Pauses XON calls on every worker, e.g. after a 429 with Retry-After."""
+    client = get_async_redis()
+    if client is None:
+        return
+    try:
+        await client.register_script(_BLOCK_SCRIPT)(keys=[XON_BUCKET_KEY], args=[seconds])
+    except redis.RedisError as e:
+        logger.warning(f"Could not record XON backoff: {e}")
+
+
+def xon_bucket_level() -> Dict:
+    """Current fill level of the shared bucket, for the metrics endpoint."""
+    level = {"capacity": XON_BUCKET_CAPACITY, "rate_per_second": XON_RATE_PER_SECOND, "tokens": None, "blocked_for": 0.0}
+    if not redis_client:
+        return level
+    try:
+        tokens, ts, blocked_until = redis_client.hmget(XON_BUCKET_KEY, "tokens", "ts", "blocked_until")
+        now_s, now_us = redis_client.time()
+    except redis.RedisError as e:
+        logger.warning(f"Could not read XON bucket: {e}")
+        return level
+
+    now = now_s + now_us / 1_000_000
+    if tokens is None:
+        level["tokens"] = float(XON_BUCKET_CAPACITY)
+    else:
+        refill = max(0.0, now - float(ts)) * XON_RATE_PER_SECOND
+        level["tokens"] = round(min(XON_BUCKET_CAPACITY, float(tokens) + refill), 3)
+    level["blocked_for"] = round(max(0.0, float(blocked_until or 0) - now), 3)
+    return level
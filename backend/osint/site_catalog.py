@@ -0,0 +1,239 @@
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Pattern, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+import redis
+
+from backend.config import SHERLOCK_URL, SHERLOCK_REVALIDATE_SECONDS
+from backend.redis_client import get_async_redis
+
+logger = logging.getLogger("osint_api")
+
+CATALOG_RAW_KEY = "sherlock_sites:raw"
+CATALOG_META_KEY = "sherlock_sites:meta"
+
+# Retry the source this soon after falling back to the built-in site list
+FALLBACK_RETRY_SECONDS = 300
+
+
+@dataclass(slots=True)
+class SiteSpec:
+    """One Sherlock site, pre-parsed so a scan does no per-site dict/str work."""
+    name: str
+    url_parts: Tuple[str, ...]           # url template split on "{}"
+    host: str
+    error_type: str                      # "status_code" | "message" | anything else (never a hit)
+    error_markers: Tuple[str, ...]       # errorMsg alternatives
+    error_needles: Tuple[bytes, ...]     # same markers, pre-encoded for streamed body search
+    username_re: Optional[Pattern]       # Sherlock's regexCheck, if any
+    skip: bool = False                   # "$schema"-style junk or templates without "{}"
+
+    def url_for(self, username: str) -> str:
+        return username.join(self.url_parts)
+
+    def accepts(self, username: str) -> bool:
+        """False when the site cannot host this username, so probing it is pointless."""
+        return self.username_re is None or self.username_re.search(username) is not None
+
+
+def _compile_spec(name: str, info) -> SiteSpec:
+    if not isinstance(info, dict) or "{}" not in str(info.get("url", "")):
+        return SiteSpec(name, (), "", "", (), (), None, skip=True)
+
+    url = info["url"]
+    error_msg = info.get("errorMsg", "")
+    if isinstance(error_msg, list):
+        markers = tuple(m for m in error_msg if m)
+    else:
+        markers = (error_msg,) if error_msg else ()
+
+    username_re = None
+    if info.get("regexCheck"):
+        try:
+            username_re = re.compile(info["regexCheck"])
+        except re.error:
+            logger.debug(f"[{name}] Ignoring invalid regexCheck")
+
+    return SiteSpec(
+        name=name,
+        url_parts=tuple(url.split("{}")),
+        host=urlsplit(url.replace("{}", "x")).hostname or "",
+        error_type=info.get("errorType", "status_code"),
+        error_markers=markers,
+        error_needles=tuple(m.encode("utf-8") for m in markers),
+        username_re=username_re,
+    )
+
+
+class SiteCatalog:
+    """The compiled Sherlock site list plus the validators needed to revalidate it."""
+
+    def __init__(self, specs: List[SiteSpec], version: str, etag: str = "", last_modified: str = ""):
+        self.specs = specs
+        self.version = version
+        self.etag = etag
+        self.last_modified = last_modified
+
+    @classmethod
+    def compile(cls, raw: Dict, version: str, etag: str = "", last_modified: str = "") -> "SiteCatalog":
+        return cls([_compile_spec(name, info) for name, info in raw.items()], version, etag, last_modified)
+
+    def active(self) -> List[SiteSpec]:
+        return [s for s in self.specs if not s.skip]
+
+
+_catalog: Optional[SiteCatalog] = None
+_checked_at: float = 0.0
+# Lets one scan refresh the catalog while concurrent scans wait for it instead of each
+# downloading and compiling data.json. Like other loop-bound objects it is rebuilt if the loop changes.
+_refresh_lock: Optional[asyncio.Lock] = None
+_refresh_lock_loop = None
+
+
+def _get_refresh_lock() -> asyncio.Lock:
+    global _refresh_lock, _refresh_lock_loop
+    loop = asyncio.get_running_loop()
+    if _refresh_lock is None or _refresh_lock_loop is not loop:
+        _refresh_lock = asyncio.Lock()
+        _refresh_lock_loop = loop
+    return _refresh_lock
+
+
+async def _read_meta() -> Dict[str, str]:
+    client = get_async_redis()
+    if client is None:
+        return {}
+    try:
+        return await client.hgetall(CATALOG_META_KEY)
+    except redis.RedisError as e:
+        logger.warning(f"Redis get error: {e}")
+        return {}
+
+
+async def _load_from_redis(meta: Dict[str, str]) -> Optional[SiteCatalog]:
+    client = get_async_redis()
+    if client is None:
+        return None
+    try:
+        raw = await client.get(CATALOG_RAW_KEY)
+    except redis.RedisError as e:
+        logger.warning(f"Redis get error: {e}")
+        return None
+    if not raw:
+        return None
+    logger.info("Sherlock sites loaded from Redis and compiled.")
+    return SiteCatalog.compile(json.loads(raw), meta.get("version", ""), meta.get("etag", ""), meta.get("last_modified", ""))
+
+
+async def _store(raw_text: str, catalog: SiteCatalog) -> None:
+    client = get_async_redis()
+    if client is None:
+        return
+    try:
+        pipe = client.pipeline()
+        # No TTL: the copy stays usable and is revalidated with ETag/If-Modified-Since instead
+        pipe.set(CATALOG_RAW_KEY, raw_text)
+        pipe.hset(CATALOG_META_KEY, mapping={
+            "version": catalog.version,
+            "etag": catalog.etag,
+            "last_modified": catalog.last_modified,
+            "checked_at": str(time.time()),
+        })
+        await pipe.execute()
+        logger.info("Sherlock sites cached in Redis.")
+    except redis.RedisError as e:
+        logger.warning(f"Redis set error: {e}")
+
+
+async def _touch_checked() -> None:
+    client = get_async_redis()
+    if client is None:
+        return
+    try:
+        await client.hset(CATALOG_META_KEY, "checked_at", str(time.time()))
+    except redis.RedisError as e:
+        logger.warning(f"Redis set error: {e}")
+
+
+async def _revalidate(client: httpx.AsyncClient, current: Optional[SiteCatalog], headers: Dict[str, str]) -> Optional[SiteCatalog]:
+    """Conditional GET against the source. Returns the new catalog, or `current` on 304."""
+    request_headers = dict(headers)
+    if current is not None:
+        if current.etag:
+            request_headers["If-None-Match"] = current.etag
+        if current.last_modified:
+            request_headers["If-Modified-Since"] = current.last_modified
+
+    resp = await client.get(SHERLOCK_URL, headers=request_headers, follow_redirects=True, timeout=60.0)
+    if resp.status_code == 304 and current is not None:
+        logger.info("Sherlock sites unchanged at source (304).")
+        await _touch_checked()
+        return current
+
+    resp.raise_for_status()
+    raw_text = resp.text
+    catalog = SiteCatalog.compile(
+        json.loads(raw_text),
+        version=resp.headers.get("ETag") or hashlib.sha1(raw_text.encode("utf-8")).hexdigest(),
+        etag=resp.headers.get("ETag", ""),
+        last_modified=resp.headers.get("Last-Modified", ""),
+    )
+    logger.info(f"Sherlock sites fetched from source and compiled ({len(catalog.active())} usable).")
+    await _store(raw_text, catalog)
+    return catalog
+
+
+async def get_site_catalog(client: httpx.AsyncClient, headers: Dict[str, str], fallback: Dict) -> SiteCatalog:
+    """
+    Returns the compiled catalog, compiling at most once per process per change.
+
+    - Within SHERLOCK_REVALIDATE_SECONDS the in-process copy is returned as is.
+    - After that, a newer copy stored by another worker is picked up from Redis, or
+      the source is revalidated with ETag / If-Modified-Since (a 304 costs no body).
+    - If nothing is reachable, the built-in fallback list is used and retried soon.
+    """
+    if _catalog is not None and time.time() - _checked_at < SHERLOCK_REVALIDATE_SECONDS:
+        return _catalog
+
+    async with _get_refresh_lock():
+        # Another scan may have refreshed it while this one waited
+        if _catalog is not None and time.time() - _checked_at < SHERLOCK_REVALIDATE_SECONDS:
+            return _catalog
+        return await _refresh(client, headers, fallback)
+
+
+async def _refresh(client: httpx.AsyncClient, headers: Dict[str, str], fallback: Dict) -> SiteCatalog:
+    global _catalog, _checked_at
+
+    now = time.time()
+    meta = await _read_meta()
+    if meta.get("version") and (_catalog is None or meta["version"] != _catalog.version):
+        loaded = await _load_from_redis(meta)
+        if loaded is not None:
+            _catalog = loaded
+
+    checked_elsewhere = float(meta.get("checked_at") or 0)
+    if _catalog is not None and now - checked_elsewhere < SHERLOCK_REVALIDATE_SECONDS:
+        _checked_at = checked_elsewhere
+        return _catalog
+
+    logger.info("Revalidating Sherlock sites against source...")
+    try:
+        _catalog = await _revalidate(client, _catalog, headers)
+        _checked_at = now
+    except Exception as e:
+        if _catalog is None:
+            logger.warning(f"Could not fetch Sherlock sites, using fallback: {e}")
+            _catalog = SiteCatalog.compile(fallback, version="fallback")
+        else:
+            logger.warning(f"Could not revalidate Sherlock sites, keeping current copy: {e}")
+        _checked_at = now - SHERLOCK_REVALIDATE_SECONDS + FALLBACK_RETRY_SECONDS
+
+    return _catalog
@@ -0,0 +1,134 @@
+import logging
+import math
+import time
+from typing import TYPE_CHECKING, Dict, List, Tuple
+
+import redis
+
+from backend.config import (
+    PROBE_TIMEOUT_MIN,
+    PROBE_TIMEOUT_MAX,
+    PROBE_TIMEOUT_MULTIPLIER,
+    SITE_HEALTH_ALPHA,
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_COOLDOWN_SECONDS,
+)
+from backend.redis_client import get_async_redis
+
+if TYPE_CHECKING:
+    from backend.osint.site_catalog import SiteSpec
+
+logger = logging.getLogger("osint_api")
+
+SITE_HEALTH_KEY = "site_health"
+SITE_HEALTH_TTL = 7 * 86400
+
+# Each field of the hash is "ewma,variance,consecutive_failures,open_until". An ewma of
+# -1 means no success has been seen yet, so the first one seeds it instead of blending
+# into a made-up zero (0 is read the same way for entries written before that).
+# Observations from a whole scan are folded in atomically in one round trip so
+# concurrent workers never overwrite each other's updates.
+_RECORD_SCRIPT = """
+local key = KEYS[1]
+local alpha = tonumber(ARGV[1])
+local threshold = tonumber(ARGV[2])
+local cooldown = tonumber(ARGV[3])
+local now = tonumber(ARGV[4])
+local ttl = tonumber(ARGV[5])
+for i = 6, #ARGV, 3 do
+    local site = ARGV[i]
+    local latency = tonumber(ARGV[i + 1])
+    local ok = ARGV[i + 2] == '1'
+    local ewma, var, fails, open_until = nil, 0, 0, 0
+    local raw = redis.call('HGET', key, site)
+    if raw then
+        local parts = {}
+        for part in string.gmatch(raw, '[^,]+') do table.insert(parts, tonumber(part)) end
+        ewma, var, fails, open_until = parts[1], parts[2], parts[3], parts[4]
+        if ewma <= 0 then ewma = nil end
+    end
+    if ok then
+        if ewma == nil then
+            ewma = latency
+        else
+            local diff = latency - ewma
+            ewma = ewma + alpha * diff
+            var = (1 - alpha) * (var + alpha * diff * diff)
+        end
+        fails = 0
+        open_until = 0
+    else
+        fails = fails + 1
+        if fails >= threshold then open_until = now + cooldown end
+    end
+    redis.call('HSET', key, site, string.format('%.4f,%.6f,%d,%d', ewma or -1, var, fails, open_until))
+end
+redis.call('EXPIRE', key, ttl)
+return 1
+"""
+
+def _timeout_for(ewma: float, var: float) -> float:
+    """Per-site timeout: a multiple of the estimated p95 latency, clamped."""
+    if ewma <= 0:
+        return PROBE_TIMEOUT_MAX
+    p95 = ewma + 1.645 * math.sqrt(max(var, 0.0))
+    return round(min(PROBE_TIMEOUT_MAX, max(PROBE_TIMEOUT_MIN, p95 * PROBE_TIMEOUT_MULTIPLIER)), 2)
+
+
+async def load_site_health() -> Dict[str, Tuple[float, bool]]:
+    """Returns {site: (timeout, circuit_open)} for every site with recorded history."""
+    client = get_async_redis()
+    if client is None:
+        return {}
+    try:
+        raw = await client.hgetall(SITE_HEALTH_KEY)
+    except redis.RedisError as e:
+        logger.warning(f"Could not load site health: {e}")
+        return {}
+
+    now = time.time()
+    health = {}
+    for site, value in raw.items():
+        try:
+            ewma, var, _fails, open_until = (float(x) for x in value.split(","))
+        except ValueError:
+            continue
+        health[site] = (_timeout_for(ewma, var), open_until > now)
+    return health
+
+
+async def site_health_for(specs: List["SiteSpec"]) -> Dict[str, Tuple[float, bool]]:
+    """
+    This scan's view of each site: {name: (timeout, circuit_open)}. Kept per scan
+    because the compiled specs are shared by every scan in the process.
+    Sites without history get the maximum timeout.
+    """
+    health = await load_site_health()
+    view = {spec.name: health.get(spec.name, (PROBE_TIMEOUT_MAX, False)) for spec in specs}
+    skipped = sum(circuit_open for _timeout, circuit_open in view.values())
+    if skipped:
+        logger.info(f"Circuit breaker open for {skipped} Sherlock sites, skipping them this scan.")
+    return view
+
+
+class SiteHealthRecorder:
+    """Collects probe outcomes during one scan and writes them in a single batch."""
+
+    def __init__(self):
+        self._observations: List[Tuple[str, float, bool]] = []
+
+    def record(self, site: str, latency: float, ok: bool) -> None:
+        self._observations.append((site, latency, ok))
+
+    async def flush(self) -> None:
+        client = get_async_redis()
+        if not self._observations or client is None:
+            return
+        args = [SITE_HEALTH_ALPHA, CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_COOLDOWN_SECONDS, int(time.time()), SITE_HEALTH_TTL]
+        for site, latency, ok in self._observations:
+            args.extend([site, f"{latency:.4f}", "1" if ok else "0"])
+        try:
+            await client.register_script(_RECORD_SCRIPT)(keys=[SITE_HEALTH_KEY], args=args)
+        except redis.RedisError as e:
+            logger.warning(f"Could not record site health: {e}")
+        self._observations = []
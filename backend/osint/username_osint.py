@@ -1,12 +1,19 @@
 import httpx
 import asyncio
 import logging
-from typing import List, Dict
-import json
-import redis
+from typing import AsyncIterator, Awaitable, Callable, List, Dict, Set, Tuple
+import time
+import uuid
 
 # Assuming these are defined in your backend.config
-from backend.config import SHERLOCK_URL, REDIS_URL, SHERLOCK_SITE_LIMIT
+from backend.config import SHERLOCK_SITE_LIMIT, PROBE_MODE, PROBE_MAX_BODY_BYTES
+from backend.osint.http_client import get_http_client
+from backend.osint.probe_scheduler import get_probe_scheduler
+from backend.osint.probe_cache import ProbeCacheWriter, load_fresh_results_async
+from backend.osint.probe_checkpoint import ProbeCheckpoint, load_checkpoint
+from backend.osint.site_catalog import SiteSpec, get_site_catalog
+from backend.osint.site_health import SiteHealthRecorder, site_health_for
+from backend.scan_budget import module_coverage, time_left
 
 logger = logging.getLogger("osint_api")
 
@@ -36,108 +43,320 @@ BROWSER_HEADERS = {
     "Upgrade-Insecure-Requests": "1"
 }
 
-# Establish a Redis connection gracefully
-try:
-    redis_client = redis.from_url(REDIS_URL, decode_responses=True)
-    # Ping to ensure connection is actually alive
-    redis_client.ping()
-    SHERLOCK_SITES_KEY = "sherlock_sites"
-except (redis.exceptions.ConnectionError, redis.exceptions.TimeoutError) as e:
-    logger.error(f"Could not connect to Redis for caching: {e}")
-    redis_client = None
+# Statuses meaning "this server does not do HEAD properly" - retry those with GET
+HEAD_FALLBACK_STATUSES = {403, 405, 501}
+# Only these (and a 200) are definitive for status-code sites. Blocks, rate limits and
+# 5xx count as site failures and are never cached; any other status is inconclusive.
+ABSENT_STATUSES = {404, 410}
+BLOCKED_STATUSES = {403, 429}
 
 
-async def _get_sherlock_sites(client: httpx.AsyncClient) -> dict:
+async def _get_sherlock_sites(client: httpx.AsyncClient) -> Tuple[str, List[SiteSpec], Dict[str, Tuple[float, bool]]]:
     """
-    Fetches Sherlock sites, using Redis as a cache with a 24-hour TTL.
+    Returns the catalog version, its first SHERLOCK_SITE_LIMIT usable sites and
+    this scan's {site: (adaptive timeout, circuit_open)}.
     """
-    if redis_client:
-        try:
-            cached_sites = redis_client.get(SHERLOCK_SITES_KEY)
-            if cached_sites:
-                logger.info("Sherlock sites found in cache.")
-                return json.loads(cached_sites)
-        except redis.RedisError as e:
-            logger.warning(f"Redis get error: {e}")
-
-    logger.info("Fetching Sherlock sites from source...")
-    try:
-        sites_resp = await client.get(SHERLOCK_URL)
-        sites_resp.raise_for_status() 
-        all_sites = sites_resp.json()
-
-        if redis_client:
-            try:
-                # Cache for 24 hours (86400 seconds)
-                redis_client.setex(SHERLOCK_SITES_KEY, 86400, json.dumps(all_sites))
-                logger.info("Sherlock sites cached in Redis.")
-            except redis.RedisError as e:
-                logger.warning(f"Redis set error: {e}")
-                
-    except Exception as e:
-        logger.warning(f"Could not fetch Sherlock sites, using fallback: {e}")
-        all_sites = FALLBACK_SITES
+    catalog = await get_site_catalog(client, BROWSER_HEADERS, FALLBACK_SITES)
+    specs = catalog.active()[:SHERLOCK_SITE_LIMIT]
+    return catalog.version, specs, await site_health_for(specs)
 
-    return all_sites
 
+async def iter_username_findings(
+    username: str,
+    scan_id: str | None = None,
+    force_refresh: bool = False,
+    deadline: float | None = None,
+    coverage: dict | None = None,
+    prior_hits: Set[str] | None = None,
+    reuse_prior_misses: bool = False,
+) -> AsyncIterator[Dict]:
+    """
+    Yields Sherlock hits as soon as each probe completes, so one slow site
+    no longer holds back every other result. Pending probes are cancelled if
+    the consumer stops iterating early.
+
+    Sites with a fresh cached outcome for this username are not probed again
+    (cached hits are yielded first) unless `force_refresh` is set.
 
-async def check_username_with_sherlock(username: str) -> List[Dict]:
+    With a `scan_id`, definitive probe answers are checkpointed so a retry of the same
+    scan only probes the sites the previous attempt did not get an answer from.
+
+    With a `deadline` (unix time), probes still pending when it passes are cancelled
+    and iteration ends normally. `coverage`, if given, receives how many of the
+    sites were checked (probed, cached or resumed) and how many were skipped and why
+    (see scan_budget.module_coverage).
+
+    For rescans, `prior_hits` (sites the base scan found) are probed first, and with
+    `reuse_prior_misses` every other site is taken as still not found.
+    """
     if not username:
-        return []
-
-    # Injecting the headers here to look like a real user
-    async with httpx.AsyncClient(headers=BROWSER_HEADERS, timeout=60.0, follow_redirects=True) as client:
-        try:
-            all_sites = await _get_sherlock_sites(client)
-            top_sites = list(all_sites.items())[:SHERLOCK_SITE_LIMIT]
-            
-            tasks = []
-            for site_name, info in top_sites:
-                # FIX: Skip metadata keys like "$schema" that are strings instead of dicts
-                if not isinstance(info, dict):
-                    continue
-                    
-                if "{}" in info.get("url", ""):
-                    url = info["url"].format(username)
-                    tasks.append(_probe(client, site_name, url, info))
-
-            results = await asyncio.gather(*tasks)
-            # Filter out None values
-            return [r for r in results if r]
-
-        except httpx.HTTPStatusError as e:
-            logger.error(f"Could not fetch Sherlock site list: {e.request.url} - {e.response.status_code}")
-            return []
-        except Exception as e:
-            logger.error(f"Username Scan Error: {e}")
-            return []
-
-async def _probe(client: httpx.AsyncClient, name: str, url: str, info: dict) -> dict | None:
+        return
+
+    # Shared pooled client: consecutive scans reuse warm connections to the same hosts
+    client = get_http_client()
+    # The scheduler caps in-flight probes and shares slots fairly between scans
+    scheduler = get_probe_scheduler()
+    scan_key = scan_id or uuid.uuid4().hex
+    scheduler.begin_scan(scan_key)
+    # Latency/error outcomes feed the per-site timeouts and circuit breakers
+    health = SiteHealthRecorder()
+    # Definitive outcomes (found / not found) are cached per (username, site)
+    cache = ProbeCacheWriter(username)
+    cached = {} if force_refresh else await load_fresh_results_async(username)
+    checkpoint = None
+    sites = []
+    tasks = []
+    known = 0  # sites answered from the probe cache or an earlier attempt's checkpoint
+    skipped = {"circuit_open": 0, "username_rejected": 0, "prior_miss": 0}
+    status = "complete"
     try:
-        # We use a slightly shorter timeout for individual probes so one slow site doesn't hang the batch
-        resp = await client.get(url, timeout=15.0)
-        
-        error_type = info.get("errorType", "status_code")
-
-        # False Positive Check: Did the site redirect us away from the profile page?
-        if str(resp.url) != url and "login" in str(resp.url).lower():
-             logger.debug(f"[{name}] False positive prevented: Redirected to login.")
-             return None
-
-        if error_type == "status_code":
-            if resp.status_code == 200:
-                return {"site": name, "url": url}
-                
-        elif error_type == "message":
-            error_msg = info.get("errorMsg", "")
+        # The catalog fetch can hit the network, so it counts against the scan budget too
+        async with asyncio.timeout(time_left(deadline)):
+            version, sites, site_health = await _get_sherlock_sites(client)
+        finished, resumed_hits = set(), {}
+        if scan_id:
+            finished, resumed_hits = await load_checkpoint(scan_id, version)
+            checkpoint = ProbeCheckpoint(scan_id, version)
+            if finished:
+                logger.info(f"[{scan_key}] Resuming: {len(finished)} sites already probed by an earlier attempt.")
+
+        order = list(enumerate(sites))
+        if prior_hits:
+            # Profiles the base scan found are re-checked first (stable sort keeps catalog order)
+            order.sort(key=lambda item: item[1].name not in prior_hits)
+
+        cached_hits = [{"site": site, "url": url} for site, url in resumed_hits.items()]
+        for position, spec in order:
+            if position in finished:
+                known += 1
+                continue
+            if spec.name in cached:
+                if cached[spec.name]:
+                    cached_hits.append({"site": spec.name, "url": spec.url_for(username)})
+                known += 1
+                continue
+            if reuse_prior_misses and prior_hits is not None and spec.name not in prior_hits:
+                skipped["prior_miss"] += 1
+                continue
+
+            # Repeatedly failing sites are skipped until their cool-down expires,
+            # and sites whose regexCheck rejects this username are never probed
+            timeout, circuit_open = site_health[spec.name]
+            if circuit_open:
+                skipped["circuit_open"] += 1
+                continue
+            if not spec.accepts(username):
+                skipped["username_rejected"] += 1
+                continue
+
+            url = spec.url_for(username)
+            tasks.append(asyncio.ensure_future(_checkpointed(
+                checkpoint, position, spec, url,
+                lambda spec=spec, url=url, timeout=timeout: scheduler.run(
+                    scan_key, url, lambda: _probe(client, spec, url, timeout, health, cache)),
+            )))
+
+        if cached:
+            logger.info(f"[{scan_key}] Probe cache: {len(cached)} sites fresh, probing {len(tasks)}.")
+        for hit in cached_hits:
+            yield hit
+
+        for next_done in asyncio.as_completed(tasks, timeout=time_left(deadline)):
+            result = await next_done
+            if checkpoint:
+                await checkpoint.maybe_flush()
+            # None for misses and failures
+            if result:
+                yield result
+
+    except TimeoutError:
+        status = "timed_out"
+        logger.warning(f"[{scan_key}] Scan budget used up, cancelling unfinished probes.")
+    except Exception as e:
+        # The sweep stopped part way; what it found is kept but it is not a complete answer
+        status = "failed"
+        logger.error(f"Username Scan Error: {e}")
+    finally:
+        probed = 0
+        for task in tasks:
+            if task.done():
+                probed += 1
+            else:
+                task.cancel()
+        if coverage is not None:
+            coverage.update(module_coverage(
+                status, known + probed, len(sites),
+                skipped={reason: n for reason, n in skipped.items() if n},
+            ))
+        await health.flush()
+        await cache.flush()
+        if checkpoint:
+            await checkpoint.flush()
+        stats = scheduler.end_scan(scan_key)
+        logger.info(f"[{scan_key}] Sherlock probe timing: {stats.summary()}")
+
+
+async def _checkpointed(
+    checkpoint: ProbeCheckpoint | None, position: int, spec: SiteSpec, url: str, run: Callable[[], Awaitable[bool | None]],
+) -> dict | None:
+    """
+    Runs the probe and returns the hit, if any. Only a definitive answer marks the
+    site finished: a blocked, failed or inconclusive probe (like a cancelled one)
+    is probed again when the scan resumes.
+    """
+    found = await run()
+    hit = {"site": spec.name, "url": url} if found else None
+    if checkpoint and found is not None:
+        checkpoint.record(position, hit)
+    return hit
+
+
+async def check_username_with_sherlock(username: str, scan_id: str | None = None, force_refresh: bool = False) -> List[Dict]:
+    """Collects every hit from iter_username_findings into a list."""
+    return [hit async for hit in iter_username_findings(username, scan_id, force_refresh)]
+
+def _redirected_to_login(resp: httpx.Response, url: str) -> bool:
+    """False Positive Check: Did the site redirect us away from the profile page?"""
+    return str(resp.url) != url and "login" in str(resp.url).lower()
+
+
+class ProbeBlocked(Exception):
+    """The site answered, but with a block or an error (403, 429, 5xx) that says nothing about the profile."""
+
+
+def _check_blocked(resp: httpx.Response) -> None:
+    if resp.status_code in BLOCKED_STATUSES or resp.status_code >= 500:
+        raise ProbeBlocked(f"HTTP {resp.status_code}")
+
+
+def _status_outcome(spec: SiteSpec, resp: httpx.Response, url: str) -> bool | None:
+    """Found / not found for a status-code site, or None when the status proves neither."""
+    if _redirected_to_login(resp, url):
+        logger.debug(f"[{spec.name}] False positive prevented: Redirected to login.")
+        # A login wall says nothing about the profile: neither reported nor cached
+        return None
+    _check_blocked(resp)
+    if resp.status_code == 200:
+        return True
+    if resp.status_code in ABSENT_STATUSES:
+        return False
+    return None
+
+
+async def _body_contains(resp: httpx.Response, needles: Tuple[bytes, ...]) -> bool | None:
+    """
+    Reads the body chunk by chunk and stops as soon as a marker shows up or
+    PROBE_MAX_BODY_BYTES have been read. A small tail is carried over so a marker
+    split across two chunks is still found. Returns None if the cap was reached
+    first: the marker may still come later in the page.
+    """
+    keep = max(len(n) for n in needles) - 1
+    tail = b""
+    read = 0
+    async for chunk in resp.aiter_bytes():
+        read += len(chunk)
+        window = tail + chunk
+        if any(n in window for n in needles):
+            return True
+        if read >= PROBE_MAX_BODY_BYTES:
+            return None
+        tail = window[-keep:] if keep else b""
+    return False
+
+
+async def _probe_cheap(client: httpx.AsyncClient, spec: SiteSpec, url: str, timeout: float) -> bool | None:
+    """
+    HEAD for status-code sites, early-terminating streamed GET for message sites.
+    Returns True (found), False (not found) or None (inconclusive); raises ProbeBlocked.
+    """
+    if spec.error_type == "status_code":
+        resp = await client.head(url, headers=BROWSER_HEADERS, follow_redirects=True, timeout=timeout)
+        if resp.status_code in HEAD_FALLBACK_STATUSES:
+            # Some sites reject HEAD outright; open a GET but never read its body
+            async with client.stream("GET", url, headers=BROWSER_HEADERS, follow_redirects=True, timeout=timeout) as resp:
+                return _status_outcome(spec, resp, url)
+        return _status_outcome(spec, resp, url)
+
+    if spec.error_type == "message":
+        # Without an errorMsg there is nothing to tell a profile from an error page
+        if not spec.error_needles:
+            return None
+        async with client.stream("GET", url, headers=BROWSER_HEADERS, follow_redirects=True, timeout=timeout) as resp:
+            if _redirected_to_login(resp, url):
+                logger.debug(f"[{spec.name}] False positive prevented: Redirected to login.")
+                return None
+            _check_blocked(resp)
+            # Only a 200 carries the page the error message is looked for in
+            if resp.status_code != 200:
+                return None
             # If the error message is NOT in the text, it means the profile likely exists
-            if error_msg and error_msg not in resp.text:
-                if resp.status_code == 200:
-                    return {"site": name, "url": url}
-                    
+            contains = await _body_contains(resp, spec.error_needles)
+        if contains is None:
+            # Heavy page: the marker may sit past the cap, so read the whole page instead
+            logger.debug(f"[{spec.name}] No marker in the first {PROBE_MAX_BODY_BYTES} bytes, reading the full page.")
+            return await _probe_full(client, spec, url, timeout)
+        return not contains
+
+    return None
+
+
+async def _probe_full(client: httpx.AsyncClient, spec: SiteSpec, url: str, timeout: float) -> bool | None:
+    """Original probe: full GET with the whole body buffered. Same outcomes as _probe_cheap."""
+    resp = await client.get(url, headers=BROWSER_HEADERS, follow_redirects=True, timeout=timeout)
+
+    if spec.error_type == "status_code":
+        return _status_outcome(spec, resp, url)
+
+    if _redirected_to_login(resp, url):
+        logger.debug(f"[{spec.name}] False positive prevented: Redirected to login.")
+        return None
+
+    if spec.error_type == "message":
+        _check_blocked(resp)
+        if resp.status_code != 200 or not spec.error_markers:
+            return None
+        # If the error message is NOT in the text, it means the profile likely exists
+        return not any(m in resp.text for m in spec.error_markers)
+
+    return None
+
+
+async def _probe(
+    client: httpx.AsyncClient,
+    spec: SiteSpec,
+    url: str,
+    timeout: float,
+    health: SiteHealthRecorder | None = None,
+    cache: ProbeCacheWriter | None = None,
+) -> bool | None:
+    """True (found), False (not found) or None when the site gave no definitive answer."""
+    started = time.perf_counter()
+    try:
+        # Each site gets its own timeout derived from its recorded latency (see site_health)
+        if PROBE_MODE == "full":
+            found = await _probe_full(client, spec, url, timeout)
+        else:
+            found = await _probe_cheap(client, spec, url, timeout)
+
+        # Any answer short of a block or 5xx means the site is healthy
+        if health:
+            health.record(spec.name, time.perf_counter() - started, ok=True)
+        # Only definitive answers are cached; an inconclusive one is asked again next scan
+        if cache and found is not None:
+            cache.record(spec.name, found)
+        return found
+
+    except ProbeBlocked as e:
+        logger.debug(f"[{spec.name}] Probe blocked at {url}: {e}")
+        if health:
+            health.record(spec.name, time.perf_counter() - started, ok=False)
     except httpx.TimeoutException:
-        logger.debug(f"[{name}] Probe timed out at {url}")
+        logger.debug(f"[{spec.name}] Probe timed out at {url}")
+        if health:
+            health.record(spec.name, time.perf_counter() - started, ok=False)
     except Exception as e:
-        logger.debug(f"[{name}] Probe failed at {url}: {e}")
+        logger.debug(f"[{spec.name}] Probe failed at {url}: {e}")
+        if health:
+            health.record(spec.name, time.perf_counter() - started, ok=False)
         
-    return None
\ No newline at end of file
+    return None
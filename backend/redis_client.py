@@ -0,0 +1,47 @@
+import asyncio
+import logging
+import redis
+import redis.asyncio as redis_async
+
+from backend.config import REDIS_URL
+
+logger = logging.getLogger("osint_api")
+
+# Shared Redis connection for caches and scan streams. Established gracefully:
+# callers must treat `redis_client is None` as "cache unavailable" and carry on.
+try:
+    redis_client = redis.from_url(REDIS_URL, decode_responses=True)
+    # Ping to ensure connection is actually alive
+    redis_client.ping()
+except (redis.exceptions.ConnectionError, redis.exceptions.TimeoutError) as e:
+    logger.error(f"Could not connect to Redis for caching: {e}")
+    redis_client = None
+
+
+# Async client for code running on the worker's event loop. Like the HTTP client it
+# is bound to the loop that created it, so it is rebuilt if the loop changes.
+_async_client = None
+_async_client_loop = None
+
+
+def get_async_redis():
+    """Returns the redis.asyncio client for the running loop, or None if Redis is down."""
+    global _async_client, _async_client_loop
+    if redis_client is None:
+        return None
+    loop = asyncio.get_running_loop()
+    if _async_client is None or _async_client_loop is not loop:
+        _async_client = redis_async.from_url(REDIS_URL, decode_responses=True)
+        _async_client_loop = loop
+    return _async_client
+
+
+async def close_async_redis() -> None:
+    global _async_client, _async_client_loop
+    if _async_client is not None:
+        try:
+            await _async_client.aclose()
+        except Exception as e:
+            logger.warning(f"Error closing async Redis client: {e}")
+    _async_client = None
+    _async_client_loop = None
@@ -0,0 +1,69 @@
+import logging
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Set
+
+from backend.config import RESCAN_BREACH_REUSE_SECONDS, RESCAN_MISS_REUSE_SECONDS, RESCAN_MAX_CHAIN
+from backend.database import get_base_scan
+from backend.findings_delta import compute_delta
+
+logger = logging.getLogger("osint_api")
+
+
+@dataclass
+class PriorScan:
+    """
+    The base scan of a rescan: its full findings and coverage. Each module's coverage
+    entry records when its answer was actually observed ("observed_at", unix time),
+    which a rescan that reuses the answer carries forward unchanged.
+    """
+    scan_id: str
+    status: str
+    findings: List[dict]
+    coverage: dict
+    chain: int
+
+    def site_hits(self) -> Set[str]:
+        return {f["value"] for f in self.findings if f.get("type") == "username"}
+
+    def _observed_within(self, module: str, max_age: float) -> Optional[float]:
+        """When the base's `module` answer was observed, if it finished and is younger than `max_age`."""
+        entry = self.coverage.get("modules", {}).get(module) or {}
+        observed_at = entry.get("observed_at")
+        if entry.get("status") != "complete" or observed_at is None or time.time() - observed_at >= max_age:
+            return None
+        return observed_at
+
+    def breaches_observed_at(self) -> Optional[float]:
+        """Set if the base's breach answer is recent enough to skip the XON lookup."""
+        return self._observed_within("XposedOrNot", RESCAN_BREACH_REUSE_SECONDS)
+
+    def reusable_breaches(self) -> Optional[List[dict]]:
+        """The base's breach findings if they are recent enough to skip the XON lookup."""
+        if self.breaches_observed_at() is None:
+            return None
+        return [f for f in self.findings if f.get("type") == "breach"]
+
+    def misses_observed_at(self) -> Optional[float]:
+        """Set if the base's full Sherlock sweep is recent enough that sites it did not find can be skipped."""
+        return self._observed_within("Sherlock", RESCAN_MISS_REUSE_SECONDS)
+
+    def delta_for(self, findings: List[dict]) -> Optional[dict]:
+        """Delta to store for the rescan, or None to store it in full (ends a long chain)."""
+        if self.chain >= RESCAN_MAX_CHAIN:
+            return None
+        return compute_delta(self.findings, findings)
+
+
+def load_prior_scan(base_scan_id: Optional[str]) -> Optional[PriorScan]:
+    if not base_scan_id:
+        return None
+    try:
+        base = get_base_scan(base_scan_id)
+    except Exception as e:
+        # A rescan without its base simply runs (and is stored) as a full scan
+        logger.warning(f"Could not load base scan {base_scan_id}: {e}")
+        return None
+    if not base:
+        return None
+    return PriorScan(base_scan_id, base["status"], base["findings"], base["coverage"], base["chain"])
@@ -0,0 +1,45 @@
+import logging
+import uuid
+from typing import List, Tuple
+
+from celery import group
+
+from backend.config import BATCH_ENQUEUE_CHUNK
+from backend.celery_worker import run_osint_scan
+from backend.scan_routing import queues_for_scans
+from backend.singleflight import normalize_target
+
+logger = logging.getLogger("osint_api")
+
+
+def dedupe_targets(targets: List[dict]) -> Tuple[List[dict], int]:
+    """
+    Normalizes targets and drops repeats (first occurrence wins; usernames compare
+    case-insensitively, like the probe cache). Returns (unique targets, duplicates dropped).
+    """
+    seen = set()
+    unique = []
+    for t in targets:
+        target = normalize_target(t.get("email"), t.get("username"), t.get("domain"))
+        kind, value = next(iter(target.items()))
+        key = (kind, value.lower())
+        if key in seen:
+            continue
+        seen.add(key)
+        target["force_refresh"] = bool(t.get("force_refresh"))
+        target["scan_id"] = str(uuid.uuid4())
+        unique.append(target)
+    return unique, len(targets) - len(unique)
+
+
+def enqueue_batch(targets: List[dict]) -> None:
+    """Publishes run_osint_scan for every target as Celery groups of BATCH_ENQUEUE_CHUNK."""
+    queues = queues_for_scans(targets)
+    for start in range(0, len(targets), BATCH_ENQUEUE_CHUNK):
+        chunk = zip(targets[start:start + BATCH_ENQUEUE_CHUNK], queues[start:start + BATCH_ENQUEUE_CHUNK])
+        group([
+            run_osint_scan.si(
+                t["scan_id"], t.get("email"), t.get("username"), t.get("domain"), t["force_refresh"],
+            ).set(queue=queue)
+            for t, queue in chunk
+        ]).apply_async()
@@ -0,0 +1,69 @@
+import logging
+import time
+from typing import Optional
+
+import redis
+
+from backend.config import SCAN_TIME_BUDGET_SECONDS
+from backend.redis_client import redis_client
+
+logger = logging.getLogger("osint_api")
+
+# The deadline is fixed the first time any part of a scan starts and stored in Redis,
+# so retries and fan-out module tasks on other workers all share one wall-clock budget.
+DEADLINE_PREFIX = "scan_deadline:"
+
+
+def scan_deadline(scan_id: str) -> Optional[float]:
+    """Unix time by which the scan must complete, or None if budgets are disabled."""
+    if SCAN_TIME_BUDGET_SECONDS <= 0:
+        return None
+    deadline = time.time() + SCAN_TIME_BUDGET_SECONDS
+    if not redis_client:
+        return deadline
+    key = f"{DEADLINE_PREFIX}{scan_id}"
+    try:
+        # Outlives the budget long enough to cover retry countdowns
+        redis_client.set(key, deadline, nx=True, ex=SCAN_TIME_BUDGET_SECONDS * 2 + 300)
+        stored = redis_client.get(key)
+        return float(stored) if stored else deadline
+    except redis.RedisError as e:
+        logger.warning(f"Could not read deadline for scan {scan_id}: {e}")
+        return deadline
+
+
+def time_left(deadline: Optional[float]) -> Optional[float]:
+    """Seconds until `deadline` (never negative), or None for no deadline."""
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.time())
+
+
+def module_coverage(status: str, checked: Optional[int] = None, total: Optional[int] = None, skipped: Optional[dict] = None) -> dict:
+    """
+    One module's entry in a scan's coverage: status is "complete", "timed_out" or "failed".
+    `skipped` counts, per reason, items left out on purpose rather than checked.
+    """
+    entry = {"status": status}
+    if total is not None:
+        entry["checked"] = checked
+        entry["total"] = total
+    if skipped:
+        entry["skipped"] = skipped
+    return entry
+
+
+def scan_coverage(deadline: Optional[float], modules: dict) -> dict:
+    """Coverage stored with a finished scan: per-module status plus budget usage."""
+    coverage = {"modules": modules}
+    if deadline is not None:
+        started = deadline - SCAN_TIME_BUDGET_SECONDS
+        coverage["budget_seconds"] = SCAN_TIME_BUDGET_SECONDS
+        coverage["elapsed_seconds"] = round(time.time() - started, 1)
+    return coverage
+
+
+def scan_status(coverage: dict) -> str:
+    """"Partial" if any module ran out of budget or failed part way, otherwise "Completed"."""
+    modules = coverage.get("modules", {})
+    return "Partial" if any(m.get("status") in ("timed_out", "failed") for m in modules.values()) else "Completed"
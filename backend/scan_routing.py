@@ -0,0 +1,60 @@
+import logging
+from typing import List, Optional
+
+from backend.config import (
+    SHERLOCK_SITE_LIMIT,
+    SCAN_QUEUE_FAST,
+    SCAN_QUEUE_SLOW,
+    SCAN_QUEUE_ASYNC,
+    ASYNC_WORKER_ENABLED,
+    SCAN_COST_EMAIL,
+    SCAN_COST_DOMAIN,
+    SCAN_COST_PER_PROBE,
+    SCAN_SLOW_COST_THRESHOLD,
+)
+from backend.osint.probe_cache import load_fresh_results, load_fresh_results_many
+
+logger = logging.getLogger("osint_api")
+
+
+def _cost(email: Optional[str], username: Optional[str], domain: Optional[str], cached_sites: int) -> float:
+    cost = 0.0
+    if email:
+        cost += SCAN_COST_EMAIL
+    if domain:
+        cost += SCAN_COST_DOMAIN
+    if username:
+        cost += max(0, SHERLOCK_SITE_LIMIT - cached_sites) * SCAN_COST_PER_PROBE
+    return cost
+
+
+def _queue_for_cost(cost: float) -> str:
+    if cost < SCAN_SLOW_COST_THRESHOLD:
+        return SCAN_QUEUE_FAST
+    # Expensive scans go to exactly one kind of consumer: the asyncio worker or the slow Celery pool
+    return SCAN_QUEUE_ASYNC if ASYNC_WORKER_ENABLED else SCAN_QUEUE_SLOW
+
+
+def estimate_scan_cost(email: Optional[str], username: Optional[str], domain: Optional[str], force_refresh: bool = False) -> float:
+    """
+    Rough cost of a scan in probe units. A username scan costs one unit per site that
+    will actually be probed, so a handle whose results are still cached is cheap.
+    """
+    cached = 0 if not username or force_refresh else len(load_fresh_results(username))
+    return _cost(email, username, domain, cached)
+
+
+def queue_for_scan(email: Optional[str], username: Optional[str], domain: Optional[str], force_refresh: bool = False) -> str:
+    """Routes cheap scans to the fast queue and expensive ones to the slow (or async worker) queue."""
+    return _queue_for_cost(estimate_scan_cost(email, username, domain, force_refresh))
+
+
+def queues_for_scans(targets: List[dict]) -> List[str]:
+    """queue_for_scan for many targets, reading the probe cache in one round trip."""
+    lookups = [t["username"] for t in targets if t.get("username") and not t.get("force_refresh")]
+    cached = dict(zip(lookups, load_fresh_results_many(lookups)))
+    queues = []
+    for t in targets:
+        cached_sites = 0 if t.get("force_refresh") else len(cached.get(t.get("username"), {}))
+        queues.append(_queue_for_cost(_cost(t.get("email"), t.get("username"), t.get("domain"), cached_sites)))
+    return queues
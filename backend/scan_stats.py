@@ -0,0 +1,71 @@
+import json
+import logging
+from typing import Awaitable, Callable
+
+import redis
+
+from backend.config import SCAN_STATS_TTL
+from backend.redis_client import redis_client, get_async_redis
+
+logger = logging.getLogger("osint_api")
+
+# Dashboard aggregates are cached under the owner's current generation. Invalidating
+# bumps the generation instead of deleting the entry, so a computation that raced a
+# change can only ever store its result under the generation it already read.
+
+
+def _generation_key(owner: str) -> str:
+    return f"scan_stats_gen:{owner}"
+
+
+def _stats_key(owner: str, generation: str) -> str:
+    return f"scan_stats:{owner}:{generation}"
+
+
+async def cached_scan_stats(owner: str, compute: Callable[[str], Awaitable[dict]]) -> dict:
+    """The owner's cached stats, or `compute(owner)` stored for the next call."""
+    client = get_async_redis()
+    if client is None:
+        return await compute(owner)
+    try:
+        generation = await client.get(_generation_key(owner)) or "0"
+        cached = await client.get(_stats_key(owner, generation))
+    except redis.RedisError as e:
+        logger.warning(f"Could not read scan stats cache for {owner}: {e}")
+        return await compute(owner)
+    if cached:
+        return json.loads(cached)
+
+    stats = await compute(owner)
+    try:
+        await client.set(_stats_key(owner, generation), json.dumps(stats), ex=SCAN_STATS_TTL)
+    except redis.RedisError as e:
+        logger.warning(f"Could not cache scan stats for {owner}: {e}")
+    return stats
+
+
+def invalidate_scan_stats(*owners: str) -> None:
+    """Called after a write to these owners' scans has committed."""
+    if not redis_client or not owners:
+        return
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        for owner in set(owners):
+            pipe.incr(_generation_key(owner))
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Could not invalidate scan stats for {', '.join(set(owners))}: {e}")
+
+
+async def invalidate_scan_stats_async(*owners: str) -> None:
+    """invalidate_scan_stats for the async database layer."""
+    client = get_async_redis()
+    if client is None or not owners:
+        return
+    try:
+        pipe = client.pipeline(transaction=False)
+        for owner in set(owners):
+            pipe.incr(_generation_key(owner))
+        await pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Could not invalidate scan stats for {', '.join(set(owners))}: {e}")
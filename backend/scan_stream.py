@@ -0,0 +1,79 @@
+import json
+import logging
+from typing import List, Dict
+
+import redis
+
+from backend.config import SCAN_STREAM_MAXLEN, SCAN_STREAM_TTL
+from backend.redis_client import redis_client, get_async_redis
+
+logger = logging.getLogger("osint_api")
+
+
+def stream_key(scan_id: str) -> str:
+    return f"scan_stream:{scan_id}"
+
+
+async def publish_findings(scan_id: str, findings: List[Dict]) -> None:
+    """Appends a batch of new findings to the scan's Redis stream without blocking the loop."""
+    client = get_async_redis()
+    if client is None or not findings:
+        return
+    try:
+        pipe = client.pipeline(transaction=False)
+        pipe.xadd(
+            stream_key(scan_id),
+            {"event": "findings", "findings": json.dumps(findings)},
+            maxlen=SCAN_STREAM_MAXLEN,
+            approximate=True,
+        )
+        pipe.expire(stream_key(scan_id), SCAN_STREAM_TTL)
+        await pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Could not publish findings for {scan_id}: {e}")
+
+
+def publish_status(scan_id: str, status: str) -> None:
+    """Marks the end of a scan on its stream so consumers can stop reading."""
+    if not redis_client:
+        return
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.xadd(stream_key(scan_id), {"event": "status", "status": status}, maxlen=SCAN_STREAM_MAXLEN, approximate=True)
+        pipe.expire(stream_key(scan_id), SCAN_STREAM_TTL)
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Could not publish status for {scan_id}: {e}")
+
+
+def _collect(entries) -> List[Dict]:
+    findings = []
+    for _entry_id, fields in entries:
+        if fields.get("event") == "findings":
+            findings.extend(json.loads(fields["findings"]))
+    return findings
+
+
+def read_findings(scan_id: str) -> List[Dict]:
+    """All findings published so far for a scan, in arrival order."""
+    if not redis_client:
+        return []
+    try:
+        entries = redis_client.xrange(stream_key(scan_id))
+    except redis.RedisError as e:
+        logger.warning(f"Could not read findings stream for {scan_id}: {e}")
+        return []
+    return _collect(entries)
+
+
+async def read_findings_async(scan_id: str) -> List[Dict]:
+    """read_findings for API routes, on the async Redis client."""
+    client = get_async_redis()
+    if client is None:
+        return []
+    try:
+        entries = await client.xrange(stream_key(scan_id))
+    except redis.RedisError as e:
+        logger.warning(f"Could not read findings stream for {scan_id}: {e}")
+        return []
+    return _collect(entries)
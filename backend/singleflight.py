@@ -0,0 +1,89 @@
+import logging
+from typing import List, Optional
+
+import redis
+
+from backend.config import SINGLEFLIGHT_TTL
+from backend.redis_client import redis_client
+
+logger = logging.getLogger("osint_api")
+
+# Identical targets submitted while a scan for them is in flight attach to that
+# execution instead of repeating it. The lock value is the leader's scan_id and the
+# followers set collects the scan_ids that receive the leader's findings.
+_JOIN_SCRIPT = """
+local owner = redis.call('GET', KEYS[1])
+if not owner then
+    redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+    return 1
+end
+if owner == ARGV[1] then
+    -- Retry or redelivery of the leader itself
+    redis.call('EXPIRE', KEYS[1], ARGV[2])
+    return 1
+end
+redis.call('SADD', KEYS[2], ARGV[1])
+redis.call('EXPIRE', KEYS[2], ARGV[2])
+return 0
+"""
+
+_FINISH_SCRIPT = """
+if redis.call('GET', KEYS[1]) ~= ARGV[1] then
+    return {}
+end
+local followers = redis.call('SMEMBERS', KEYS[2])
+redis.call('DEL', KEYS[1], KEYS[2])
+return followers
+"""
+
+_join_script = redis_client.register_script(_JOIN_SCRIPT) if redis_client else None
+_finish_script = redis_client.register_script(_FINISH_SCRIPT) if redis_client else None
+
+
+def normalize_target(email: Optional[str], username: Optional[str], domain: Optional[str]) -> dict:
+    """Canonical form of a single-target scan, so equivalent targets compare equal."""
+    if email:
+        return {"email": email.strip().lower()}
+    if username:
+        return {"username": username.strip().lstrip("@")}
+    return {"domain": (domain or "").strip().lower().rstrip(".")}
+
+
+def flight_key(email: Optional[str], username: Optional[str], domain: Optional[str], force_refresh: bool = False, base_scan_id: Optional[str] = None) -> str:
+    """
+    Single-flight key on (target type, normalized target, how it is scanned): a forced
+    refresh or a rescan of a given base never attaches to a differently-run execution.
+    """
+    kind, value = next(iter(normalize_target(email, username, domain).items()))
+    # Usernames compare case-insensitively, like the probe cache
+    key = f"singleflight:{kind}:{value.lower()}"
+    if force_refresh:
+        key += ":refresh"
+    if base_scan_id:
+        key += f":base:{base_scan_id}"
+    return key
+
+
+def join_flight(key: str, scan_id: str) -> bool:
+    """
+    Returns True if `scan_id` leads the execution for `key`, False if it was
+    attached as a follower of a scan already in flight.
+    """
+    if _join_script is None:
+        return True
+    try:
+        return bool(_join_script(keys=[key, f"{key}:followers"], args=[scan_id, SINGLEFLIGHT_TTL]))
+    except redis.RedisError as e:
+        logger.warning(f"Single-flight unavailable, running scan {scan_id} alone: {e}")
+        return True
+
+
+def finish_flight(key: str, scan_id: str) -> List[str]:
+    """Releases the flight and returns the follower scan_ids that need the results."""
+    if _finish_script is None:
+        return []
+    try:
+        return list(_finish_script(keys=[key, f"{key}:followers"], args=[scan_id]))
+    except redis.RedisError as e:
+        logger.warning(f"Could not release single-flight for scan {scan_id}: {e}")
+        return []
@@ -0,0 +1,88 @@
+import asyncio
+import logging
+import os
+import threading
+from typing import Awaitable, Optional, TypeVar
+
+from backend.osint.http_client import get_http_client, close_http_client
+from backend.redis_client import get_async_redis, close_async_redis
+
+logger = logging.getLogger("celery_worker")
+
+T = TypeVar("T")
+
+# One event loop per worker process, running on its own thread for the life of the
+# process. It owns the pooled HTTP client and the async Redis client, so warm
+# connections and caches survive from one task to the next.
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_thread: Optional[threading.Thread] = None
+_owner_pid: Optional[int] = None
+_lock = threading.Lock()
+
+
+async def _open_resources() -> None:
+    get_http_client()
+    get_async_redis()
+
+
+async def _close_resources() -> None:
+    await close_http_client()
+    await close_async_redis()
+
+
+def start_runtime() -> asyncio.AbstractEventLoop:
+    """
+    Starts the process-wide loop (idempotent). Called from worker_process_init;
+    also started lazily so solo/threads pools and scripts work without the signal.
+    """
+    global _loop, _thread, _owner_pid
+    with _lock:
+        # After a fork the parent's loop thread does not exist in the child
+        if _loop is not None and _owner_pid == os.getpid() and _loop.is_running():
+            return _loop
+
+        loop = asyncio.new_event_loop()
+        ready = threading.Event()
+
+        def _run() -> None:
+            asyncio.set_event_loop(loop)
+            loop.call_soon(ready.set)
+            loop.run_forever()
+
+        thread = threading.Thread(target=_run, name="osint-event-loop", daemon=True)
+        thread.start()
+        ready.wait()
+
+        _loop, _thread, _owner_pid = loop, thread, os.getpid()
+        asyncio.run_coroutine_threadsafe(_open_resources(), loop).result()
+        logger.info(f"Worker runtime started (pid {_owner_pid}).")
+        return loop
+
+
+def run_in_worker_loop(coro: Awaitable[T], timeout: Optional[float] = None) -> T:
+    """Runs `coro` on the process-wide loop and blocks the calling task until it finishes."""
+    loop = start_runtime()
+    future = asyncio.run_coroutine_threadsafe(coro, loop)
+    try:
+        return future.result(timeout)
+    except BaseException:
+        future.cancel()
+        raise
+
+
+def stop_runtime() -> None:
+    """Closes pooled resources and stops the loop. Called on worker process shutdown."""
+    global _loop, _thread, _owner_pid
+    with _lock:
+        if _loop is None or _owner_pid != os.getpid():
+            return
+        loop, thread = _loop, _thread
+        try:
+            asyncio.run_coroutine_threadsafe(_close_resources(), loop).result(timeout=10)
+        except Exception as e:
+            logger.warning(f"Error closing worker resources: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=10)
+        loop.close()
+        _loop, _thread, _owner_pid = None, None, None
+        logger.info("Worker runtime stopped.")
@@ -0,0 +1,172 @@
+import atexit
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List, Optional
+
+from backend import database
+from backend.config import WRITE_BEHIND_ENABLED, WRITE_BEHIND_BATCH, WRITE_BEHIND_INTERVAL, WRITE_BEHIND_LINGER, WRITE_BEHIND_WAIT_TIMEOUT
+
+logger = logging.getLogger("celery_worker")
+
+
+class WriteBehindBuffer:
+    """
+    Collects scan result writes and applies them in batched transactions from a
+    background thread, when WRITE_BEHIND_BATCH scans are pending or every
+    WRITE_BEHIND_INTERVAL seconds. Writes for the same scan coalesce (latest wins).
+
+    Partial "Running" writes return immediately. Final writes block until their batch
+    has committed and raise if it failed, so a task is never acked before its result
+    is durable.
+    """
+
+    def __init__(self, batch_size: int, interval: float, linger: float):
+        self._batch_size = max(1, batch_size)
+        self._interval = interval
+        self._linger = linger
+        self._pending: Dict[str, dict] = {}
+        self._waiters: Dict[str, List[Future]] = {}
+        self._urgent = False
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="scan-write-behind", daemon=True)
+        self._thread.start()
+
+    def submit(self, update: dict, wait: bool) -> Optional[Future]:
+        scan_id = update["scan_id"]
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("write-behind buffer is closed")
+            existing = self._pending.get(scan_id)
+            # A late partial write must not replace a final one still waiting to be written
+            if update["status"] == "Running" and existing and existing["status"] != "Running":
+                return None
+            self._pending[scan_id] = update
+            future = None
+            if wait:
+                future = Future()
+                self._waiters.setdefault(scan_id, []).append(future)
+                self._urgent = True
+            if self._urgent or len(self._pending) >= self._batch_size:
+                self._cond.notify()
+        return future
+
+    def close(self, timeout: float = 30) -> None:
+        """Flushes everything still pending and stops the flush thread."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.error("Write-behind buffer did not drain before shutdown.")
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                deadline = time.monotonic() + self._interval
+                while not self._closed and not self._urgent and len(self._pending) < self._batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                closing, urgent = self._closed, self._urgent
+
+            if urgent and not closing:
+                # Let final writes finishing at the same moment join this transaction
+                time.sleep(self._linger)
+            self._flush()
+
+            if closing:
+                with self._cond:
+                    if not self._pending:
+                        return
+                # Pending partial writes the database refused are given one more try, then dropped
+                self._flush()
+                return
+
+    def _flush(self) -> None:
+        with self._cond:
+            batch, self._pending = self._pending, {}
+            waiters = {scan_id: self._waiters.pop(scan_id) for scan_id in batch if scan_id in self._waiters}
+            self._urgent = False
+        if not batch:
+            return
+
+        failed: Dict[str, Exception] = {}
+        try:
+            database.update_scan_results(list(batch.values()))
+        except Exception as e:
+            # The transaction rolled back. Replay it one scan at a time so a single bad
+            # row only fails its own scan, not every final write sharing the batch.
+            logger.warning(f"Write-behind flush of {len(batch)} scans failed ({e}), retrying one by one.")
+            for scan_id, update in batch.items():
+                try:
+                    database.update_scan_results([update])
+                except Exception as row_error:
+                    logger.error(f"Write-behind write for scan {scan_id} failed: {row_error}")
+                    failed[scan_id] = row_error
+
+        # Final writes hand their error to the caller (which retries or fails the scan
+        # as before); partial writes are kept for the next flush unless a newer one arrived
+        with self._cond:
+            for scan_id in failed:
+                if scan_id not in waiters:
+                    self._pending.setdefault(scan_id, batch[scan_id])
+        for scan_id, futures in waiters.items():
+            for future in futures:
+                if scan_id in failed:
+                    future.set_exception(failed[scan_id])
+                else:
+                    future.set_result(None)
+
+
+# One buffer per worker process (created lazily, and again in a forked child)
+_buffer: Optional[WriteBehindBuffer] = None
+_owner_pid: Optional[int] = None
+_lock = threading.Lock()
+
+
+def _get_buffer() -> WriteBehindBuffer:
+    global _buffer, _owner_pid
+    with _lock:
+        if _buffer is None or _owner_pid != os.getpid():
+            _buffer = WriteBehindBuffer(WRITE_BEHIND_BATCH, WRITE_BEHIND_INTERVAL, WRITE_BEHIND_LINGER)
+            _owner_pid = os.getpid()
+        return _buffer
+
+
+def update_scan_result(scan_id: str, findings: list, risk_score: int, status: str = "Completed", coverage: Optional[dict] = None, delta: Optional[dict] = None) -> None:
+    """
+    Same contract as database.update_scan_result, for worker code: the write goes
+    through the process's write-behind buffer. Returns once a final (non-Running)
+    result is committed; partial results are written in the background.
+    """
+    if not WRITE_BEHIND_ENABLED:
+        database.update_scan_result(scan_id, findings, risk_score, status, coverage, delta)
+        return
+    update = {
+        "scan_id": scan_id, "findings": list(findings), "risk_score": risk_score,
+        "status": status, "coverage": coverage, "delta": delta,
+    }
+    future = _get_buffer().submit(update, wait=status != "Running")
+    if future is not None:
+        future.result(timeout=WRITE_BEHIND_WAIT_TIMEOUT)
+
+
+def close_write_behind() -> None:
+    """Flushes and stops this process's buffer. Called on worker process shutdown."""
+    global _buffer, _owner_pid
+    with _lock:
+        if _buffer is None or _owner_pid != os.getpid():
+            return
+        buffer, _buffer, _owner_pid = _buffer, None, None
+    buffer.close()
+
+
+# Solo/threads pools and scripts exit without worker_process_shutdown
+atexit.register(close_write_behind)
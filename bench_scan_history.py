@@ -0,0 +1,132 @@
+"""
+Scan history page latency: keyset cursor vs LIMIT/OFFSET.
+
+Seeds one owner with --scans rows (100k by default) in the configured MySQL database,
+then times a page of GET /scans at increasing depths with both strategies.
+Keyset pages should stay flat; OFFSET pages grow with depth.
+
+Next to the median latency it reports the rows InnoDB read for one page (the
+session's Handler_read_* counters), which does not depend on the hardware: a keyset
+page should read about --page rows at any depth, an OFFSET page depth + --page.
+
+    python bench_scan_history.py [--scans 100000] [--page 10] [--runs 20] [--keep]
+"""
+import argparse
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from backend.database import (
+    create_user,
+    encode_scan_cursor,
+    get_db_cursor,
+    get_scans_by_owner,
+    init_db,
+    list_scans_query,
+)
+
+BENCH_OWNER = "bench_scan_history"
+SEED_CHUNK = 5000
+
+OFFSET_SQL = """
+    SELECT scan_id, email, username, domain, status, risk_score, created_at
+    FROM scans WHERE owner = %s
+    ORDER BY created_at DESC, scan_id DESC
+    LIMIT %s OFFSET %s
+"""
+
+
+def seed(total: int) -> None:
+    with get_db_cursor() as c:
+        c.execute("SELECT COUNT(*) AS n FROM scans WHERE owner = %s", (BENCH_OWNER,))
+        have = c.fetchone()["n"]
+    if have >= total:
+        print(f"Reusing {have} seeded scans")
+        return
+
+    start = datetime.now() - timedelta(seconds=total)
+    for first in range(have, total, SEED_CHUNK):
+        rows = [
+            # Two scans per second, so pages also cross created_at ties
+            (str(uuid.uuid4()), BENCH_OWNER, f"user{i}@example.com", "Completed", "[]", i % 100, start + timedelta(seconds=i // 2))
+            for i in range(first, min(first + SEED_CHUNK, total))
+        ]
+        with get_db_cursor() as c:
+            c.executemany(
+                "INSERT INTO scans (scan_id, owner, email, status, findings, risk_score, created_at) VALUES (%s, %s, %s, %s, %s, %s, %s)",
+                rows,
+            )
+        print(f"Seeded {first + len(rows)}/{total}", end="\r")
+    print()
+
+
+def row_at(depth: int) -> dict:
+    with get_db_cursor() as c:
+        c.execute(OFFSET_SQL, (BENCH_OWNER, 1, depth))
+        return c.fetchone()
+
+
+def timed(fn, runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        began = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - began) * 1000)
+    return statistics.median(samples)
+
+
+def _handler_reads(c) -> int:
+    c.execute("SHOW SESSION STATUS LIKE 'Handler_read%'")
+    return sum(int(row["Value"]) for row in c.fetchall())
+
+
+def rows_read(sql: str, params: tuple) -> int:
+    """Rows the storage engine read to run `sql` once, on a single connection."""
+    with get_db_cursor() as c:
+        before = _handler_reads(c)
+        c.execute(sql, params)
+        c.fetchall()
+        return _handler_reads(c) - before
+
+
+def offset_page(page: int, depth: int) -> None:
+    with get_db_cursor() as c:
+        c.execute(OFFSET_SQL, (BENCH_OWNER, page, depth))
+        c.fetchall()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scans", type=int, default=100_000)
+    parser.add_argument("--page", type=int, default=10)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--keep", action="store_true", help="leave the seeded scans for the next run")
+    args = parser.parse_args()
+
+    init_db()
+    try:
+        create_user(BENCH_OWNER, uuid.uuid4().hex)
+    except Exception:
+        pass
+    seed(args.scans)
+
+    depths = [d for d in (0, 1_000, 10_000, 50_000, args.scans - args.page - 1) if d < args.scans]
+    print(f"{'depth':>8}  {'keyset ms':>10}  {'offset ms':>10}  {'keyset rows':>12}  {'offset rows':>12}")
+    for depth in depths:
+        # The cursor of the row just before `depth`, as a client paging from the top would hold
+        after = encode_scan_cursor(row_at(depth - 1)) if depth else None
+        keyset = timed(lambda: get_scans_by_owner(BENCH_OWNER, args.page, after), args.runs)
+        offset = timed(lambda: offset_page(args.page, depth), args.runs)
+        keyset_rows = rows_read(*list_scans_query(BENCH_OWNER, args.page, after))
+        offset_rows = rows_read(OFFSET_SQL, (BENCH_OWNER, args.page, depth))
+        print(f"{depth:>8}  {keyset:>10.2f}  {offset:>10.2f}  {keyset_rows:>12}  {offset_rows:>12}")
+
+    if not args.keep:
+        with get_db_cursor() as c:
+            c.execute("DELETE FROM users WHERE username = %s", (BENCH_OWNER,))
+        print("Removed seeded scans")
+
+
+if __name__ == "__main__":
+    main()
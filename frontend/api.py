@@ -21,6 +21,10 @@ def get_scans():
     resp = requests.get(f"{BASE_URL}/scans", headers=get_headers())
     return resp.json().get("scans", []) if resp.status_code == 200 else []
 
+def get_scan_stats():
+    resp = requests.get(f"{BASE_URL}/scans/stats", headers=get_headers())
+    return resp.json() if resp.status_code == 200 else None
+
 def start_scan(payload):
     resp = requests.post(f"{BASE_URL}/scans", json=payload, headers=get_headers())
     return resp
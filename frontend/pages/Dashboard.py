@@ -1,6 +1,6 @@
 import streamlit as st
 import pandas as pd
-from api import get_scans, get_scan_result, clear_all_scans
+from api import get_scans, get_scan_stats, get_scan_result, clear_all_scans
 
 st.set_page_config(page_title="Operations Dashboard - Nexus", page_icon="📊", layout="wide")
 
@@ -13,6 +13,7 @@ st.markdown("Monitor and decrypt intelligence payloads from past operations.")
 
 try:
     scans = get_scans()
+    stats = get_scan_stats()
 except Exception:
     st.error("Backend Server (API) is offline. Please start it to view operations.")
     st.stop()
@@ -20,15 +21,22 @@ except Exception:
 if not scans:
     st.info("No active operations found in the database. Head to 'New Scan' to initiate one.")
 else:
-    # High-level Metrics
-    total_scans = len(scans)
-    completed_scans = sum(1 for s in scans if s.get('status') == 'Completed')
-    avg_risk = sum(s.get('risk_score', 0) for s in scans) / total_scans if total_scans > 0 else 0
+    # High-level Metrics, aggregated by the API over every scan (the list below is just the latest page)
+    stats = stats or {}
+    by_status = stats.get("by_status", {})
+    risk = stats.get("risk", {})
+    total_scans = stats.get("total", len(scans))
+    completed_scans = by_status.get("Completed", 0) + by_status.get("Partial", 0)
+    avg_risk = risk.get("average") or 0
 
-    col1, col2, col3 = st.columns(3)
+    col1, col2, col3, col4 = st.columns(4)
     col1.metric("Total Operations", total_scans)
     col2.metric("Successful Traces", completed_scans)
     col3.metric("Average Threat Risk", f"{int(avg_risk)} / 100")
+    col4.metric("P90 Threat Risk", f"{risk['p90']} / 100" if risk.get("p90") is not None else "-")
+
+    if stats.get("findings_by_type"):
+        st.bar_chart(pd.Series(stats["findings_by_type"], name="Findings"))
 
     st.markdown("---")
 
@@ -89,7 +97,15 @@ else:
                 findings = result.get("findings", [])
 
                 if status == "Running":
-                    st.info("This scan is still running. Please check back later.")
+                    st.info("This scan is still running. Showing findings collected so far.")
+                    if findings:
+                        f_df = pd.DataFrame(findings)
+                        st.dataframe(f_df, use_container_width=True, hide_index=True)
+                elif status == "Partial":
+                    st.warning("This scan hit its time budget. Showing the findings it completed.")
+                    if findings:
+                        f_df = pd.DataFrame(findings)
+                        st.dataframe(f_df, use_container_width=True, hide_index=True)
                 elif status == "Failed":
                     st.error("This scan failed. Check the error details below.")
                     f_df = pd.DataFrame(findings)
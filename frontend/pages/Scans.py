@@ -169,6 +169,22 @@ def render_findings(rows):
             cols[4].write("-")
 
 
+def render_coverage(coverage):
+    """Explains what a Partial scan did and did not get to check (time budget or a module failing part way)."""
+    budget = coverage.get("budget_seconds")
+    modules = coverage.get("modules") or {}
+    timed_out = any(entry.get("status") == "timed_out" for entry in modules.values())
+    st.warning(f"The scan reached its {budget}s time budget. Results below cover only what finished in time."
+               if budget and timed_out else "The scan did not finish every module. Results below are partial.")
+    for module, entry in (coverage.get("modules") or {}).items():
+        if "total" in entry:
+            skipped = ", ".join(f"{n} {reason.replace('_', ' ')}" for reason, n in (entry.get("skipped") or {}).items())
+            st.caption(f"{module}: {entry.get('status')} ({entry.get('checked')}/{entry.get('total')} checked"
+                       + (f"; skipped: {skipped})" if skipped else ")"))
+        else:
+            st.caption(f"{module}: {entry.get('status')}")
+
+
 def render_image_analysis(uploaded_file):
     col1, col2 = st.columns([1, 1.5])
 
@@ -322,6 +338,11 @@ with tab1:
                                         status_text.success("DATA SECURED & ANALYZED.")
                                         final_data = check
                                         break
+                                    if status == "Partial":
+                                        progress_bar.progress(100)
+                                        status_text.warning("TIME BUDGET REACHED. PARTIAL RESULTS SECURED.")
+                                        final_data = check
+                                        break
                                     if status == "Failed":
                                         progress_bar.progress(100)
                                         status_text.error("SCAN FAILED OR TIMED OUT.")
@@ -344,6 +365,8 @@ with tab1:
         r_col2.metric("Total Findings", len(findings))
         
         st.markdown(f"**Status:** `{final_data.get('status')}`")
+        if final_data.get("status") == "Partial":
+            render_coverage(final_data.get("coverage") or {})
 
         if findings:
             render_findings(findings)
@@ -0,0 +1,87 @@
+import asyncio
+from types import SimpleNamespace
+
+import fakeredis
+import pytest
+
+from backend.osint import username_osint
+from backend.osint.site_catalog import SiteCatalog
+
+SHERLOCK_SITES = {
+    "Probed": {"errorType": "status_code", "url": "https://probed.example/{}"},
+    "Cached": {"errorType": "status_code", "url": "https://cached.example/{}"},
+    "Broken": {"errorType": "status_code", "url": "https://broken.example/{}"},
+    "DigitsOnly": {"errorType": "status_code", "url": "https://digits.example/{}", "regexCheck": "^[0-9]+$"},
+}
+
+
+class MemoryCheckpoint:
+    """In-process stand-in for ProbeCheckpoint, writing to the fixture's `checkpoint` namespace."""
+
+    def __init__(self, store: SimpleNamespace):
+        self._store = store
+
+    def record(self, position, hit):
+        self._store.done.add(position)
+        if hit:
+            self._store.hits[hit["site"]] = hit["url"]
+
+    async def maybe_flush(self):
+        pass
+
+    async def flush(self):
+        pass
+
+
+@pytest.fixture
+def sherlock(monkeypatch):
+    """
+    Runs iter_username_findings without network or Redis. Set `sites` (raw catalog,
+    SHERLOCK_SITES by default), `circuit_open` (site names), `cached` ({site: found})
+    and `probe` (async, same signature as _probe). Checkpoints of scans run with a
+    scan_id land in `checkpoint.done` / `checkpoint.hits`, shared by every attempt.
+    """
+    state = SimpleNamespace(
+        sites=SHERLOCK_SITES, circuit_open=set(), cached={}, probe=None,
+        checkpoint=SimpleNamespace(done=set(), hits={}),
+    )
+
+    async def get_sites(client):
+        specs = SiteCatalog.compile(state.sites, "v1").active()
+        return "v1", specs, {spec.name: (5.0, spec.name in state.circuit_open) for spec in specs}
+
+    async def fresh(username):
+        return state.cached
+
+    async def probe(*args, **kwargs):
+        return await state.probe(*args, **kwargs)
+
+    async def load_checkpoint(scan_id, catalog_version):
+        return set(state.checkpoint.done), dict(state.checkpoint.hits)
+
+    monkeypatch.setattr(username_osint, "_get_sherlock_sites", get_sites)
+    monkeypatch.setattr(username_osint, "load_fresh_results_async", fresh)
+    monkeypatch.setattr(username_osint, "_probe", probe)
+    monkeypatch.setattr(username_osint, "load_checkpoint", load_checkpoint)
+    monkeypatch.setattr(username_osint, "ProbeCheckpoint", lambda scan_id, catalog_version: MemoryCheckpoint(state.checkpoint))
+    monkeypatch.setattr("backend.osint.site_health.get_async_redis", lambda: None)
+    monkeypatch.setattr("backend.osint.probe_cache.get_async_redis", lambda: None)
+    return state
+
+
+@pytest.fixture
+def fake_redis():
+    """
+    An empty in-memory Redis (Lua scripts included). `sync` is a blocking client;
+    `get_async()` stands in for get_async_redis (one client per event loop).
+    """
+    server = fakeredis.FakeServer()
+    clients = {}
+
+    def get_async():
+        loop = asyncio.get_running_loop()
+        if loop not in clients:
+            clients[loop] = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+        return clients[loop]
+
+    return SimpleNamespace(sync=fakeredis.FakeRedis(server=server, decode_responses=True), get_async=get_async)
@@ -0,0 +1,21 @@
+from fastapi.testclient import TestClient
+
+from backend.auth.dependencies import get_current_user
+from backend.main import app
+
+# No `with` block: the lifespan (MySQL setup, stale sweep) is not run
+client = TestClient(app)
+
+
+def test_metrics_require_a_login():
+    assert client.get("/metrics").status_code == 401
+
+
+def test_an_invalid_cursor_is_a_bad_request():
+    app.dependency_overrides[get_current_user] = lambda: "alice"
+    try:
+        response = client.get("/scans", params={"after": "not-a-cursor"})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 400 and response.json()["detail"] == "Invalid cursor"
@@ -0,0 +1,109 @@
+import asyncio
+from concurrent.futures import Future
+
+import pytest
+
+from backend import async_worker
+from backend.async_worker import AsyncScanWorker
+from backend.config import ASYNC_WORKER_QUEUES, SCAN_QUEUE_ASYNC, SCAN_QUEUE_FAST, SCAN_QUEUE_SLOW
+
+ARGS = ["scan-1", "a@example.com", None, None, False]
+
+
+class FakeMessage:
+    def __init__(self, task: str = "run_osint_scan"):
+        self.headers = {"task": task, "id": "task-1"}
+        self.delivery_info = {"routing_key": "scans.fast"}
+        self.acked = self.requeued = False
+
+    def ack(self):
+        self.acked = True
+
+    def requeue(self):
+        self.requeued = True
+
+
+def finished(result=None, error=None) -> Future:
+    future = Future()
+    if error:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+    return future
+
+
+@pytest.fixture
+def worker(monkeypatch):
+    """A worker whose scans run inline; republished retries land in `worker.republished`."""
+    worker = AsyncScanWorker(concurrency=2, queues=["scans.fast"])
+    worker.republished = []
+    monkeypatch.setattr(async_worker.run_osint_scan, "apply_async", lambda **kwargs: worker.republished.append(kwargs))
+    monkeypatch.setattr(async_worker, "record_scan_start", lambda scan_id: None)
+    monkeypatch.setattr(async_worker, "join_flight", lambda flight, scan_id: True)
+    monkeypatch.setattr(async_worker, "load_prior_scan", lambda base_scan_id: None)
+    return worker
+
+
+def settle(worker: AsyncScanWorker, message: FakeMessage, future: Future) -> None:
+    worker.in_flight += 1
+    worker.outcomes.put((message, message.headers, ARGS, {}, future))
+    worker._apply_outcomes()
+
+
+def test_a_finished_scan_is_acked(worker):
+    message = FakeMessage()
+    settle(worker, message, finished(("ack", None)))
+
+    assert message.acked and not message.requeued
+    assert worker.republished == [] and worker.in_flight == 0
+
+
+def test_a_retry_is_republished_before_the_ack(worker):
+    message = FakeMessage()
+    settle(worker, message, finished(("retry", 2)))
+
+    (retry,) = worker.republished
+    assert retry["task_id"] == "task-1" and retry["queue"] == "scans.fast"
+    assert retry["args"] == ARGS and retry["retries"] == 2
+    assert message.acked
+
+
+def test_a_crashed_wrapper_is_requeued(worker):
+    message = FakeMessage()
+    settle(worker, message, finished(error=RuntimeError("boom")))
+
+    assert message.requeued and not message.acked
+
+
+def test_other_tasks_are_requeued(worker):
+    message = FakeMessage(task="scan_breach_module")
+    worker._on_message([[], {}, {}], message)
+
+    assert message.requeued and worker.in_flight == 0
+
+
+@pytest.mark.parametrize("retries, outcome", [(0, ("retry", 1)), (2, ("ack", None))])
+def test_failed_scans_retry_until_retries_run_out(worker, monkeypatch, retries, outcome):
+    failed = []
+
+    async def execute_scan(*args):
+        raise RuntimeError("XON down")
+
+    monkeypatch.setattr(async_worker, "execute_scan", execute_scan)
+    monkeypatch.setattr(async_worker, "fail_scan", lambda scan_id, flight, exc: failed.append(scan_id))
+
+    async def scenario():
+        worker.slots = asyncio.Semaphore(1)
+        return await worker._run_scan({"retries": retries}, ARGS, {})
+
+    assert asyncio.run(scenario()) == outcome
+    # Only the last attempt writes the scan off
+    assert failed == ([] if outcome[0] == "retry" else ["scan-1"])
+
+
+def test_the_async_worker_never_consumes_the_celery_pools_queues():
+    # A scans.slow message always reaches the Celery worker, which fans it out (see test_scan_fanout)
+    queues = [q.name for q in AsyncScanWorker(2, ASYNC_WORKER_QUEUES).queues]
+
+    assert queues == [SCAN_QUEUE_ASYNC]
+    assert SCAN_QUEUE_SLOW not in queues and SCAN_QUEUE_FAST not in queues
@@ -0,0 +1,86 @@
+import asyncio
+import hashlib
+import hmac
+from types import SimpleNamespace
+
+import pytest
+
+from backend.osint import breach_cache
+
+BREACH = {"type": "breach", "source": "XposedOrNot", "value": "Example", "severity": "HIGH"}
+
+
+def test_nothing_is_cached_without_a_salt(monkeypatch):
+    monkeypatch.setattr(breach_cache, "CACHE_ENABLED", False)
+    monkeypatch.setattr(breach_cache, "get_async_redis", lambda: None)
+
+    async def scenario():
+        await breach_cache.cache_breaches("a@example.com", [BREACH])
+        return await breach_cache.get_cached_breaches("a@example.com")
+
+    assert asyncio.run(scenario()) is None
+    assert breach_cache._local.get(breach_cache._email_digest("a@example.com")) is None
+
+
+@pytest.fixture
+def cache(monkeypatch, fake_redis):
+    """Salted breach cache on an empty fake Redis with a fresh local tier."""
+    monkeypatch.setattr(breach_cache, "BREACH_CACHE_SALT", "test-salt")
+    monkeypatch.setattr(breach_cache, "CACHE_ENABLED", True)
+    monkeypatch.setattr(breach_cache, "BREACH_CACHE_HIT_TTL", 1000)
+    monkeypatch.setattr(breach_cache, "BREACH_CACHE_CLEAN_TTL", 100)
+    monkeypatch.setattr(breach_cache, "_local", breach_cache._LocalLRU(16))
+    monkeypatch.setattr(breach_cache, "get_async_redis", fake_redis.get_async)
+    return fake_redis.sync
+
+
+def test_keys_are_salted_hashes_of_the_normalized_email(cache):
+    expected = hmac.new(b"test-salt", b"a@example.com", hashlib.sha256).hexdigest()
+
+    asyncio.run(breach_cache.cache_breaches(" A@Example.com ", [BREACH]))
+
+    assert cache.keys() == [breach_cache.BREACH_CACHE_PREFIX + expected]
+    assert asyncio.run(breach_cache.get_cached_breaches("a@example.com")) == [BREACH]
+
+
+def test_a_different_salt_gives_a_different_key(cache, monkeypatch):
+    digest = breach_cache._email_digest("a@example.com")
+    monkeypatch.setattr(breach_cache, "BREACH_CACHE_SALT", "other-salt")
+
+    assert breach_cache._email_digest("a@example.com") != digest
+
+
+def test_hits_and_clean_results_get_their_own_ttl(cache):
+    async def scenario():
+        await breach_cache.cache_breaches("breached@example.com", [BREACH])
+        await breach_cache.cache_breaches("clean@example.com", [])
+
+    asyncio.run(scenario())
+
+    key = lambda email: breach_cache.BREACH_CACHE_PREFIX + breach_cache._email_digest(email)
+    assert 990 < cache.ttl(key("breached@example.com")) <= 1000
+    assert 90 < cache.ttl(key("clean@example.com")) <= 100
+    # A remembered clean result is [] rather than "not cached"
+    breach_cache._local = breach_cache._LocalLRU(16)
+    assert asyncio.run(breach_cache.get_cached_breaches("clean@example.com")) == []
+
+
+def test_the_local_tier_evicts_the_least_recently_used_entry():
+    lru = breach_cache._LocalLRU(2)
+    lru.set("a", [BREACH], 60)
+    lru.set("b", [], 60)
+    lru.get("a")
+    lru.set("c", [], 60)
+
+    assert lru.get("a") == [BREACH] and lru.get("b") is None and lru.get("c") == []
+
+
+def test_local_entries_expire_on_their_own(monkeypatch):
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(breach_cache, "time", SimpleNamespace(time=lambda: clock.now))
+    lru = breach_cache._LocalLRU(4)
+    lru.set("hit", [BREACH], 60)
+    lru.set("clean", [], 10)
+
+    clock.now += 30
+    assert lru.get("hit") == [BREACH] and lru.get("clean") is None
@@ -0,0 +1,58 @@
+import asyncio
+
+import httpx
+import pytest
+
+from backend.osint import breach_osint
+
+
+@pytest.fixture
+def xon(monkeypatch):
+    """Points check_data_breaches at a fake XON answering with `state["status"]` (None times out)."""
+    calls = []
+    state = {"status": 503}
+
+    def handler(request):
+        calls.append(request.url)
+        if state["status"] is None:
+            raise httpx.ReadTimeout("timed out", request=request)
+        return httpx.Response(state["status"], json={"breaches": [["Example"]]})
+
+    async def no_wait():
+        return None
+
+    async def no_cache(email, findings=None):
+        return None
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(breach_osint, "get_http_client", lambda: client)
+    monkeypatch.setattr(breach_osint, "acquire_xon_token", no_wait)
+    monkeypatch.setattr(breach_osint, "get_cached_breaches", no_cache)
+    monkeypatch.setattr(breach_osint, "cache_breaches", no_cache)
+    return state, calls
+
+
+def test_an_outage_is_not_reported_as_clean(xon):
+    state, calls = xon
+    state["status"] = 503
+
+    with pytest.raises(breach_osint.BreachLookupError):
+        asyncio.run(breach_osint.check_data_breaches("a@example.com"))
+    assert len(calls) == 1
+
+
+def test_a_timeout_is_raised(xon):
+    state, _ = xon
+    state["status"] = None
+
+    with pytest.raises(httpx.TimeoutException):
+        asyncio.run(breach_osint.check_data_breaches("a@example.com"))
+
+
+def test_breaches_are_flattened(xon):
+    state, _ = xon
+    state["status"] = 200
+
+    found = asyncio.run(breach_osint.check_data_breaches("a@example.com"))
+
+    assert [f["name"] for f in found] == ["Example"]
@@ -0,0 +1,154 @@
+import re
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pymysql
+import pytest
+
+from backend import database
+
+
+class FakeCursor:
+    """
+    Just enough of a DictCursor over a `scans` dict (scan_id -> owner) and a list of
+    scan_findings rows for the final-write path, including the scan_findings FK.
+    """
+
+    def __init__(self, scans: dict, bases: dict | None = None):
+        self.scans = scans
+        self.bases = bases or {}
+        self.findings = []
+        self.statements = []
+        self._result = []
+
+    def execute(self, sql, params=()):
+        self.statements.append(sql)
+        if re.search(r"SELECT scan_id, owner, base_scan_id FROM scans WHERE scan_id IN", sql):
+            self._result = [{"scan_id": s, "owner": self.scans[s], "base_scan_id": self.bases.get(s)} for s in params if s in self.scans]
+        elif re.search(r"SELECT scan_id FROM scans WHERE scan_id IN", sql):
+            self._result = [{"scan_id": s} for s in params if s in self.scans]
+        elif sql.lstrip().startswith("DELETE FROM scan_findings"):
+            self.findings = [f for f in self.findings if f[0] not in params]
+
+    def executemany(self, sql, rows):
+        self.statements.append(sql)
+        if "INSERT INTO scan_findings" in sql:
+            for row in rows:
+                if row[0] not in self.scans:
+                    raise pymysql.err.IntegrityError(1452, "Cannot add or update a child row: a foreign key constraint fails")
+                self.findings.append(row)
+
+    def fetchall(self):
+        return self._result
+
+
+@pytest.fixture
+def cursor(monkeypatch):
+    fake = FakeCursor({"alive": "alice", "rescan": "alice", "base": "alice"}, {"rescan": "base"})
+
+    @contextmanager
+    def get_db_cursor():
+        yield fake
+
+    monkeypatch.setattr(database, "get_db_cursor", get_db_cursor)
+    monkeypatch.setattr(database, "invalidate_scan_stats", lambda *owners: None)
+    return fake
+
+
+FINDING = {"type": "breach", "source": "XposedOrNot", "value": "Example", "severity": "HIGH"}
+
+
+def test_final_write_of_scan_deleted_while_running_is_dropped(cursor):
+    # The scan was deleted (logout / DELETE /scans/{id}) before its worker finished
+    database.update_scan_result("deleted", [FINDING], 15)
+
+    assert cursor.findings == []
+    assert not any("INSERT INTO scan_findings" in sql for sql in cursor.statements)
+
+
+def test_batch_with_a_deleted_scan_still_stores_the_others(cursor):
+    database.update_scan_results([
+        {"scan_id": "deleted", "findings": [FINDING], "risk_score": 15, "status": "Completed"},
+        {"scan_id": "alive", "findings": [FINDING], "risk_score": 15, "status": "Completed"},
+    ])
+
+    assert [row[0] for row in cursor.findings] == ["alive"]
+
+
+def test_findings_by_type_counts_rescans_in_full():
+    # MySQL is not available to the tests; SQLite runs the same recursive CTE
+    import sqlite3
+
+    db = sqlite3.connect(":memory:")
+    db.row_factory = sqlite3.Row
+    db.executescript("""
+        CREATE TABLE scans (scan_id TEXT, owner TEXT, stored_as TEXT, base_scan_id TEXT);
+        CREATE TABLE scan_findings (scan_id TEXT, type TEXT, delta_op TEXT);
+        INSERT INTO scans VALUES ('full', 'alice', 'full', NULL), ('rescan', 'alice', 'delta', 'full'),
+                                 ('again', 'alice', 'delta', 'rescan'), ('running', 'alice', NULL, NULL);
+        INSERT INTO scan_findings VALUES ('full', 'breach', NULL), ('full', 'breach', NULL), ('full', 'account', NULL),
+                                         ('rescan', 'breach', 'added'), ('rescan', 'account', 'removed'),
+                                         ('again', 'account', 'added');
+    """)
+    rows = db.execute(database.SCAN_STATS_TYPES_SQL.replace("%s", "?"), ("alice",)).fetchall()
+
+    # full: 2 breach + 1 account; rescan: 3 breach; again: 3 breach + 1 account
+    assert database.scan_stats_from_rows([], [], [dict(r) for r in rows])["findings_by_type"] == {"breach": 8, "account": 2}
+
+
+def test_materializing_writes_the_full_findings_then_marks_the_scan_full(cursor):
+    database._materialize(cursor, "alive", [FINDING])
+
+    assert [row[0] for row in cursor.findings] == ["alive"]
+    assert cursor.statements[-1] == database.MATERIALIZE_SQL
+
+
+def test_rescan_whose_base_was_deleted_while_running_is_stored_in_full(cursor):
+    del cursor.scans["base"]
+    unchanged = {**FINDING, "value": "Unchanged"}
+    database.update_scan_result("rescan", [FINDING, unchanged], 15, delta={"added": [FINDING], "removed": []})
+
+    stored = [row for row in cursor.findings if row[0] == "rescan"]
+    assert [row[2] for row in stored] == [None, None]
+    assert [row[5] for row in stored] == ["Example", "Unchanged"]
+
+
+def test_rescan_with_its_base_still_there_stores_the_delta(cursor):
+    database.update_scan_result("rescan", [FINDING], 15, delta={"added": [FINDING], "removed": []})
+
+    assert [row[2] for row in cursor.findings] == ["added"]
+
+
+def test_late_partial_write_does_not_reopen_a_finished_scan():
+    import sqlite3
+
+    db = sqlite3.connect(":memory:")
+    db.execute("CREATE TABLE scans (scan_id TEXT, status TEXT, findings TEXT, risk_score INT)")
+    db.execute("INSERT INTO scans VALUES ('done', 'Completed', NULL, 40), ('busy', 'Running', '[]', 0)")
+    db.executemany(database.UPDATE_RUNNING_SQL.replace("%s", "?"), [("Running", "[1]", 5, "done"), ("Running", "[1]", 5, "busy")])
+
+    assert db.execute("SELECT scan_id, status, risk_score FROM scans ORDER BY scan_id").fetchall() == [
+        ("busy", "Running", 5), ("done", "Completed", 40),
+    ]
+
+
+def test_scan_cursor_round_trips_and_rejects_garbage():
+    row = {"created_at": datetime(2026, 1, 1, 10, 0, 0, 123456), "scan_id": "550e8400-e29b-41d4-a716-446655440000"}
+
+    assert database.decode_scan_cursor(database.encode_scan_cursor(row)) == (row["created_at"], row["scan_id"])
+    for cursor in ["", "not-a-cursor", "!!!", database.encode_scan_cursor(row)[:12]]:
+        with pytest.raises(ValueError):
+            database.decode_scan_cursor(cursor)
+
+
+def test_next_page_seeks_past_the_last_row_shown():
+    start = datetime(2026, 1, 1)
+    rows = [{"scan_id": f"s{i}", "created_at": start - timedelta(minutes=i)} for i in range(3)]
+
+    page, next_cursor = database.scan_page(rows, 2)
+    assert [r["scan_id"] for r in page] == ["s0", "s1"]
+    sql, params = database.list_scans_query("alice", 2, next_cursor)
+    assert "created_at < %s" in sql and params == ("alice", rows[1]["created_at"], rows[1]["created_at"], "s1", 3)
+
+    # The look-ahead row is what tells a last page apart
+    assert database.scan_page(rows[:2], 2) == (rows[:2], None)
@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+from backend import database_async
+
+
+class FakeConnection:
+    def __init__(self):
+        self.calls = []
+
+    def cursor(self):
+        conn = self
+
+        class Cursor:
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+            async def execute(self, sql, params=()):
+                conn.calls.append(sql)
+
+        return Cursor()
+
+    async def commit(self):
+        self.calls.append("COMMIT")
+
+    async def rollback(self):
+        self.calls.append("ROLLBACK")
+
+
+class FakePool:
+    """Hands out the same FakeConnection every time."""
+
+    def __init__(self):
+        self.conn = FakeConnection()
+
+    def acquire(self):
+        conn = self.conn
+
+        class Acquire:
+            async def __aenter__(self):
+                return conn
+
+            async def __aexit__(self, *exc):
+                return False
+
+        return Acquire()
+
+
+@pytest.fixture
+def pools(monkeypatch):
+    created = []
+
+    async def create_pool(**kwargs):
+        created.append(FakePool())
+        return created[-1]
+
+    monkeypatch.setattr(database_async.aiomysql, "create_pool", create_pool)
+    monkeypatch.setattr(database_async, "_pool", None)
+    monkeypatch.setattr(database_async, "_pool_loop", None)
+    return created
+
+
+def test_statements_commit_on_success_and_roll_back_on_error(pools):
+    async def scenario():
+        async with database_async.get_async_db_cursor() as c:
+            await c.execute("UPDATE ok")
+        with pytest.raises(RuntimeError):
+            async with database_async.get_async_db_cursor() as c:
+                await c.execute("UPDATE broken")
+                raise RuntimeError("lost connection")
+
+    asyncio.run(scenario())
+
+    (pool,) = pools
+    assert pool.conn.calls == ["UPDATE ok", "COMMIT", "UPDATE broken", "ROLLBACK"]
+
+
+def test_the_pool_is_reused_on_its_loop_and_recreated_on_a_new_one(pools):
+    async def twice():
+        return await database_async.get_async_pool(), await database_async.get_async_pool()
+
+    first, again = asyncio.run(twice())
+    (other, _) = asyncio.run(twice())
+
+    assert first is again
+    assert other is not first and len(pools) == 2
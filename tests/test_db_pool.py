@@ -0,0 +1,160 @@
+import threading
+import time
+
+import pymysql
+import pytest
+
+from backend.db_pool import ConnectionPool, PoolTimeout
+
+
+class FakeConnection:
+    def __init__(self, number: int):
+        self.number = number
+        self.open = True
+        self.pings = 0
+        self.ping_error = None
+
+    def ping(self, reconnect: bool = False):
+        self.pings += 1
+        if self.ping_error:
+            raise self.ping_error
+
+    def close(self):
+        self.open = False
+
+
+class Factory:
+    def __init__(self):
+        self.made = []
+        self._lock = threading.Lock()
+
+    def __call__(self) -> FakeConnection:
+        with self._lock:
+            conn = FakeConnection(len(self.made))
+            self.made.append(conn)
+            return conn
+
+
+def make_pool(max_size=2, timeout=1.0, max_lifetime=60.0, ping_interval=60.0):
+    factory = Factory()
+    return ConnectionPool(factory, max_size, timeout, max_lifetime, ping_interval), factory
+
+
+def test_concurrent_threads_never_exceed_the_pool_size():
+    pool, factory = make_pool(max_size=3, timeout=5.0)
+    in_use, peak, errors = set(), [0], []
+    lock = threading.Lock()
+
+    def worker():
+        try:
+            for _ in range(50):
+                with pool.connection() as conn:
+                    with lock:
+                        assert conn not in in_use, "connection handed to two threads"
+                        in_use.add(conn)
+                        peak[0] = max(peak[0], len(in_use))
+                    time.sleep(0.0005)
+                    with lock:
+                        in_use.discard(conn)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert peak[0] <= 3 and len(factory.made) <= 3
+    stats = pool.stats()
+    assert stats["checkouts"] == 400 and stats["in_use"] == 0 and stats["waiting"] == 0
+
+
+def test_a_full_pool_waits_for_a_release():
+    pool, factory = make_pool(max_size=1, timeout=2.0)
+    first = pool.acquire()
+    threading.Timer(0.05, pool.release, args=(first,)).start()
+
+    started = time.monotonic()
+    second = pool.acquire()
+
+    assert second is first and time.monotonic() - started >= 0.04
+    assert len(factory.made) == 1
+
+
+def test_a_full_pool_times_out():
+    pool, _ = make_pool(max_size=1, timeout=0.1)
+    pool.acquire()
+
+    started = time.monotonic()
+    with pytest.raises(PoolTimeout):
+        pool.acquire()
+
+    assert time.monotonic() - started >= 0.1
+    assert pool.stats()["timeouts"] == 1
+
+
+def test_connections_that_failed_are_discarded():
+    pool, factory = make_pool(max_size=1)
+    with pytest.raises(pymysql.err.OperationalError):
+        with pool.connection():
+            raise pymysql.err.OperationalError(2013, "Lost connection to MySQL server during query")
+
+    assert not factory.made[0].open and pool.stats()["open"] == 0
+    with pool.connection() as conn:
+        assert conn is factory.made[1]
+
+    # Closed while in use, or while idle, it is not handed out again
+    with pool.connection() as conn:
+        conn.close()
+    with pool.connection() as conn:
+        assert conn is factory.made[2]
+    conn.close()
+    with pool.connection() as conn:
+        assert conn is factory.made[3]
+    assert pool.stats()["open"] == 1
+
+
+def test_query_errors_keep_the_connection():
+    pool, factory = make_pool(max_size=1)
+    with pytest.raises(pymysql.err.IntegrityError):
+        with pool.connection():
+            raise pymysql.err.IntegrityError(1062, "Duplicate entry")
+
+    with pool.connection() as conn:
+        assert conn is factory.made[0]
+
+
+def test_idle_connections_are_pinged_and_replaced_when_dead():
+    pool, factory = make_pool(ping_interval=0.0)
+    with pool.connection() as conn:
+        pass
+    with pool.connection() as again:
+        assert again is conn and conn.pings == 1
+
+    conn.ping_error = pymysql.err.OperationalError(2006, "MySQL server has gone away")
+    with pool.connection() as replacement:
+        assert replacement is factory.made[1]
+    assert not conn.open and pool.stats()["open"] == 1
+
+
+def test_recently_used_connections_skip_the_ping():
+    pool, _ = make_pool(ping_interval=60.0)
+    with pool.connection() as conn:
+        pass
+    with pool.connection():
+        pass
+
+    assert conn.pings == 0
+
+
+def test_connections_past_their_lifetime_are_recycled():
+    pool, factory = make_pool(max_lifetime=0.05)
+    with pool.connection() as conn:
+        pass
+    time.sleep(0.06)
+
+    with pool.connection() as recycled:
+        assert recycled is factory.made[1]
+    assert not conn.open and pool.stats()["open"] == 1
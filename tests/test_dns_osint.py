@@ -0,0 +1,112 @@
+import asyncio
+import socket
+import threading
+
+import dns.message
+import dns.rcode
+import dns.rdatatype
+import dns.rrset
+import pytest
+
+from backend.osint import dns_osint
+
+# name -> [(rtype, ttl, rdata...)]; names not listed are NXDOMAIN, SLOW never answers and BROKEN fails
+ZONE = {
+    "example.test.": [
+        ("A", 300, "192.0.2.10"),
+        ("MX", 300, "10 mail.example.test.", "20 backup.example.test."),
+        ("TXT", 300, '"v=spf1 include:_spf.example.test -all"', '"site-verification=" "abc123"'),
+    ],
+    "_dmarc.example.test.": [("TXT", 300, '"v=DMARC1; p=reject"')],
+}
+SLOW = "slow.test."
+BROKEN = "broken.test."
+
+
+class StubNameserver:
+    """Answers queries from ZONE over UDP on 127.0.0.1, on a background thread."""
+
+    def __init__(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.settimeout(0.1)
+        self.port = self.sock.getsockname()[1]
+        self.queries = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.sock.close()
+
+    def _serve(self):
+        while not self._stop.is_set():
+            try:
+                wire, addr = self.sock.recvfrom(4096)
+            except socket.timeout:
+                continue
+            query = dns.message.from_wire(wire)
+            question = query.question[0]
+            name, rtype = question.name.to_text(), dns.rdatatype.to_text(question.rdtype)
+            self.queries.append((name, rtype))
+            if name == SLOW:
+                continue
+            response = dns.message.make_response(query)
+            if name == BROKEN:
+                response.set_rcode(dns.rcode.SERVFAIL)
+            elif name not in ZONE:
+                response.set_rcode(dns.rcode.NXDOMAIN)
+            for record_type, ttl, *rdata in ZONE.get(name, []):
+                if record_type == rtype:
+                    response.answer.append(dns.rrset.from_text(name, ttl, "IN", record_type, *rdata))
+            self.sock.sendto(response.to_wire(), addr)
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    with StubNameserver() as server:
+        monkeypatch.setattr(dns_osint, "DNS_NAMESERVERS", ["127.0.0.1"])
+        monkeypatch.setattr(dns_osint, "DNS_PORT", server.port)
+        monkeypatch.setattr(dns_osint, "DNS_TIMEOUT", 0.5)
+        monkeypatch.setattr(dns_osint, "_resolver", None)
+        monkeypatch.setattr(dns_osint, "_local_cache", {})
+        monkeypatch.setattr(dns_osint, "get_async_redis", lambda: None)
+        yield server
+
+
+def test_records_are_parsed_and_then_served_from_cache(stub):
+    findings = asyncio.run(dns_osint.check_domain_records("Example.test."))
+
+    # Records within one answer come in no particular order
+    assert sorted(f["value"] for f in findings) == sorted([
+        "Resolved IP: 192.0.2.10",
+        "MX record: 10 mail.example.test",
+        "MX record: 20 backup.example.test",
+        "SPF record: v=spf1 include:_spf.example.test -all",
+        "TXT record: site-verification=abc123",
+        "DMARC record: v=DMARC1; p=reject",
+    ])
+
+    asked = len(stub.queries)
+    asyncio.run(dns_osint.check_domain_records("example.test"))
+    assert len(stub.queries) == asked
+
+
+def test_nxdomain_is_unresolvable_and_cached(stub):
+    findings = asyncio.run(dns_osint.check_domain_records("missing.test"))
+
+    assert [f["value"] for f in findings] == ["Domain could not be resolved."]
+    assert dns_osint._local_cache[("missing.test", "A")][1] == []
+
+
+@pytest.mark.parametrize("domain", ["slow.test", "broken.test"])
+def test_timeouts_and_servfail_raise_without_caching(stub, domain):
+    # Not "could not be resolved": the module retries instead
+    with pytest.raises(dns_osint.DomainLookupFailed):
+        asyncio.run(dns_osint.check_domain_records(domain))
+    assert not any(name == domain for name, _rtype in dns_osint._local_cache)
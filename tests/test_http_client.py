@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+
+from backend.osint import http_client
+
+
+@pytest.fixture(autouse=True)
+def fresh_client(monkeypatch):
+    """Each test starts without a shared client and with a 2-connection per-host cap."""
+    monkeypatch.setattr(http_client, "_client", None)
+    monkeypatch.setattr(http_client, "_client_loop", None)
+    monkeypatch.setattr(http_client, "_host_slots", {})
+    monkeypatch.setattr(http_client, "HTTP_PER_HOST_CONNECTIONS", 2)
+
+
+def test_one_client_is_reused_within_a_loop():
+    async def scenario():
+        first = http_client.get_http_client()
+        second = http_client.get_http_client()
+        await http_client.close_http_client()
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert first is second
+
+
+def test_a_new_loop_gets_a_new_client():
+    async def scenario():
+        return http_client.get_http_client()
+
+    first = asyncio.run(scenario())
+    second = asyncio.run(scenario())
+
+    assert first is not second
+    assert http_client._client is second
+    asyncio.run(http_client.close_http_client())
+
+
+def test_close_releases_the_client_and_host_slots():
+    async def scenario():
+        client = http_client.get_http_client()
+        http_client.host_slot("https://example.com/a")
+        await http_client.close_http_client()
+        return client, http_client.get_http_client()
+
+    closed, rebuilt = asyncio.run(scenario())
+
+    assert closed.is_closed and rebuilt is not closed
+    asyncio.run(http_client.close_http_client())
+    assert http_client._client is None and http_client._host_slots == {}
+
+
+def test_pool_limits_come_from_config(monkeypatch):
+    monkeypatch.setattr(http_client, "HTTP_POOL_MAX_CONNECTIONS", 7)
+    monkeypatch.setattr(http_client, "HTTP_POOL_MAX_KEEPALIVE", 3)
+
+    pool = http_client._build_transport()._pool
+
+    assert pool._max_connections == 7 and pool._max_keepalive_connections == 3
+
+
+def test_host_slots_cap_concurrency_per_host():
+    active = {}
+    peak = {}
+
+    async def fetch(url):
+        host = url.split("/")[2]
+        async with http_client.host_slot(url):
+            active[host] = active.get(host, 0) + 1
+            peak[host] = max(peak.get(host, 0), active[host])
+            await asyncio.sleep(0.01)
+            active[host] -= 1
+
+    async def scenario():
+        urls = [f"https://{host}/{n}" for host in ("a.example", "b.example") for n in range(5)]
+        await asyncio.gather(*(fetch(url) for url in urls))
+
+    asyncio.run(scenario())
+
+    assert peak == {"a.example": 2, "b.example": 2}
+    assert http_client.host_slot("https://a.example/x") is http_client.host_slot("https://a.example/y")
@@ -0,0 +1,39 @@
+import asyncio
+import threading
+
+from backend import celery_worker
+
+
+def test_direct_partial_write_runs_off_the_event_loop(monkeypatch):
+    threads = []
+
+    async def publish(scan_id, findings):
+        pass
+
+    monkeypatch.setattr(celery_worker, "WRITE_BEHIND_ENABLED", False)
+    monkeypatch.setattr(celery_worker, "update_scan_result", lambda *args: threads.append(threading.current_thread()))
+    monkeypatch.setattr(celery_worker, "publish_findings", publish)
+
+    asyncio.run(celery_worker._flush_partial("scan", [], []))
+
+    assert threads and threads[0] is not threading.main_thread()
+
+
+def test_username_hits_are_emitted_in_small_batches(monkeypatch):
+    batches = []
+
+    async def hits(username, **kwargs):
+        for i in range(5):
+            yield {"site": f"Site{i}", "url": f"https://site{i}.example/{username}"}
+
+    async def emit(batch):
+        batches.append([f["value"] for f in batch])
+
+    monkeypatch.setattr(celery_worker, "iter_username_findings", hits)
+    monkeypatch.setattr(celery_worker, "FINDINGS_FLUSH_BATCH", 2)
+    monkeypatch.setattr(celery_worker, "FINDINGS_FLUSH_INTERVAL", 60)
+
+    found = asyncio.run(celery_worker.username_module("scan", "alice", False, emit))
+
+    assert batches == [["Site0", "Site1"], ["Site2", "Site3"], ["Site4"]]
+    assert len(found) == 5
@@ -0,0 +1,33 @@
+import asyncio
+
+from backend.osint import username_osint
+
+SITES = {
+    "Found": {"errorType": "status_code", "url": "https://found.example/{}"},
+    "Absent": {"errorType": "status_code", "url": "https://absent.example/{}"},
+    "Blocked": {"errorType": "status_code", "url": "https://blocked.example/{}"},
+}
+
+
+def test_a_resumed_scan_probes_blocked_sites_again(sherlock):
+    answers = {"Found": True, "Absent": False, "Blocked": None}
+    probed = []
+
+    async def probe(client, spec, url, timeout, health=None, cache=None):
+        probed.append(spec.name)
+        return answers[spec.name]
+
+    sherlock.sites = SITES
+    sherlock.probe = probe
+
+    async def attempt():
+        return [hit["site"] async for hit in username_osint.iter_username_findings("alice", scan_id="scan-1")]
+
+    assert asyncio.run(attempt()) == ["Found"]
+    assert sorted(probed) == ["Absent", "Blocked", "Found"]
+
+    # The retry keeps the first attempt's hit and asks only the site that was blocked
+    probed.clear()
+    answers["Blocked"] = True
+    assert sorted(asyncio.run(attempt())) == ["Blocked", "Found"]
+    assert probed == ["Blocked"]
@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+
+from backend.osint import http_client
+from backend.osint.probe_scheduler import ProbeScheduler
+
+
+@pytest.fixture(autouse=True)
+def host_slots(monkeypatch):
+    """Fresh per-host semaphores (they bind to the loop of the test that created them)."""
+    monkeypatch.setattr(http_client, "_host_slots", {})
+    monkeypatch.setattr(http_client, "HTTP_PER_HOST_CONNECTIONS", 2)
+
+
+def run_probes(scheduler: ProbeScheduler, probes: list) -> list:
+    """Runs (scan_id, url) probes concurrently; returns their start order and peak concurrency ("all" and per url)."""
+    started = []
+    active, peak = {"all": 0}, {"all": 0}
+
+    def probe(scan_id, url):
+        async def go():
+            started.append((scan_id, url))
+            for key in ("all", url):
+                active[key] = active.get(key, 0) + 1
+                peak[key] = max(peak.get(key, 0), active[key])
+            await asyncio.sleep(0.01)
+            for key in ("all", url):
+                active[key] -= 1
+        return go
+
+    async def scenario():
+        await asyncio.gather(*(scheduler.run(scan_id, url, probe(scan_id, url)) for scan_id, url in probes))
+
+    asyncio.run(scenario())
+    return started, peak
+
+
+def test_global_and_per_host_caps_hold():
+    scheduler = ProbeScheduler(global_limit=3)
+    probes = [("scan", f"https://host{i % 4}.example/{i}") for i in range(12)] + [("scan", "https://busy.example/x")] * 6
+
+    started, peak = run_probes(scheduler, probes)
+
+    assert len(started) == 18
+    assert peak["all"] == 3
+    assert peak["https://busy.example/x"] == 2
+    assert scheduler.in_flight == 0 and scheduler.queued == 0
+
+
+def test_a_late_scan_is_not_starved_by_a_big_sweep():
+    scheduler = ProbeScheduler(global_limit=1)
+    sweep = [("sweep", f"https://site{i}.example/") for i in range(6)]
+
+    started, _ = run_probes(scheduler, sweep + [("late", "https://late.example/")])
+
+    # Round robin: the late scan gets the slot right after the sweep's next probe, not after all six
+    assert [scan for scan, _url in started].index("late") == 2
+
+
+def test_a_cancelled_waiter_gives_up_its_place():
+    scheduler = ProbeScheduler(global_limit=1)
+
+    async def scenario():
+        release = asyncio.Event()
+        holder = asyncio.create_task(scheduler.run("a", "https://one.example/", release.wait))
+        waiter = asyncio.create_task(scheduler.run("b", "https://two.example/", lambda: asyncio.sleep(0)))
+        await asyncio.sleep(0)
+        assert scheduler.queued == 1
+        waiter.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        await holder
+        return await asyncio.gather(waiter, return_exceptions=True)
+
+    (result,) = asyncio.run(scenario())
+
+    assert isinstance(result, asyncio.CancelledError)
+    assert scheduler.in_flight == 0 and scheduler.queued == 0
@@ -0,0 +1,125 @@
+import asyncio
+import email.utils
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from fakeredis.commands_mixins import server_mixin
+
+from backend.osint import breach_osint, rate_limit
+
+NOW = 1_700_000_000.0
+
+
+@pytest.fixture
+def clock(monkeypatch, fake_redis):
+    """
+    One fake clock for Redis TIME and the limiter: sleeping advances it instead of
+    waiting. `clock.slept` lists every sleep.
+    """
+    clock = SimpleNamespace(now=NOW, slept=[])
+
+    async def sleep(seconds):
+        clock.slept.append(round(seconds, 3))
+        clock.now += seconds
+
+    monkeypatch.setattr(server_mixin, "time", SimpleNamespace(time=lambda: clock.now))
+    monkeypatch.setattr(rate_limit, "time", SimpleNamespace(time=lambda: clock.now, monotonic=lambda: clock.now))
+    monkeypatch.setattr(rate_limit, "asyncio", SimpleNamespace(sleep=sleep))
+    monkeypatch.setattr(rate_limit, "get_async_redis", fake_redis.get_async)
+    monkeypatch.setattr(rate_limit, "XON_RATE_PER_SECOND", 1.0)
+    monkeypatch.setattr(rate_limit, "XON_BUCKET_CAPACITY", 2)
+    return clock
+
+
+def take() -> tuple:
+    """One raw bucket call: (granted, seconds to wait)."""
+    async def scenario():
+        acquire = rate_limit.get_async_redis().register_script(rate_limit._ACQUIRE_SCRIPT)
+        granted, wait = await acquire(keys=[rate_limit.XON_BUCKET_KEY], args=[1.0, 2])
+        return granted == "1", round(float(wait), 3)
+
+    return asyncio.run(scenario())
+
+
+def test_the_bucket_drains_and_refills(clock):
+    assert [take(), take()] == [(True, 0.0), (True, 0.0)]
+    assert take() == (False, 1.0)
+
+    clock.now += 0.5
+    assert take() == (False, 0.5)
+    clock.now += 0.5
+    assert take() == (True, 0.0)
+
+
+def test_a_429_backoff_blocks_the_bucket_then_starts_it_empty(clock):
+    asyncio.run(rate_limit.block_xon_for(5))
+    assert take() == (False, 5.0)
+
+    clock.now += 5
+    assert take() == (False, 1.0)
+    clock.now += 1
+    assert take() == (True, 0.0)
+
+
+def test_retry_after_in_seconds_or_as_an_http_date(clock):
+    in_30s = email.utils.formatdate(NOW + 30, usegmt=True)
+
+    assert rate_limit.parse_retry_after("120", 5) == 120
+    assert rate_limit.parse_retry_after(in_30s, 5) == 30
+    assert rate_limit.parse_retry_after(email.utils.formatdate(NOW - 30, usegmt=True), 5) == 0
+    assert rate_limit.parse_retry_after("soon", 5) == 5
+    assert rate_limit.parse_retry_after(None, 5) == 5
+
+
+def test_a_lookup_is_delayed_rather_than_dropped(clock):
+    take(), take()
+
+    asyncio.run(rate_limit.acquire_xon_token(max_wait=10))
+
+    assert clock.slept == [1.0]
+
+
+def test_waiting_gives_up_only_after_max_wait(clock):
+    asyncio.run(rate_limit.block_xon_for(60))
+
+    with pytest.raises(rate_limit.RateLimitTimeout):
+        asyncio.run(rate_limit.acquire_xon_token(max_wait=10))
+    assert sum(clock.slept) == 10
+
+
+@pytest.fixture
+def xon(monkeypatch, clock):
+    """XON answers the queued `responses` (status, headers) in order, paced by the real bucket."""
+    responses = []
+
+    async def no_cache(email, findings=None):
+        return None
+
+    def handler(request):
+        status, headers = responses.pop(0)
+        return httpx.Response(status, headers=headers, json={"breaches": ["Example"]})
+
+    monkeypatch.setattr(breach_osint, "get_http_client", lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    monkeypatch.setattr(breach_osint, "get_cached_breaches", no_cache)
+    monkeypatch.setattr(breach_osint, "cache_breaches", no_cache)
+    monkeypatch.setattr(breach_osint, "XON_MAX_ATTEMPTS", 3)
+    return responses
+
+
+def test_a_429_waits_out_retry_after_and_tries_again(xon, clock):
+    xon.extend([(429, {"Retry-After": "7"}), (200, {})])
+
+    found = asyncio.run(breach_osint.check_data_breaches("a@example.com"))
+
+    assert [f["name"] for f in found] == ["Example"]
+    # Retry-After, then the refill of the bucket the block drained
+    assert clock.slept == [7.0, 1.0]
+
+
+def test_a_429_that_never_clears_raises(xon, clock):
+    xon.extend([(429, {"Retry-After": "1"})] * 3)
+
+    with pytest.raises(rate_limit.RateLimitTimeout):
+        asyncio.run(breach_osint.check_data_breaches("a@example.com"))
+    assert xon == []
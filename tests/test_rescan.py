@@ -0,0 +1,25 @@
+import time
+
+from backend.config import RESCAN_BREACH_REUSE_SECONDS
+from backend.rescan import PriorScan
+
+BREACH = {"type": "breach", "source": "XposedOrNot", "value": "Example", "severity": "HIGH"}
+
+
+def prior(observed_at: float, status: str = "complete") -> PriorScan:
+    coverage = {"modules": {"XposedOrNot": {"status": status, "observed_at": observed_at}}}
+    return PriorScan("base", "Completed", [BREACH], coverage, chain=0)
+
+
+def test_recently_observed_breaches_are_reused():
+    assert prior(time.time() - 60).reusable_breaches() == [BREACH]
+
+
+def test_age_counts_from_observation_not_from_the_base_scan():
+    # A base created a minute ago that itself reused a day-old answer
+    assert prior(time.time() - RESCAN_BREACH_REUSE_SECONDS - 60).reusable_breaches() is None
+
+
+def test_unfinished_or_unstamped_modules_are_not_reused():
+    assert prior(time.time(), status="timed_out").reusable_breaches() is None
+    assert PriorScan("base", "Completed", [BREACH], {}, chain=0).reusable_breaches() is None
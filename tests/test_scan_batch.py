@@ -0,0 +1,60 @@
+import sqlite3
+from contextlib import contextmanager
+
+from backend import database
+from backend.scan_batch import dedupe_targets
+
+
+def test_duplicates_are_dropped_after_normalizing():
+    unique, dropped = dedupe_targets([
+        {"email": " A@Example.com"},
+        {"email": "a@example.com", "force_refresh": True},
+        {"username": "@Alice"},
+        {"username": "alice"},
+        {"domain": "Example.com."},
+        {"domain": "example.com"},
+        {"username": "bob"},
+    ])
+
+    assert dropped == 3
+    # First occurrence wins, order is kept and every target gets its own scan id
+    assert [{k: v for k, v in t.items() if k != "scan_id"} for t in unique] == [
+        {"email": "a@example.com", "force_refresh": False},
+        {"username": "Alice", "force_refresh": False},
+        {"domain": "example.com", "force_refresh": False},
+        {"username": "bob", "force_refresh": False},
+    ]
+    assert len({t["scan_id"] for t in unique}) == 4
+
+
+def test_batch_progress_tells_queued_from_running(monkeypatch):
+    # MySQL is not available to the tests; SQLite runs the same query
+    db = sqlite3.connect(":memory:")
+    db.row_factory = sqlite3.Row
+    db.executescript("""
+        CREATE TABLE scans (scan_id TEXT, owner TEXT, batch_id TEXT, status TEXT, risk_score INT, started_at TEXT);
+        INSERT INTO scans VALUES ('q1', 'alice', 'b1', 'Running', 0, NULL), ('q2', 'alice', 'b1', 'Running', 0, NULL),
+                                 ('r1', 'alice', 'b1', 'Running', 0, '2026-01-01 10:00:00'),
+                                 ('c1', 'alice', 'b1', 'Completed', 40, '2026-01-01 10:00:00'),
+                                 ('other', 'bob', 'b1', 'Running', 0, NULL);
+    """)
+
+    class SqliteCursor:
+        def execute(self, sql, params=()):
+            self.rows = db.execute(sql.replace("%s", "?"), params).fetchall()
+
+        def fetchall(self):
+            return [dict(r) for r in self.rows]
+
+    @contextmanager
+    def get_db_cursor():
+        yield SqliteCursor()
+
+    monkeypatch.setattr(database, "get_db_cursor", get_db_cursor)
+
+    assert database.get_batch_progress("b1", "alice") == {
+        "Queued": {"count": 2, "avg_risk": 0.0},
+        "Running": {"count": 1, "avg_risk": 0.0},
+        "Completed": {"count": 1, "avg_risk": 40.0},
+    }
+    assert database.get_batch_progress("b1", "mallory") == {}
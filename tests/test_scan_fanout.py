@@ -0,0 +1,76 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from backend import celery_worker
+
+HIT = {"type": "username", "source": "Sherlock", "value": "GitHub", "severity": "INFO"}
+
+
+@pytest.fixture
+def outcome(monkeypatch):
+    """Captures what aggregate_scan writes: ("complete", findings, coverage) or ("fail", message)."""
+    written = []
+    monkeypatch.setattr(celery_worker, "scan_deadline", lambda scan_id: None)
+    monkeypatch.setattr(celery_worker, "load_prior_scan", lambda base_scan_id: None)
+    monkeypatch.setattr(celery_worker, "complete_scan", lambda scan_id, flight, findings, coverage, prior: written.append(("complete", findings, coverage)))
+    monkeypatch.setattr(celery_worker, "fail_scan", lambda scan_id, flight, exc: written.append(("fail", str(exc))))
+    return written
+
+
+def failed_module(module: str) -> dict:
+    """What _run_module returns for a module whose retries ran out."""
+    async def broken(emit, deadline, modules, prior):
+        raise RuntimeError(f"{module} down")
+
+    task = SimpleNamespace(request=SimpleNamespace(retries=2), max_retries=2)
+    return celery_worker._run_module(task, "scan-1", module, broken)
+
+
+def test_a_failed_module_leaves_a_partial_scan(outcome, monkeypatch):
+    monkeypatch.setattr(celery_worker, "run_in_worker_loop", asyncio.run)
+    results = [failed_module("XposedOrNot"), {"findings": [HIT], "coverage": {"Sherlock": {"status": "complete"}}}]
+
+    celery_worker.aggregate_scan(results, "scan-1", "flight-1")
+
+    ((kind, findings, coverage),) = outcome
+    assert kind == "complete"
+    assert [f["type"] for f in findings] == ["error", "username"]
+    assert coverage["modules"] == {"XposedOrNot": {"status": "failed"}, "Sherlock": {"status": "complete"}}
+    assert celery_worker.scan_status(coverage) == "Partial"
+
+
+def test_a_scan_whose_every_module_failed_is_failed(outcome, monkeypatch):
+    monkeypatch.setattr(celery_worker, "run_in_worker_loop", asyncio.run)
+
+    celery_worker.aggregate_scan([failed_module("XposedOrNot"), failed_module("DNS")], "scan-1", "flight-1")
+
+    ((kind, message),) = outcome
+    assert kind == "fail" and "XposedOrNot down" in message and "DNS down" in message
+
+
+def test_a_lost_module_task_fails_the_scan(outcome, monkeypatch):
+    dispatched = []
+    monkeypatch.setattr(celery_worker, "chord", lambda header: dispatched.append)
+
+    celery_worker._dispatch_modules("scan-1", "flight-1", "a@example.com", None, None, False)
+
+    # The backend calls the body's errbacks in process when a header task fails
+    (errback,) = dispatched[0].options["link_error"]
+    errback(None, RuntimeError("worker lost"), None)
+
+    assert outcome == [("fail", "worker lost")]
+
+
+def test_a_celery_scan_fans_out_its_modules(monkeypatch):
+    dispatched = []
+    monkeypatch.setattr(celery_worker, "SCAN_FANOUT", True)
+    monkeypatch.setattr(celery_worker, "record_scan_start", lambda scan_id: None)
+    monkeypatch.setattr(celery_worker, "join_flight", lambda flight, scan_id: True)
+    monkeypatch.setattr(celery_worker, "_dispatch_modules", lambda *args: dispatched.append(args[:2]))
+    monkeypatch.setattr(celery_worker, "execute_scan", lambda *args: pytest.fail("ran the modules inline"))
+
+    celery_worker.run_osint_scan("scan-1", None, "alice", None)
+
+    assert dispatched == [("scan-1", celery_worker.flight_key(None, "alice", None))]
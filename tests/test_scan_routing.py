@@ -0,0 +1,59 @@
+import pytest
+
+from backend import scan_routing
+from backend.config import SCAN_QUEUE_ASYNC, SCAN_QUEUE_FAST, SCAN_QUEUE_SLOW
+
+
+@pytest.fixture
+def cached_sites(monkeypatch):
+    """Probe cache stand-in: `cached_sites[username]` is how many sites have a fresh outcome."""
+    cache = {}
+
+    def fresh(username):
+        return {f"site{i}": False for i in range(cache.get(username, 0))}
+
+    monkeypatch.setattr(scan_routing, "SHERLOCK_SITE_LIMIT", 500)
+    monkeypatch.setattr(scan_routing, "SCAN_COST_PER_PROBE", 0.1)
+    monkeypatch.setattr(scan_routing, "SCAN_SLOW_COST_THRESHOLD", 5)
+    monkeypatch.setattr(scan_routing, "ASYNC_WORKER_ENABLED", False)
+    monkeypatch.setattr(scan_routing, "load_fresh_results", fresh)
+    monkeypatch.setattr(scan_routing, "load_fresh_results_many", lambda usernames: [fresh(u) for u in usernames])
+    return cache
+
+
+def test_email_and_domain_scans_take_the_fast_queue(cached_sites):
+    assert scan_routing.queue_for_scan("a@example.com", None, None) == SCAN_QUEUE_FAST
+    assert scan_routing.queue_for_scan(None, None, "example.com") == SCAN_QUEUE_FAST
+
+
+def test_a_full_sherlock_sweep_takes_the_slow_queue(cached_sites):
+    assert scan_routing.queue_for_scan(None, "alice", None) == SCAN_QUEUE_SLOW
+
+
+def test_a_mostly_cached_username_is_fast_unless_refreshed(cached_sites):
+    cached_sites["alice"] = 495
+
+    assert scan_routing.queue_for_scan(None, "alice", None) == SCAN_QUEUE_FAST
+    assert scan_routing.queue_for_scan(None, "alice", None, force_refresh=True) == SCAN_QUEUE_SLOW
+
+
+def test_batch_routing_matches_single_routing(cached_sites):
+    cached_sites["alice"] = 495
+    targets = [
+        {"email": "a@example.com"},
+        {"username": "alice"},
+        {"username": "alice", "force_refresh": True},
+        {"username": "bob"},
+    ]
+
+    assert scan_routing.queues_for_scans(targets) == [
+        scan_routing.queue_for_scan(t.get("email"), t.get("username"), t.get("domain"), t.get("force_refresh", False))
+        for t in targets
+    ] == [SCAN_QUEUE_FAST, SCAN_QUEUE_FAST, SCAN_QUEUE_SLOW, SCAN_QUEUE_SLOW]
+
+
+def test_the_async_worker_takes_sweeps_from_its_own_queue(cached_sites, monkeypatch):
+    monkeypatch.setattr(scan_routing, "ASYNC_WORKER_ENABLED", True)
+
+    assert scan_routing.queue_for_scan(None, "alice", None) == SCAN_QUEUE_ASYNC
+    assert scan_routing.queues_for_scans([{"username": "alice"}, {"email": "a@example.com"}]) == [SCAN_QUEUE_ASYNC, SCAN_QUEUE_FAST]
@@ -0,0 +1,84 @@
+import pytest
+
+from backend import celery_worker, singleflight
+from backend.config import SINGLEFLIGHT_TTL
+from backend.singleflight import finish_flight, flight_key, join_flight
+
+BREACH = {"type": "breach", "source": "XposedOrNot", "value": "Example", "severity": "HIGH"}
+KEY = flight_key("a@example.com", None, None)
+
+
+def test_equivalent_targets_share_a_flight():
+    assert flight_key(None, "@Alice ", None) == flight_key(None, "alice", None)
+    assert flight_key(None, None, "Example.com.") == flight_key(None, None, "example.com")
+
+
+def test_refreshes_and_rescans_get_their_own_flight():
+    plain = flight_key("a@example.com", None, None)
+    assert flight_key("a@example.com", None, None, force_refresh=True) != plain
+    assert flight_key("a@example.com", None, None, base_scan_id="base-1") != plain
+    assert flight_key("a@example.com", None, None, base_scan_id="base-1") != flight_key("a@example.com", None, None, base_scan_id="base-2")
+
+
+@pytest.fixture
+def flights(monkeypatch, fake_redis):
+    """Single-flight scripts on an empty fake Redis; returns the blocking client."""
+    monkeypatch.setattr(singleflight, "_join_script", fake_redis.sync.register_script(singleflight._JOIN_SCRIPT))
+    monkeypatch.setattr(singleflight, "_finish_script", fake_redis.sync.register_script(singleflight._FINISH_SCRIPT))
+    return fake_redis.sync
+
+
+def test_later_scans_attach_as_followers(flights):
+    assert join_flight(KEY, "leader") is True
+    assert join_flight(KEY, "follower-1") is False
+    assert join_flight(KEY, "follower-2") is False
+    # A retry or redelivery of the leader keeps leading
+    assert join_flight(KEY, "leader") is True
+
+    assert flights.get(KEY) == "leader"
+    assert flights.smembers(f"{KEY}:followers") == {"follower-1", "follower-2"}
+
+
+def test_the_flight_expires_with_its_ttl(flights):
+    join_flight(KEY, "leader")
+    join_flight(KEY, "follower")
+
+    assert 0 < flights.ttl(KEY) <= SINGLEFLIGHT_TTL
+    assert 0 < flights.ttl(f"{KEY}:followers") <= SINGLEFLIGHT_TTL
+
+
+def test_only_the_leader_releases_the_flight(flights):
+    join_flight(KEY, "leader")
+    join_flight(KEY, "follower")
+
+    assert finish_flight(KEY, "follower") == []
+    assert sorted(finish_flight(KEY, "leader")) == ["follower"]
+    assert flights.exists(KEY, f"{KEY}:followers") == 0
+    # The next scan of the target leads a new flight
+    assert join_flight(KEY, "next") is True
+
+
+@pytest.fixture
+def writes(monkeypatch, flights):
+    """Rows written by complete_scan / fail_scan: {scan_id: (findings, status)}."""
+    rows = {}
+    monkeypatch.setattr(celery_worker, "update_scan_result", lambda scan_id, findings, risk, status="Completed", **kwargs: rows.__setitem__(scan_id, (findings, status)))
+    monkeypatch.setattr(celery_worker, "publish_status", lambda scan_id, status: None)
+    monkeypatch.setattr(celery_worker, "clear_checkpoint", lambda scan_id: None)
+    join_flight(KEY, "leader")
+    join_flight(KEY, "follower")
+    return rows
+
+
+def test_followers_get_the_leaders_results(writes):
+    celery_worker.complete_scan("leader", KEY, [BREACH])
+
+    assert writes == {"leader": ([BREACH], "Completed"), "follower": ([BREACH], "Completed")}
+
+
+def test_followers_fail_with_their_leader(writes):
+    celery_worker.fail_scan("leader", KEY, RuntimeError("XON down"))
+
+    findings, status = writes["follower"]
+    assert status == "Failed" and writes["leader"] == writes["follower"]
+    assert findings[0]["type"] == "error" and "XON down" in findings[0]["value"]
@@ -0,0 +1,30 @@
+import asyncio
+import json
+
+import httpx
+
+from backend.osint import site_catalog
+
+SITES = {"GitHub": {"errorType": "status_code", "url": "https://github.com/{}"}}
+
+
+def test_concurrent_scans_fetch_the_catalog_once(monkeypatch):
+    monkeypatch.setattr(site_catalog, "_catalog", None)
+    monkeypatch.setattr(site_catalog, "_checked_at", 0.0)
+    monkeypatch.setattr(site_catalog, "get_async_redis", lambda: None)
+    requests = []
+
+    async def handler(request):
+        requests.append(request)
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, text=json.dumps(SITES), headers={"ETag": '"v1"'})
+
+    async def main():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await asyncio.gather(*(site_catalog.get_site_catalog(client, {}, {}) for _ in range(10)))
+
+    catalogs = asyncio.run(main())
+
+    assert len(requests) == 1
+    assert all(c is catalogs[0] for c in catalogs)
+    assert [s.name for s in catalogs[0].active()] == ["GitHub"]
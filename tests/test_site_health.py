@@ -0,0 +1,79 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from backend.osint import site_health
+
+
+@pytest.fixture
+def health(monkeypatch, fake_redis):
+    """Site health on an empty fake Redis with a settable clock (`health.now`)."""
+    clock = SimpleNamespace(now=1_000_000.0)
+    monkeypatch.setattr(site_health, "get_async_redis", fake_redis.get_async)
+    monkeypatch.setattr(site_health, "time", SimpleNamespace(time=lambda: clock.now))
+    monkeypatch.setattr(site_health, "SITE_HEALTH_ALPHA", 0.5)
+    monkeypatch.setattr(site_health, "CIRCUIT_FAILURE_THRESHOLD", 3)
+    monkeypatch.setattr(site_health, "CIRCUIT_COOLDOWN_SECONDS", 600)
+    monkeypatch.setattr(site_health, "PROBE_TIMEOUT_MIN", 3.0)
+    monkeypatch.setattr(site_health, "PROBE_TIMEOUT_MAX", 15.0)
+    monkeypatch.setattr(site_health, "PROBE_TIMEOUT_MULTIPLIER", 2.0)
+    return clock
+
+
+def record(*observations) -> dict:
+    """Flushes (site, latency, ok) observations as one scan; returns {site: [ewma, var, fails, open_until]}."""
+    async def scenario():
+        recorder = site_health.SiteHealthRecorder()
+        for observation in observations:
+            recorder.record(*observation)
+        await recorder.flush()
+        raw = await site_health.get_async_redis().hgetall(site_health.SITE_HEALTH_KEY)
+        return {site: [float(x) for x in value.split(",")] for site, value in raw.items()}
+
+    return asyncio.run(scenario())
+
+
+def view() -> dict:
+    return asyncio.run(site_health.load_site_health())
+
+
+def test_the_first_success_seeds_the_ewma(health):
+    # A failure first leaves no latency estimate to blend into
+    record(("Site", 0.0, False))
+    assert record(("Site", 1.0, True))["Site"][:3] == [1.0, 0.0, 0]
+
+    ewma, var, _fails, _open_until = record(("Site", 3.0, True))["Site"]
+    assert ewma == 2.0 and var == pytest.approx(1.0)
+
+
+def test_timeouts_follow_latency_within_their_bounds(health):
+    assert site_health._timeout_for(-1, 0) == 15.0  # no history yet
+    assert site_health._timeout_for(0.1, 0.0) == 3.0
+    assert site_health._timeout_for(2.5, 0.0) == 5.0
+    assert site_health._timeout_for(20.0, 4.0) == 15.0
+
+    record(("Fast", 0.2, True), ("Slow", 30.0, True))
+    assert view() == {"Fast": (3.0, False), "Slow": (15.0, False)}
+
+
+def test_the_breaker_opens_after_consecutive_failures_and_cools_down(health):
+    record(("Site", 1.0, True), ("Site", 0.0, False), ("Site", 0.0, False))
+    assert view()["Site"][1] is False
+
+    record(("Site", 0.0, False))
+    assert view()["Site"][1] is True
+
+    health.now += 601
+    assert view()["Site"][1] is False
+
+
+def test_a_success_closes_the_breaker(health):
+    record(*[("Site", 0.0, False)] * 3)
+    assert view()["Site"][1] is True
+
+    # A half-open probe (after the cooldown) that succeeds resets the failure count
+    health.now += 601
+    assert record(("Site", 1.0, True))["Site"][2:] == [0, 0]
+    record(("Site", 0.0, False))
+    assert view()["Site"][1] is False
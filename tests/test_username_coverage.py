@@ -0,0 +1,79 @@
+import asyncio
+
+from backend.osint import username_osint
+from backend.scan_budget import scan_status
+
+
+def scan(username: str = "alice") -> tuple:
+    """Runs one sweep; returns (hits, coverage)."""
+    async def scenario():
+        coverage = {}
+        hits = [hit async for hit in username_osint.iter_username_findings(username, coverage=coverage)]
+        return hits, coverage
+
+    return asyncio.run(scenario())
+
+
+def test_skipped_sites_are_not_counted_as_checked(sherlock):
+    sherlock.circuit_open = {"Broken"}
+    sherlock.cached = {"Cached": False}
+
+    async def probe(client, spec, url, timeout, health=None, cache=None):
+        return True
+
+    sherlock.probe = probe
+    hits, coverage = scan()
+
+    assert [hit["site"] for hit in hits] == ["Probed"]
+    assert coverage == {
+        "status": "complete", "checked": 2, "total": 4,
+        "skipped": {"circuit_open": 1, "username_rejected": 1},
+    }
+
+
+def test_an_aborted_sweep_is_not_reported_complete(sherlock):
+    async def probe(client, spec, url, timeout, health=None, cache=None):
+        raise RuntimeError("probe scheduler shut down")
+
+    sherlock.probe = probe
+    hits, coverage = scan()
+
+    assert hits == [] and coverage["status"] == "failed"
+    assert scan_status({"modules": {"Sherlock": coverage}}) == "Partial"
+
+
+def test_hits_are_yielded_as_probes_complete(sherlock):
+    delays = {"Probed": 0.06, "Cached": 0.0, "Broken": 0.03, "DigitsOnly": 0.09}
+
+    async def probe(client, spec, url, timeout, health=None, cache=None):
+        await asyncio.sleep(delays[spec.name])
+        return True
+
+    sherlock.probe = probe
+    hits, _coverage = scan("12345")
+
+    assert [hit["site"] for hit in hits] == ["Cached", "Broken", "Probed", "DigitsOnly"]
+
+
+def test_stopping_early_cancels_pending_probes(sherlock):
+    cancelled = []
+
+    async def probe(client, spec, url, timeout, health=None, cache=None):
+        if spec.name != "Cached":
+            try:
+                await asyncio.sleep(30)
+            except asyncio.CancelledError:
+                cancelled.append(spec.name)
+                raise
+        return True
+
+    sherlock.probe = probe
+
+    async def first_hit():
+        hits = username_osint.iter_username_findings("alice")
+        async for hit in hits:
+            await hits.aclose()
+            return hit
+
+    assert asyncio.run(first_hit())["site"] == "Cached"
+    assert sorted(cancelled) == ["Broken", "Probed"]
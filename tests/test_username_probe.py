@@ -0,0 +1,114 @@
+import asyncio
+
+import httpx
+import pytest
+
+from backend.osint import username_osint
+from backend.osint.probe_cache import ProbeCacheWriter
+from backend.osint.site_catalog import SiteCatalog
+from backend.osint.site_health import SiteHealthRecorder
+
+SPEC = SiteCatalog.compile({"Site": {"errorType": "status_code", "url": "https://site.example/{}"}}, "v1").active()[0]
+URL = SPEC.url_for("alice")
+
+
+def probe(status: int):
+    """Runs one cheap probe against a site answering `status`; returns (found, cached, health)."""
+    client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(status)))
+    health, cache = SiteHealthRecorder(), ProbeCacheWriter("alice")
+
+    async def scenario():
+        async with client:
+            return await username_osint._probe(client, SPEC, URL, 5.0, health, cache)
+
+    found = asyncio.run(scenario())
+    return found, dict(cache._outcomes), [ok for _site, _latency, ok in health._observations]
+
+
+def test_found_and_absent_are_cached():
+    found, cached, health = probe(200)
+    assert found is True and cached["Site"].startswith("1") and health == [True]
+
+    found, cached, health = probe(404)
+    assert found is False and cached["Site"].startswith("0") and health == [True]
+
+
+@pytest.mark.parametrize("status", [403, 429, 500, 503])
+def test_blocks_and_server_errors_are_site_failures_and_not_cached(status):
+    found, cached, health = probe(status)
+    assert found is None and cached == {} and health == [False]
+
+
+def test_other_statuses_are_inconclusive():
+    found, cached, health = probe(400)
+    assert found is None and cached == {} and health == [True]
+
+
+def test_a_login_redirect_is_inconclusive_and_not_cached():
+    def handler(request):
+        if request.url.host == "site.example":
+            return httpx.Response(302, headers={"Location": "https://auth.example/login"})
+        return httpx.Response(200)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    cache = ProbeCacheWriter("alice")
+
+    async def scenario():
+        async with client:
+            return await username_osint._probe(client, SPEC, URL, 5.0, cache=cache)
+
+    assert asyncio.run(scenario()) is None and cache._outcomes == {}
+
+
+
+MESSAGE_SITES = SiteCatalog.compile({
+    "Heavy": {"errorType": "message", "url": "https://heavy.example/{}", "errorMsg": "No such user"},
+    "NoMarker": {"errorType": "message", "url": "https://nomarker.example/{}"},
+}, "v1").active()
+
+
+class Chunks(httpx.AsyncByteStream):
+    def __init__(self, body: bytes, size: int = 64):
+        self._chunks = [body[i:i + size] for i in range(0, len(body), size)]
+
+    async def __aiter__(self):
+        for chunk in self._chunks:
+            yield chunk
+
+
+def probe_message(spec, body: bytes, monkeypatch):
+    """Cheap probe of a message site serving `body` in 64-byte chunks; returns (found, cached, GETs)."""
+    monkeypatch.setattr(username_osint, "PROBE_MAX_BODY_BYTES", 256)
+    gets = []
+
+    def handler(request):
+        gets.append(request.url)
+        return httpx.Response(200, stream=Chunks(body))
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    cache = ProbeCacheWriter("alice")
+
+    async def scenario():
+        async with client:
+            return await username_osint._probe(client, spec, spec.url_for("alice"), 5.0, cache=cache)
+
+    return asyncio.run(scenario()), dict(cache._outcomes), len(gets)
+
+
+def test_a_marker_past_the_read_cap_falls_back_to_a_full_read(monkeypatch):
+    found, cached, gets = probe_message(MESSAGE_SITES[0], b"x" * 1000 + b"No such user", monkeypatch)
+
+    # Not a false "found": the full page shows the error message
+    assert found is False and cached["Heavy"].startswith("0") and gets == 2
+
+
+def test_a_marker_within_the_cap_needs_one_read(monkeypatch):
+    found, _cached, gets = probe_message(MESSAGE_SITES[0], b"x" * 100 + b"No such user" + b"x" * 1000, monkeypatch)
+
+    assert found is False and gets == 1
+
+
+def test_a_message_site_without_a_marker_is_inconclusive(monkeypatch):
+    found, cached, gets = probe_message(MESSAGE_SITES[1], b"profile", monkeypatch)
+
+    assert found is None and cached == {} and gets == 0
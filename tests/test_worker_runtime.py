@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+from backend import worker_runtime
+from backend.osint import http_client
+
+
+async def shared_client():
+    return http_client.get_http_client(), asyncio.get_running_loop()
+
+
+@pytest.fixture(autouse=True)
+def runtime(monkeypatch):
+    """No runtime is running at the start of a test, and none is left behind."""
+    monkeypatch.setattr(worker_runtime, "get_async_redis", lambda: None)
+    monkeypatch.setattr(http_client, "_client", None)
+    monkeypatch.setattr(http_client, "_client_loop", None)
+    yield
+    worker_runtime.stop_runtime()
+
+
+def test_the_loop_starts_once_and_stops_cleanly():
+    loop = worker_runtime.start_runtime()
+    assert worker_runtime.start_runtime() is loop and loop.is_running()
+
+    client, task_loop = worker_runtime.run_in_worker_loop(shared_client())
+    again, _ = worker_runtime.run_in_worker_loop(shared_client())
+    assert task_loop is loop and again is client
+
+    thread = worker_runtime._thread
+    worker_runtime.stop_runtime()
+
+    assert loop.is_closed() and not thread.is_alive() and client.is_closed
+    assert worker_runtime._loop is None
+
+
+def test_a_restart_rebuilds_the_loop_bound_client():
+    client, loop = worker_runtime.run_in_worker_loop(shared_client())
+    worker_runtime.stop_runtime()
+
+    rebuilt, new_loop = worker_runtime.run_in_worker_loop(shared_client())
+
+    assert new_loop is not loop and rebuilt is not client and not rebuilt.is_closed
+
+
+def test_a_forked_child_gets_its_own_loop_and_client(monkeypatch):
+    client, parent_loop = worker_runtime.run_in_worker_loop(shared_client())
+    parent_thread = worker_runtime._thread
+    # The child inherits the parent's globals but not its loop thread
+    monkeypatch.setattr(worker_runtime.os, "getpid", lambda: -1)
+
+    rebuilt, child_loop = worker_runtime.run_in_worker_loop(shared_client())
+
+    assert child_loop is not parent_loop and rebuilt is not client
+    assert worker_runtime._owner_pid == -1
+
+    worker_runtime.stop_runtime()
+    parent_loop.call_soon_threadsafe(parent_loop.stop)
+    parent_thread.join(timeout=5)
+    parent_loop.close()
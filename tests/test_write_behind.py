@@ -0,0 +1,40 @@
+import pytest
+
+from backend import database
+from backend.write_behind import WriteBehindBuffer
+
+
+def update(scan_id: str, status: str = "Completed") -> dict:
+    return {"scan_id": scan_id, "findings": [], "risk_score": 0, "status": status, "coverage": None, "delta": None}
+
+
+@pytest.fixture
+def batches(monkeypatch):
+    """Records each update_scan_results call; any transaction containing scan "bad" fails."""
+    calls = []
+
+    def update_scan_results(updates):
+        calls.append([u["scan_id"] for u in updates])
+        if any(u["scan_id"] == "bad" for u in updates):
+            raise RuntimeError("write failed")
+
+    monkeypatch.setattr(database, "update_scan_results", update_scan_results)
+    return calls
+
+
+def test_failing_row_only_fails_its_own_waiter(batches):
+    # The linger lets all three writes land in the same batch
+    buffer = WriteBehindBuffer(batch_size=100, interval=60, linger=0.3)
+    partial = buffer.submit(update("partial", status="Running"), wait=False)
+    good = buffer.submit(update("good"), wait=True)
+    bad = buffer.submit(update("bad"), wait=True)
+
+    assert good.result(timeout=5) is None
+    with pytest.raises(RuntimeError):
+        bad.result(timeout=5)
+    buffer.close()
+
+    assert partial is None
+    assert sorted(batches[0]) == ["bad", "good", "partial"]
+    # Replayed one by one after the batch failed
+    assert sorted(batches[1:4]) == [["bad"], ["good"], ["partial"]]